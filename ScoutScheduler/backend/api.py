@@ -0,0 +1,335 @@
+"""
+Headless REST API over ``data_store`` and the scheduler (mounted at ``/api``).
+
+    GET  /api/events?start=&end=&limit=&cursor=   range query (recurrences expanded)
+    PUT  /api/events                              upsert (by ``id``, else date + title)
+    GET  /api/badges?section=&status=&limit=&cursor=
+    GET  /api/badges/{name}
+    PATCH /api/badges/{name}                      update fields of one badge
+    POST /api/badges                              update many badges in one write
+    POST /api/schedule                            suggestions (inline, or ``?background=true``)
+    GET  /api/jobs/{id}                           status / result of a background job
+
+Every store or Writer call is blocking, so handlers are ``async`` and hand
+the work to a bounded thread pool (``API_THREADS``); once ``MAX_PENDING``
+calls are waiting the API answers 503 with ``Retry-After`` rather than
+queueing without limit, and the event loop itself never blocks on I/O.
+
+List endpoints page with an opaque ``cursor``.  A cursor pins the store
+version it was issued for: pages are served from the per-version snapshot
+kept in a small LRU, so a client walking a large range sees one consistent
+view even while others write.  If that snapshot has been evicted and the
+store moved on, the API answers 409 and the client restarts from page one.
+
+Badge reads go through the shared ``snapshot`` rather than parsing the
+store in every worker.
+
+Background jobs need workers: the router's lifespan starts this process's
+``jobs`` pool (``jobs.ensure_workers``) when the app starts.  With
+``SCOUT_API_JOB_WORKERS=0`` it doesn't – run them on their own with
+``python -m ScoutScheduler.backend.jobs`` – and ``?background=true`` answers
+503 while no worker is alive.
+"""
+from __future__ import annotations
+
+import asyncio
+import base64
+import datetime as dt
+import functools
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from cachetools import LRUCache
+from fastapi import APIRouter, HTTPException, Path, Query, Response
+from pydantic import BaseModel, ConfigDict, Field
+
+from . import data_store, jobs, metrics, snapshot
+from .recurrence import expand_table
+
+API_THREADS = int(os.getenv("SCOUT_API_THREADS", "8"))
+MAX_PENDING = API_THREADS * 8
+DEFAULT_LIMIT = 100
+MAX_LIMIT = 1_000
+MAX_UPSERT = 1_000
+DEFAULT_DAYS = 366
+JOB_WORKERS = int(os.getenv("SCOUT_API_JOB_WORKERS", str(jobs.PROCESSES)))
+
+_pool = ThreadPoolExecutor(max_workers=API_THREADS, thread_name_prefix="api")
+_pending = 0                      # only touched on the event loop thread
+_snapshots: LRUCache = LRUCache(maxsize=32)     # (version, store, *params) → items
+_snapshots_lock = threading.Lock()
+
+@asynccontextmanager
+async def lifespan(app: Any):
+    """Start the background-job workers with the app (unless ``JOB_WORKERS`` is 0)."""
+    if JOB_WORKERS > 0:
+        jobs.ensure_workers(JOB_WORKERS)
+    yield
+
+
+router = APIRouter(prefix="/api", tags=["api"], lifespan=lifespan)
+
+_REJECTED = metrics.counter("scout_api_rejected_total", "API calls refused with 503 (pool saturated)")
+
+
+async def _offload(fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    """Run blocking *fn* on the bounded pool; 503 when the backlog is full."""
+    global _pending
+    if _pending >= MAX_PENDING:
+        _REJECTED.inc()
+        raise HTTPException(503, "server busy, retry shortly", headers={"Retry-After": "1"})
+    _pending += 1
+    try:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_pool, functools.partial(fn, *args, **kwargs))
+    finally:
+        _pending -= 1
+
+
+# --------------------------------------------------------------------------- #
+# Pagination
+# --------------------------------------------------------------------------- #
+def _encode_cursor(version: int, offset: int) -> str:
+    return base64.urlsafe_b64encode(f"{version}:{offset}".encode()).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: str) -> Tuple[int, int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        version, offset = (int(x) for x in raw.split(":"))
+    except ValueError:
+        raise HTTPException(400, "invalid cursor") from None
+    return version, offset
+
+
+def _snapshot(key: tuple, cursor: Optional[str], load: Callable[[], Tuple[List[Any], int]]):
+    """
+    The item list a page is cut from, plus its version and offset.  ``key[0]``
+    is the store name; fresh requests use its current version, cursors the
+    version they were issued for.  Runs on the pool (may read the store).
+    """
+    if cursor is None:
+        version, offset = data_store.store_version(key[0]), 0
+    else:
+        version, offset = _decode_cursor(cursor)
+    with _snapshots_lock:
+        items = _snapshots.get((version, *key))
+    if items is not None:
+        return items, version, offset
+
+    items, current = load()
+    with _snapshots_lock:
+        _snapshots[(current, *key)] = items
+    if cursor is not None and current != version:
+        raise HTTPException(409, "data changed since this cursor was issued; "
+                                 "restart from the first page")
+    return items, current, offset
+
+
+def _page(items: List[Any], version: int, offset: int, limit: int) -> Dict[str, Any]:
+    chunk = items[offset:offset + limit]
+    end = offset + len(chunk)
+    return {
+        "items": chunk,
+        "total": len(items),
+        "version": version,
+        "next": _encode_cursor(version, end) if end < len(items) else None,
+    }
+
+
+# --------------------------------------------------------------------------- #
+# Events
+# --------------------------------------------------------------------------- #
+class EventIn(BaseModel):
+    """One event; extra keys (``id``, ``rrule``, ``exdates`` …) are kept."""
+    model_config = ConfigDict(extra="allow")
+
+    date: dt.date
+    title: str = Field(min_length=1)
+    description: str = ""
+
+    def record(self) -> Dict[str, Any]:
+        return dict(self.model_dump(), date=self.date.isoformat())
+
+
+def _events_between(start: dt.date, end: dt.date) -> Tuple[List[Dict[str, Any]], int]:
+    table, version = data_store.load_event_table()
+    return list(expand_table(table, start, end)), version
+
+
+@router.get("/events")
+async def list_events(
+    start: Optional[dt.date] = Query(None, description="first day (default: today)"),
+    end: Optional[dt.date] = Query(None, description="last day (default: a year after start)"),
+    limit: int = Query(DEFAULT_LIMIT, ge=1, le=MAX_LIMIT),
+    cursor: Optional[str] = None,
+):
+    """Events in ``[start, end]`` in date order, recurring events expanded."""
+    start = start or dt.date.today()
+    end = end or start + dt.timedelta(days=DEFAULT_DAYS)
+    if end < start:
+        raise HTTPException(400, "end is before start")
+    items, version, offset = await _offload(
+        _snapshot, ("events", start, end), cursor, lambda: _events_between(start, end)
+    )
+    return _page(items, version, offset, limit)
+
+
+@router.put("/events")
+async def upsert_events(events: List[EventIn]):
+    """Insert or replace events (matched by ``id``, else by date + title) in one write."""
+    if len(events) > MAX_UPSERT:
+        raise HTTPException(413, f"at most {MAX_UPSERT} events per request")
+    inserted, updated, version = await _offload(
+        data_store.upsert_events, [e.record() for e in events]
+    )
+    return {"inserted": inserted, "updated": updated, "version": version}
+
+
+# --------------------------------------------------------------------------- #
+# Badges
+# --------------------------------------------------------------------------- #
+class BadgeUpdate(BaseModel):
+    """Fields to change; unknown keys are stored as given."""
+    model_config = ConfigDict(extra="allow")
+
+    status: Optional[str] = None
+    completion: Optional[int] = Field(None, ge=0, le=100)
+    sessions: Optional[int] = Field(None, ge=1)
+    requirements: Optional[List[str]] = None
+    description: Optional[str] = None
+
+    def fields(self) -> Dict[str, Any]:
+        return self.model_dump(exclude_unset=True)
+
+
+class NamedBadgeUpdate(BadgeUpdate):
+    name: str
+
+    def fields(self) -> Dict[str, Any]:
+        out = super().fields()
+        out.pop("name", None)
+        return out
+
+
+def _badge_list(section: Optional[str], status: Optional[str]) -> Tuple[List[Dict[str, Any]], int]:
+    snap = snapshot.current()           # name order; only matching records are decoded
+    items = [dict(rec, name=name) for name, rec in snap.badges.filter(section, status)]
+    return items, snap.badges_version
+
+
+def _badge(name: str) -> Optional[Dict[str, Any]]:
+    return snapshot.current().badges.get(name)
+
+
+def _update_badges(updates: List[Tuple[str, Dict[str, Any]]]) -> Tuple[Dict[str, bool], int]:
+    found: Dict[str, bool] = {}
+
+    def _apply(badges: Dict[str, Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+        found.clear()
+        for name, fields in updates:
+            found[name] = name in badges
+            if found[name]:
+                badges[name].update(fields)
+        return badges
+
+    badges, version = data_store.load_badges_versioned()
+    if not any(name in badges for name, _ in updates):
+        return {name: False for name, _ in updates}, version     # nothing to write
+    data_store.update_badges(_apply, changed=found)
+    return found, data_store.store_version("badges")
+
+
+@router.get("/badges")
+async def list_badges(
+    section: Optional[str] = None,
+    status: Optional[str] = None,
+    limit: int = Query(DEFAULT_LIMIT, ge=1, le=MAX_LIMIT),
+    cursor: Optional[str] = None,
+):
+    """Badge records sorted by name, optionally filtered."""
+    items, version, offset = await _offload(
+        _snapshot, ("badges", section, status), cursor, lambda: _badge_list(section, status)
+    )
+    return _page(items, version, offset, limit)
+
+
+@router.get("/badges/{name}")
+async def get_badge(name: str = Path(...)):
+    record = await _offload(_badge, name)
+    if record is None:
+        raise HTTPException(404, "Badge not found")
+    return dict(record, name=name)
+
+
+@router.patch("/badges/{name}")
+async def patch_badge(update: BadgeUpdate, name: str = Path(...)):
+    found, version = await _offload(_update_badges, [(name, update.fields())])
+    if not found.get(name):
+        raise HTTPException(404, "Badge not found")
+    return {"name": name, "version": version}
+
+
+@router.post("/badges")
+async def update_badges(updates: List[NamedBadgeUpdate]):
+    """Apply many badge updates in one write; unknown names are reported, not fatal."""
+    if len(updates) > MAX_UPSERT:
+        raise HTTPException(413, f"at most {MAX_UPSERT} updates per request")
+    found, version = await _offload(_update_badges, [(u.name, u.fields()) for u in updates])
+    return {
+        "updated": sorted(n for n, ok in found.items() if ok),
+        "missing": sorted(n for n, ok in found.items() if not ok),
+        "version": version,
+    }
+
+
+# --------------------------------------------------------------------------- #
+# Scheduling
+# --------------------------------------------------------------------------- #
+class SchedulePrefs(BaseModel):
+    weekend_only: bool = False
+    time_of_day: str = "any"
+
+
+def _generate(prefs: Dict[str, Any]) -> List[Dict[str, str]]:
+    from .scheduler_logic import generate_schedule
+    return generate_schedule(data_store.load_events(), data_store.load_badges(),
+                             data_store.load_holidays(), prefs)
+
+
+@router.post("/schedule")
+async def schedule(
+    response: Response,
+    prefs: SchedulePrefs = SchedulePrefs(),
+    background: bool = Query(False, description="queue a job and return its id"),
+):
+    """
+    Badge-session suggestions.  Inline calls hold a pool thread for the
+    Writer round trip; ``background=true`` queues a job instead (202).
+    """
+    if background:
+        if not await _offload(jobs.workers_alive):
+            raise HTTPException(503, "No background job worker is running",
+                                headers={"Retry-After": "30"})
+        job_id = await _offload(jobs.submit, "generate_schedule", prefs=prefs.model_dump())
+        response.status_code = 202
+        return {"job_id": job_id, "status_url": f"{router.prefix}/jobs/{job_id}"}
+    try:
+        return {"suggestions": await _offload(_generate, prefs.model_dump())}
+    except RuntimeError as exc:            # Writer errors surface as RuntimeError
+        raise HTTPException(502, str(exc)) from None
+
+
+@router.get("/jobs/{job_id}")
+async def job_status(job_id: int):
+    job = await _offload(jobs.get, job_id)
+    if job is None:
+        raise HTTPException(404, "Job not found")
+    return {
+        "id": job.id, "kind": job.kind, "status": job.status,
+        "progress": job.progress, "message": job.message,
+        "result": job.result, "error": job.error,
+    }
@@ -0,0 +1,314 @@
+"""
+Incrementally maintained availability index.
+
+Answers "is this day free?" without scanning the ``{start, end}`` holiday
+dicts or the event list:
+
+* holidays are kept as merged, disjoint intervals in two parallel sorted
+  lists (``starts`` / ``ends``) → O(log n) point and range queries;
+* busy days are a bitmap (one bit per day from a moving base ordinal) backed
+  by a per-day event count so removals are exact.
+
+``add_*`` / ``remove_*`` touch only the affected interval or day, so the
+index never needs rebuilding after a single edit.  ``attach()`` keeps it in
+sync with ``data_store.add_event`` & friends, and rebuilds the events or
+holidays half after a whole-store ``save_*`` / ``update_*``.  An index built
+with ``from_store`` also remembers the store versions it reflects: ``sync()``
+rebuilds a half that another process has written since.  ``shared()`` is
+the process-wide, attached and synced index the pages and scheduler use.
+
+Recurring events mark their occurrences inside ``horizon`` (default: one
+year either side of today).
+
+``data_store`` listeners run on whichever thread wrote (API pool threads,
+the reminder thread, Streamlit reruns), so every mutation and query holds
+the index's own ``RLock``; ``free_days`` copies the little state it walks
+and iterates outside it.
+"""
+from __future__ import annotations
+
+import datetime as dt
+import functools
+import threading
+from bisect import bisect_left, bisect_right, insort
+from collections import Counter
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from . import data_store
+from .event_table import to_ordinal
+from .recurrence import is_recurring, occurrences
+
+DEFAULT_HORIZON = dt.timedelta(days=366)
+
+
+def _synchronised(method: Callable[..., Any]) -> Callable[..., Any]:
+    """Run *method* holding the index's lock."""
+    @functools.wraps(method)
+    def wrapper(self: "AvailabilityIndex", *args: Any, **kwargs: Any) -> Any:
+        with self._lock:
+            return method(self, *args, **kwargs)
+    return wrapper
+
+
+class AvailabilityIndex:
+    def __init__(
+        self,
+        events: Iterable[Dict[str, Any]] = (),
+        holidays: Iterable[Dict[str, Any]] = (),
+        horizon: Optional[Tuple[Any, Any]] = None,
+    ) -> None:
+        today = dt.date.today()
+        self._lock = threading.RLock()
+        self.horizon = horizon or (today - DEFAULT_HORIZON, today + DEFAULT_HORIZON)
+        # raw holiday spans (with multiplicity) and their merged cover
+        self._raw: Counter = Counter()
+        self._raw_sorted: List[Tuple[int, int]] = []
+        self._starts: List[int] = []
+        self._ends: List[int] = []
+        # busy-day bitmap; _base is always a multiple of 8
+        self._base: Optional[int] = None
+        self._bits = bytearray()
+        self._busy: Counter = Counter()
+        self._unsubscribe: Optional[Callable[[], None]] = None
+        self._versions: Dict[str, int] = {}   # store → version reflected (from_store only)
+
+        for h in holidays:
+            self.add_holiday(h)
+        for ev in events:
+            self.add_event(ev)
+
+    @classmethod
+    def from_store(cls) -> "AvailabilityIndex":
+        events, events_version = data_store.load_events_versioned()
+        holidays, holidays_version = data_store.load_holidays_versioned()
+        index = cls(events, holidays)
+        index._versions = {"events": events_version, "holidays": holidays_version}
+        return index
+
+    # ------------------------------ syncing ------------------------------ #
+    def attach(self) -> "AvailabilityIndex":
+        """Follow single-record edits made through ``data_store``."""
+        if self._unsubscribe is None:
+            self._unsubscribe = data_store.subscribe(self._on_change)
+        return self
+
+    def detach(self) -> None:
+        if self._unsubscribe is not None:
+            self._unsubscribe()
+            self._unsubscribe = None
+
+    @_synchronised
+    def _on_change(self, store: str, op: str, record: Dict[str, Any]) -> None:
+        if store not in ("events", "holidays"):
+            return
+        if op == "reset":
+            self.reset(store, record["items"])
+        elif store == "events":
+            (self.add_event if op == "add" else self.remove_event)(record)
+        else:
+            (self.add_holiday if op == "add" else self.remove_holiday)(record)
+        if store in self._versions:
+            # the write we were told about is at most one step ahead; more
+            # means another process wrote too, and sync() must rebuild
+            seen, now = self._versions[store], data_store.store_version(store)
+            self._versions[store] = now if now - seen in (0, 1) else -1
+
+    @_synchronised
+    def reset(self, store: str, items: Iterable[Dict[str, Any]]) -> None:
+        """Rebuild the ``"events"`` or ``"holidays"`` half from *items*."""
+        if store == "events":
+            self._base, self._bits, self._busy = None, bytearray(), Counter()
+            for ev in items:
+                self.add_event(ev)
+        else:
+            self._raw, self._raw_sorted = Counter(), []
+            self._starts, self._ends = [], []
+            for h in items:
+                self.add_holiday(h)
+
+    def sync(self) -> "AvailabilityIndex":
+        """Catch up with writes this process wasn't told about (``from_store`` indexes)."""
+        loaders = {"events": data_store.load_events_versioned,
+                   "holidays": data_store.load_holidays_versioned}
+        with self._lock:
+            stale = [store for store, seen in self._versions.items()
+                     if data_store.store_version(store) != seen]
+        for store in stale:
+            items, version = loaders[store]()        # read outside the lock
+            with self._lock:
+                self.reset(store, items)
+                self._versions[store] = version
+        return self
+
+    # ----------------------------- holidays ------------------------------ #
+    @staticmethod
+    def _span(holiday: Dict[str, Any]) -> Tuple[int, int]:
+        s, e = to_ordinal(holiday["start"]), to_ordinal(holiday["end"])
+        return (s, e) if s <= e else (e, s)
+
+    def _merge_in(self, s: int, e: int) -> None:
+        # merged intervals touching [s-1, e+1] are i..j-1
+        i = bisect_left(self._ends, s - 1)
+        j = bisect_right(self._starts, e + 1)
+        if i < j:
+            s = min(s, self._starts[i])
+            e = max(e, self._ends[j - 1])
+        self._starts[i:j] = [s]
+        self._ends[i:j] = [e]
+
+    @_synchronised
+    def add_holiday(self, holiday: Dict[str, Any]) -> None:
+        s, e = self._span(holiday)
+        self._raw[(s, e)] += 1
+        if self._raw[(s, e)] == 1:
+            insort(self._raw_sorted, (s, e))
+            self._merge_in(s, e)
+
+    @_synchronised
+    def remove_holiday(self, holiday: Dict[str, Any]) -> None:
+        s, e = self._span(holiday)
+        if self._raw[(s, e)] == 0:
+            return
+        self._raw[(s, e)] -= 1
+        if self._raw[(s, e)]:
+            return
+        del self._raw[(s, e)]
+        del self._raw_sorted[bisect_left(self._raw_sorted, (s, e))]
+
+        # re-merge only the raw spans that fed the merged interval holding s
+        i = bisect_right(self._starts, s) - 1
+        lo, hi = self._starts[i], self._ends[i]
+        a = bisect_left(self._raw_sorted, (lo, lo))
+        b = bisect_right(self._raw_sorted, (hi, hi))
+        starts: List[int] = []
+        ends: List[int] = []
+        for rs, re in self._raw_sorted[a:b]:
+            if ends and rs <= ends[-1] + 1:
+                ends[-1] = max(ends[-1], re)
+            else:
+                starts.append(rs)
+                ends.append(re)
+        self._starts[i:i + 1] = starts
+        self._ends[i:i + 1] = ends
+
+    @_synchronised
+    def holiday_intervals(self) -> List[Tuple[dt.date, dt.date]]:
+        return [(dt.date.fromordinal(s), dt.date.fromordinal(e))
+                for s, e in zip(self._starts, self._ends)]
+
+    @_synchronised
+    def is_holiday(self, day: Any) -> bool:
+        d = to_ordinal(day)
+        i = bisect_right(self._starts, d) - 1
+        return i >= 0 and d <= self._ends[i]
+
+    @_synchronised
+    def holidays_between(self, start: Any, end: Any) -> List[Tuple[dt.date, dt.date]]:
+        """Merged holiday intervals overlapping ``[start, end]``."""
+        lo, hi = to_ordinal(start), to_ordinal(end)
+        i = bisect_left(self._ends, lo)
+        j = bisect_right(self._starts, hi)
+        return [(dt.date.fromordinal(self._starts[k]), dt.date.fromordinal(self._ends[k]))
+                for k in range(i, j)]
+
+    # ---------------------------- busy days ------------------------------ #
+    def _ensure(self, day: int) -> None:
+        if self._base is None:
+            self._base = day - day % 8
+        if day < self._base:
+            grow = (self._base - day + 7) // 8
+            self._bits[0:0] = bytes(grow)
+            self._base -= grow * 8
+        need = (day - self._base) // 8 + 1
+        if need > len(self._bits):
+            self._bits.extend(bytes(need - len(self._bits)))
+
+    def _set_bit(self, day: int, on: bool) -> None:
+        self._ensure(day)
+        off = day - self._base
+        if on:
+            self._bits[off >> 3] |= 1 << (off & 7)
+        else:
+            self._bits[off >> 3] &= ~(1 << (off & 7)) & 0xFF
+
+    def _event_days(self, event: Dict[str, Any]) -> Iterable[int]:
+        if is_recurring(event):
+            return [to_ordinal(o["date"]) for o in occurrences(event, *self.horizon)]
+        return (to_ordinal(event["date"]),)
+
+    @_synchronised
+    def add_event(self, event: Dict[str, Any]) -> None:
+        for d in self._event_days(event):
+            self._busy[d] += 1
+            if self._busy[d] == 1:
+                self._set_bit(d, True)
+
+    @_synchronised
+    def remove_event(self, event: Dict[str, Any]) -> None:
+        for d in self._event_days(event):
+            if not self._busy[d]:
+                continue
+            self._busy[d] -= 1
+            if not self._busy[d]:
+                del self._busy[d]
+                self._set_bit(d, False)
+
+    @_synchronised
+    def is_busy(self, day: Any) -> bool:
+        return self._bit(to_ordinal(day))
+
+    def _bit(self, d: int) -> bool:
+        return _test_bit(self._base, self._bits, d)
+
+    # ------------------------------ queries ------------------------------ #
+    @_synchronised
+    def is_free(self, day: Any) -> bool:
+        return not self.is_busy(day) and not self.is_holiday(day)
+
+    def free_days(self, start: Any, end: Any, weekend_only: bool = False) -> Iterator[dt.date]:
+        """
+        Yield days in ``[start, end]`` that are neither holidays nor busy.
+        Holiday spans are skipped in one jump rather than day by day.
+        Walks a copy of the state taken when iteration starts.
+        """
+        d, hi = to_ordinal(start), to_ordinal(end)
+        with self._lock:
+            starts, ends = list(self._starts), list(self._ends)
+            base, bits = self._base, bytes(self._bits)
+        k = bisect_right(starts, d) - 1
+        if k < 0 or d > ends[k]:
+            k += 1                               # next holiday at or after d
+        while d <= hi:
+            if k < len(starts) and d >= starts[k]:
+                d = ends[k] + 1
+                k += 1
+                continue
+            # weekday(): Mon=0 … Sun=6; ordinal 1 (0001-01-01) is a Monday
+            if (not weekend_only or (d - 1) % 7 >= 5) and not _test_bit(base, bits, d):
+                yield dt.date.fromordinal(d)
+            d += 1
+
+
+def _test_bit(base: Optional[int], bits: Any, d: int) -> bool:
+    if base is None or d < base:
+        return False
+    off = d - base
+    if (off >> 3) >= len(bits):
+        return False
+    return bool(bits[off >> 3] & (1 << (off & 7)))
+
+
+_shared: Optional[AvailabilityIndex] = None
+_shared_dir = None
+_shared_lock = threading.Lock()
+
+
+def shared() -> AvailabilityIndex:
+    """The process-wide index: attached to ``data_store`` and synced on every call."""
+    global _shared, _shared_dir
+    with _shared_lock:
+        if _shared is None or _shared_dir != data_store.DATA_DIR:
+            if _shared is not None:
+                _shared.detach()
+            _shared, _shared_dir = AvailabilityIndex.from_store().attach(), data_store.DATA_DIR
+        return _shared.sync()
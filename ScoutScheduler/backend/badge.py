@@ -1,17 +1,25 @@
 import os
 import json
 from fastapi import FastAPI, HTTPException
+from fastapi.responses import PlainTextResponse
 from bs4 import BeautifulSoup
 import httpx
 
 # Import badge logic
-from ScoutScheduler.backend.badge_logic import load_badges
+from ScoutScheduler.backend.badge_logic import get_all_badges as load_badges
+from ScoutScheduler.backend.calendar_feed import router as calendar_router
+from ScoutScheduler.backend.api import router as api_router
+from ScoutScheduler.backend import metrics
+from ScoutScheduler.backend.badge_crawler import detail_url
 
 app = FastAPI()
+app.include_router(calendar_router)   # GET /calendar.ics
+app.include_router(api_router)        # /api/events, /api/badges, /api/schedule
 
-# Environment variable for overriding badge info URL if needed
+# Environment variable for overriding the badge file (read by badge_logic)
 BADGE_FILE = os.getenv("BADGE_FILE_PATH")
 
+@metrics.timed("scout_badge_fetch_seconds")
 async def fetch_description(url: str) -> str:
     """
     Fetch the badge page and extract its descriptive content.
@@ -31,10 +39,22 @@ async def badge_info(name: str):
     """
     # Load badges from the logic module
     badges = load_badges()
-    url = badges.get(name)
+    record = badges.get(name)
+    # scraped records carry no "url" – derive the detail page from section + name;
+    # older files map name → URL
+    url = detail_url(record) if isinstance(record, dict) else record
     if not url:
         raise HTTPException(status_code=404, detail="Badge not found")
 
     # Fetch live description
     description = await fetch_description(url)
     return {"name": name, "url": url, "description": description}
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def prometheus_metrics():
+    """
+    Prometheus scrape endpoint for this process's counters and histograms.
+    """
+    return PlainTextResponse(metrics.render_prometheus(),
+                             media_type="text/plain; version=0.0.4")
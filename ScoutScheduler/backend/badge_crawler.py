@@ -0,0 +1,327 @@
+"""
+Crawler for the per-badge detail pages on scouts.org.uk.
+
+The section index pages only give a name and a blurb, so catalogue records
+start with ``"requirements": []`` and ``"sessions": 1``.  ``crawl_badge_details``
+visits every badge's own page and fills both in:
+
+* a small thread pool bounds concurrency, and a token bucket per host keeps
+  the request rate polite (429 / 5xx answers are retried with back-off);
+* each page's ETag / Last-Modified is remembered and sent back as
+  ``If-None-Match`` / ``If-Modified-Since`` – an unchanged page costs a 304;
+* progress is checkpointed to ``crawl_state.json`` in ``DATA_DIR``, so an
+  interrupted crawl resumes where it stopped instead of starting over.
+
+    python -m ScoutScheduler.backend.badge_crawler --concurrency 4 --rate 2
+"""
+from __future__ import annotations
+
+import argparse
+import datetime as dt
+import logging
+import math
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+from bs4 import BeautifulSoup, Tag
+
+from . import data_store, jobs, metrics, snapshot
+
+log = logging.getLogger(__name__)
+
+BASE_URL = "https://www.scouts.org.uk"
+CONCURRENCY = 4
+RATE = 2.0                 # requests per second per host
+BURST = 4
+CHECKPOINT_EVERY = 10      # pages between state saves
+MAX_ATTEMPTS = 3
+REQUIREMENTS_PER_SESSION = 2
+MAX_SESSIONS = 12
+
+_PAGES = metrics.counter("scout_crawl_pages_total", "badge detail pages by outcome")
+
+
+# --------------------------------------------------------------------------- #
+# Rate limiting
+# --------------------------------------------------------------------------- #
+class TokenBucket:
+    """Classic token bucket: *rate* tokens per second, at most *burst* banked."""
+
+    def __init__(self, rate: float, burst: int, clock: Callable[[], float] = time.monotonic) -> None:
+        self.rate, self.burst = rate, burst
+        self._clock = clock
+        self._tokens = float(burst)
+        self._stamp = clock()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        while True:
+            with self._lock:
+                now = self._clock()
+                self._tokens = min(self.burst, self._tokens + (now - self._stamp) * self.rate)
+                self._stamp = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+class HostLimiter:
+    """One ``TokenBucket`` per host."""
+
+    def __init__(self, rate: float = RATE, burst: int = BURST) -> None:
+        self.rate, self.burst = rate, burst
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._lock = threading.Lock()
+
+    def acquire(self, url: str) -> None:
+        host = urlsplit(url).netloc
+        with self._lock:
+            bucket = self._buckets.get(host)
+            if bucket is None:
+                bucket = self._buckets[host] = TokenBucket(self.rate, self.burst)
+        bucket.acquire()
+
+
+# --------------------------------------------------------------------------- #
+# Page parsing
+# --------------------------------------------------------------------------- #
+_HOW_TO_RE = re.compile(r"earn|requirement|how to|complete", re.I)
+_DURATION_RE = re.compile(
+    r"\b(\d+|one|two|three|four|five|six|seven|eight|nine|ten|eleven|twelve)\s+(week|month)s?\b",
+    re.I,
+)
+_WORD_NUMBERS = {w: i for i, w in enumerate(
+    "zero one two three four five six seven eight nine ten eleven twelve".split())}
+
+
+def slugify(name: str) -> str:
+    return re.sub(r"[^a-z0-9]+", "-", name.lower()).strip("-")
+
+
+def detail_url(record: Dict[str, Any]) -> Optional[str]:
+    """The record's own ``url``, else the site's ``/<section>/activity-badges/<slug>/``."""
+    if record.get("url"):
+        return record["url"]
+    section, name = record.get("section"), record.get("name")
+    if not section or not name:
+        return None
+    return f"{BASE_URL}/{section.lower()}/activity-badges/{slugify(name)}/"
+
+
+def _clean(text: str) -> str:
+    return re.sub(r"\s+", " ", text).strip()
+
+
+def parse_badge_requirements(html: str) -> List[str]:
+    """
+    Top-level items of the "How to earn your badge" list (sub-options stay
+    inside their parent item's text).
+    """
+    try:
+        soup = BeautifulSoup(html, "lxml")
+    except Exception:            # lxml not installed
+        soup = BeautifulSoup(html, "html.parser")
+    region = soup.find("main") or soup.select_one(".article-content") or soup.body or soup
+
+    target: Optional[Tag] = None
+    for heading in region.find_all(["h2", "h3"]):
+        if _HOW_TO_RE.search(heading.get_text(" ", strip=True)):
+            target = heading.find_next(["ol", "ul"])
+            break
+    target = target or region.find("ol")
+    if target is None:
+        return []
+    return [t for t in (_clean(li.get_text(" ", strip=True))
+                        for li in target.find_all("li", recursive=False)) if t]
+
+
+def estimate_sessions(requirements: List[str]) -> int:
+    """
+    Rough number of weekly meetings: two requirements a session, but at
+    least as many weeks as the longest "over N weeks/months" activity.
+    """
+    if not requirements:
+        return 1
+    sessions = math.ceil(len(requirements) / REQUIREMENTS_PER_SESSION)
+    for req in requirements:
+        for amount, unit in _DURATION_RE.findall(req):
+            n = int(amount) if amount.isdigit() else _WORD_NUMBERS[amount.lower()]
+            sessions = max(sessions, n * (4 if unit.lower() == "month" else 1))
+    return max(1, min(MAX_SESSIONS, sessions))
+
+
+# --------------------------------------------------------------------------- #
+# Crawl
+# --------------------------------------------------------------------------- #
+def _now() -> str:
+    return dt.datetime.now().isoformat(timespec="microseconds")
+
+
+def _default_session():
+    import cloudscraper
+    return cloudscraper.create_scraper()
+
+
+def _fetch(
+    session, url: str, page: Dict[str, Any], limiter: HostLimiter, timeout: float
+) -> Tuple[str, Dict[str, Any]]:
+    """Conditional GET with retries; returns (outcome, updated page entry)."""
+    headers = {}
+    if "requirements" in page:                 # only revalidate what we have parsed
+        if page.get("etag"):
+            headers["If-None-Match"] = page["etag"]
+        if page.get("last_modified"):
+            headers["If-Modified-Since"] = page["last_modified"]
+
+    for attempt in range(MAX_ATTEMPTS):
+        limiter.acquire(url)
+        with metrics.span("scout_crawl_fetch_seconds"):
+            resp = session.get(url, headers=headers, timeout=timeout)
+        if resp.status_code == 304 and "requirements" in page:
+            return "unchanged", dict(page, checked=_now(), error=None)
+        if resp.status_code in (429, 500, 502, 503, 504) and attempt + 1 < MAX_ATTEMPTS:
+            retry_after = resp.headers.get("Retry-After", "")
+            time.sleep(float(retry_after) if retry_after.isdigit() else 2 ** attempt)
+            continue
+        resp.raise_for_status()
+        reqs = parse_badge_requirements(resp.text)
+        return "fetched", dict(
+            page,
+            etag=resp.headers.get("ETag"),
+            last_modified=resp.headers.get("Last-Modified"),
+            requirements=reqs,
+            sessions=estimate_sessions(reqs),
+            checked=_now(),
+            error=None,
+        )
+    raise RuntimeError("unreachable")  # pragma: no cover
+
+
+def crawl_badge_details(
+    badges: Optional[Dict[str, Dict[str, Any]]] = None,
+    concurrency: int = CONCURRENCY,
+    rate: float = RATE,
+    burst: int = BURST,
+    resume: bool = True,
+    timeout: float = 30,
+    session_factory: Callable[[], Any] = _default_session,
+    apply: bool = True,
+) -> Dict[str, Any]:
+    """
+    Crawl the detail page of every badge in *badges* (default: the store).
+
+    With *resume*, an unfinished earlier run continues: pages it already
+    checked are skipped.  With *apply*, ``requirements`` and ``sessions``
+    are written back to the badge store in one update at the end.
+
+    Returns counts per outcome (``fetched``, ``unchanged``, ``skipped``,
+    ``failed``) plus ``updated`` – the number of badge records changed.
+    """
+    badges = data_store.load_badges() if badges is None else badges
+    targets = {name: url for name, url in ((n, detail_url(r)) for n, r in badges.items()) if url}
+
+    state = data_store.load_crawl_state()
+    pages: Dict[str, Dict[str, Any]] = state.setdefault("pages", {})
+    run = state.get("run") or {}
+    if not (resume and run and not run.get("finished")):
+        run = {"started": _now(), "finished": None}
+    state["run"] = run
+
+    todo = [
+        (name, url) for name, url in targets.items()
+        if not (pages.get(url, {}).get("checked", "") >= run["started"]
+                and not pages[url].get("error"))
+    ]
+    summary = {"fetched": 0, "unchanged": 0, "skipped": len(targets) - len(todo), "failed": 0}
+
+    lock = threading.Lock()
+    local = threading.local()
+    limiter = HostLimiter(rate, burst)
+    done = 0
+
+    def work(name: str, url: str) -> Tuple[str, str, Dict[str, Any]]:
+        if not hasattr(local, "session"):
+            local.session = session_factory()
+        with lock:
+            page = dict(pages.get(url, {}), name=name)
+        try:
+            outcome, page = _fetch(local.session, url, page, limiter, timeout)
+        except Exception as exc:
+            log.warning("badge page %s failed: %s", url, exc)
+            outcome, page = "failed", dict(page, checked=_now(), error=str(exc) or type(exc).__name__)
+        return url, outcome, page
+
+    pool = ThreadPoolExecutor(max_workers=max(1, concurrency), thread_name_prefix="crawl")
+    try:
+        futures = [pool.submit(work, name, url) for name, url in todo]
+        for fut in as_completed(futures):
+            url, outcome, page = fut.result()
+            with lock:
+                pages[url] = page
+            summary[outcome] += 1
+            _PAGES.inc(outcome=outcome)
+            done += 1
+            jobs.progress(done / len(todo), f"{done}/{len(todo)} badge pages")
+            if done % CHECKPOINT_EVERY == 0:
+                with lock:
+                    data_store.save_crawl_state(state)
+        run["finished"] = _now()
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)   # don't keep crawling after an interrupt
+        with lock:
+            data_store.save_crawl_state(state)          # interrupted runs resume from here
+
+    summary["updated"] = _apply(targets, pages) if apply else 0
+    return summary
+
+
+def _apply(targets: Dict[str, str], pages: Dict[str, Dict[str, Any]]) -> int:
+    """Copy crawled requirements/sessions onto the badge records."""
+    found = {
+        name: pages[url] for name, url in targets.items()
+        if url in pages and "requirements" in pages[url] and pages[url]["requirements"]
+    }
+    changed: List[str] = []
+
+    def mutate(badges: Dict[str, Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+        changed.clear()
+        for name, page in found.items():
+            rec = badges.get(name)
+            if rec is None:
+                continue
+            if rec.get("requirements") != page["requirements"] or rec.get("sessions") != page["sessions"]:
+                rec["requirements"] = page["requirements"]
+                rec["sessions"] = page["sessions"]
+                changed.append(name)
+        return badges
+
+    # skip the write entirely when nothing moved
+    current = data_store.load_badges()
+    mutate(current)
+    if changed:
+        data_store.update_badges(mutate, changed=changed)
+        snapshot.publish()
+    return len(changed)
+
+
+def main(argv=None) -> None:
+    ap = argparse.ArgumentParser(description="Crawl badge detail pages for requirements")
+    ap.add_argument("--concurrency", type=int, default=CONCURRENCY)
+    ap.add_argument("--rate", type=float, default=RATE, help="requests/second per host")
+    ap.add_argument("--burst", type=int, default=BURST)
+    ap.add_argument("--restart", action="store_true", help="ignore an unfinished earlier run")
+    args = ap.parse_args(argv)
+    logging.basicConfig(level=logging.INFO)
+    summary = crawl_badge_details(concurrency=args.concurrency, rate=args.rate,
+                                  burst=args.burst, resume=not args.restart)
+    print(", ".join(f"{k}: {v}" for k, v in summary.items()))
+
+
+if __name__ == "__main__":
+    main()
@@ -6,8 +6,14 @@ from __future__ import annotations
 import json
 import os
 import typing as _t
+from contextlib import contextmanager
+from pathlib import Path
 
-_BADGE_FILE = os.path.join(os.path.dirname(__file__), "badges.json")
+from . import codec, data_store, snapshot
+from .badge_stats import BadgeStats
+
+_BADGE_FILE = os.getenv("BADGE_FILE_PATH") or os.path.join(os.path.dirname(__file__), "badges.json")
+_CODEC = codec.configured()          # SCOUT_STORE_CODEC; reads auto-detect
 Badge = dict[str, _t.Any]
 
 # --------------------------------------------------------------------------- #
@@ -17,12 +23,46 @@ Badge = dict[str, _t.Any]
 def _read() -> dict[str, Badge]:
     if not os.path.exists(_BADGE_FILE):
         return {}
-    with open(_BADGE_FILE, encoding="utf-8") as fh:
-        return _t.cast(dict[str, Badge], json.load(fh))
+    with open(_BADGE_FILE, "rb") as fh:
+        return _t.cast(dict[str, Badge], codec.loads(fh.read()))
+
+def _write(data: dict[str, Badge], stats: _t.Optional[BadgeStats] = None) -> None:
+    """Atomic replace of the badge file (then its counters); hold ``_locked()``."""
+    data_store._atomic_write_bytes(Path(_BADGE_FILE), _CODEC.dumps(data))
+    _write_stats(stats or BadgeStats.from_badges(data.values()))
+
+def _locked() -> _t.ContextManager[None]:
+    """Serialise writers of the badge file (``<badge file>.lock``)."""
+    return data_store._lock_file(Path(_BADGE_FILE + ".lock"))
+
+# --------------------------------------------------------------------------- #
+# Materialised progress counters (sidecar next to the badge file)
+# --------------------------------------------------------------------------- #
+
+def _stats_file() -> str:
+    return os.path.splitext(_BADGE_FILE)[0] + ".stats.json"
+
+def _file_tag() -> _t.Optional[str]:
+    """Identifies the badge file contents the counters were computed for."""
+    try:
+        st = os.stat(_BADGE_FILE)
+    except FileNotFoundError:
+        return None
+    return f"{st.st_ino}:{st.st_mtime_ns}:{st.st_size}"
 
-def _write(data: dict[str, Badge]) -> None:
-    with open(_BADGE_FILE, "w", encoding="utf-8") as fh:
-        json.dump(data, fh, indent=2)
+def _write_stats(stats: BadgeStats) -> None:
+    data = json.dumps(stats.to_dict(_file_tag()))
+    data_store._atomic_write_text(Path(_stats_file()), data)
+
+def _cached_stats() -> _t.Optional[BadgeStats]:
+    try:
+        with open(_stats_file(), encoding="utf-8") as fh:
+            data = json.load(fh)
+        if data.get("version") == _file_tag():
+            return BadgeStats.from_dict(data)
+    except (OSError, ValueError, KeyError):
+        pass
+    return None
 
 # --------------------------------------------------------------------------- #
 # Public helpers used by GUI
@@ -31,6 +71,27 @@ def _write(data: dict[str, Badge]) -> None:
 def get_all_badges() -> dict[str, Badge]:
     return _read()
 
+def get_badge_stats() -> BadgeStats:
+    """O(1) progress counters; rebuilt from the file if they are missing or stale."""
+    if not os.path.exists(_BADGE_FILE):
+        return BadgeStats()
+    stats = _cached_stats()
+    if stats is None:
+        with _locked():
+            stats = BadgeStats.from_badges(_read().values())
+            _write_stats(stats)
+    return stats
+
+def verify_badge_stats() -> bool:
+    """Rebuild the counters from scratch; return whether the cached ones matched."""
+    with _locked():
+        cached = _cached_stats()
+        if not os.path.exists(_BADGE_FILE):
+            return cached is None
+        fresh = BadgeStats.from_badges(_read().values())
+        _write_stats(fresh)
+    return cached == fresh
+
 def get_completed_badges() -> list[Badge]:
     return [
         b for b in _read().values()
@@ -38,13 +99,8 @@ def get_completed_badges() -> list[Badge]:
     ]
 
 def mark_badge_completed(name: str) -> bool:
-    badges = _read()
-    if name not in badges:
-        return False
-    badges[name]["status"] = "Completed"
-    badges[name]["completion"] = 100
-    _write(badges)
-    return True
+    with batch() as b:
+        return b.mark_completed(name)
 
 def mark_badge_incomplete(name: str) -> bool:
     """
@@ -53,10 +109,129 @@ def mark_badge_incomplete(name: str) -> bool:
     Resets a badge to “Not Started” and 0 % completion.
     Returns True if the badge existed, False otherwise.
     """
-    badges = _read()
-    if name not in badges:
+    with batch() as b:
+        return b.mark_incomplete(name)
+
+# --------------------------------------------------------------------------- #
+# Bulk edits: one read, one write
+# --------------------------------------------------------------------------- #
+
+class BadgeBatch:
+    """
+    Buffered edits to the badge file.  Every method changes the in-memory
+    copy, keeps the progress counters in step and records a per-item result
+    in ``results`` (``changed`` lists the badges an edit actually altered);
+    ``commit()`` writes once (and not at all if nothing changed).  Use
+    through ``batch()``.
+    """
+
+    def __init__(self) -> None:
+        self._tag = _file_tag()
+        self.badges = _read()
+        self.stats = _cached_stats() or BadgeStats.from_badges(self.badges.values())
+        self.results: list[tuple[str, str, bool]] = []    # (op, name, ok)
+        self.changed: list[str] = []                       # names an edit altered
+        self._edits: dict[str, dict[str, _t.Any]] = {}     # name → fields changed
+        self._dirty = False
+
+    def _record(self, op: str, name: str, ok: bool) -> bool:
+        self.results.append((op, name, ok))
+        return ok
+
+    def update(self, name: str, **fields: _t.Any) -> bool:
+        """Set arbitrary *fields* on badge *name*; False if it doesn't exist."""
+        badge = self.badges.get(name)
+        if badge is None:
+            return self._record("update", name, False)
+        if _apply(badge, fields, self.stats):
+            self.changed.append(name)
+            self._edits.setdefault(name, {}).update(fields)
+            self._dirty = True
+        return self._record("update", name, True)
+
+    def mark_completed(self, name: str) -> bool:
+        return self.update(name, status="Completed", completion=100)
+
+    def mark_incomplete(self, name: str) -> bool:
+        return self.update(name, status="Not Started", completion=0)
+
+    def set_completion(self, name: str, completion: int) -> bool:
+        """Set the percentage; status follows (0 → Not Started, 100 → Completed)."""
+        completion = max(0, min(100, int(completion)))
+        status = ("Completed" if completion == 100
+                  else "Not Started" if completion == 0 else "In Progress")
+        return self.update(name, status=status, completion=completion)
+
+    @property
+    def failed(self) -> list[str]:
+        return [name for _, name, ok in self.results if not ok]
+
+    def _rebase(self) -> None:
+        """Replay the buffered edits on the file as it is now (someone else wrote)."""
+        self.badges = _read()
+        self.stats = _cached_stats() or BadgeStats.from_badges(self.badges.values())
+        for name, fields in self._edits.items():
+            badge = self.badges.get(name)
+            if badge is not None:
+                _apply(badge, fields, self.stats)
+
+    def commit(self) -> bool:
+        """Write the file once if anything changed; return whether it was written."""
+        if not self._dirty:
+            return False
+        with _locked():
+            if _file_tag() != self._tag:
+                self._rebase()
+            _write(self.badges, self.stats)
+            self._tag = _file_tag()
+            _mirror(self._edits)                 # under the lock: the stores can't drift
+        self._edits = {}
+        self._dirty = False
+        return True
+
+def _apply(badge: Badge, fields: dict[str, _t.Any], stats: BadgeStats) -> bool:
+    """Set *fields* on *badge*, keeping *stats* in step; False if nothing changed."""
+    if all(badge.get(k) == v for k, v in fields.items()):
         return False
-    badges[name]["status"] = "Not Started"
-    badges[name]["completion"] = 0
-    _write(badges)
+    old = dict(badge)
+    badge.update(fields)
+    stats.replace(old, badge)
     return True
+
+def _mirror(edits: dict[str, dict[str, _t.Any]]) -> None:
+    """
+    Repeat *edits* on the badges ``data_store`` also holds, so the counters
+    the dashboard reads (``data_store.load_badge_stats``) follow marks made
+    here; only the edited badges are re-counted.  Which of them the store
+    has is looked up in the mapped catalogue snapshot, so a batch touching
+    none of them costs no store read or write.
+    """
+    if not edits:
+        return
+    catalogue = snapshot.current().badges
+    present = [name for name in edits if name in catalogue]
+    if not present:
+        return
+
+    def apply(badges: dict[str, Badge]) -> dict[str, Badge]:
+        for name in present:
+            if name in badges:
+                badges[name].update(edits[name])
+        return badges
+
+    data_store.update_badges(apply, changed=present)
+
+@contextmanager
+def batch() -> _t.Iterator[BadgeBatch]:
+    """
+    ``with batch() as b: b.mark_completed(...); ...`` – committed on a clean
+    exit, discarded if the block raises.
+    """
+    b = BadgeBatch()
+    yield b
+    b.commit()
+
+def apply_updates(updates: _t.Iterable[tuple[str, dict[str, _t.Any]]]) -> dict[str, bool]:
+    """Apply ``(name, fields)`` pairs in one transaction; return ``{name: found}``."""
+    with batch() as b:
+        return {name: b.update(name, **fields) for name, fields in updates}
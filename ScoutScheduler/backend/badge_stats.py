@@ -0,0 +1,121 @@
+"""
+Materialised badge-progress counters.
+
+``BadgeStats`` holds running totals – badges per status, per section and
+status, and the completion sum – so a summary is O(1) (O(sections) for the
+per-section breakdown) instead of a pass over every badge.  Writers keep it
+current with ``add`` / ``remove`` / ``replace`` for single-badge changes, or
+``from_badges`` after a wholesale save.
+
+The counters are persisted next to the badge file together with the badge
+store version they describe; a reader that finds a different version
+rebuilds them, so they can never silently drift.  ``verify`` rebuilds from
+scratch and reports whether the stored counters were right.
+"""
+from __future__ import annotations
+
+from typing import Any, Dict, Iterable, Optional
+
+Badge = Dict[str, Any]
+
+DEFAULT_STATUS = "Not Started"
+NO_SECTION = "—"
+
+
+def _key(badge: Badge):
+    return badge.get("section") or NO_SECTION, badge.get("status") or DEFAULT_STATUS
+
+
+class BadgeStats:
+    __slots__ = ("total", "completion_sum", "by_status", "by_section")
+
+    def __init__(self) -> None:
+        self.total = 0
+        self.completion_sum = 0.0
+        self.by_status: Dict[str, int] = {}
+        self.by_section: Dict[str, Dict[str, int]] = {}
+
+    # ----------------------------- building ------------------------------ #
+    @classmethod
+    def from_badges(cls, badges: Iterable[Badge]) -> "BadgeStats":
+        stats = cls()
+        for b in badges:
+            stats.add(b)
+        return stats
+
+    def _bump(self, badge: Badge, sign: int) -> None:
+        section, status = _key(badge)
+        self.total += sign
+        self.completion_sum += sign * float(badge.get("completion") or 0)
+        self.by_status[status] = self.by_status.get(status, 0) + sign
+        per = self.by_section.setdefault(section, {})
+        per[status] = per.get(status, 0) + sign
+        if not per[status]:
+            del per[status]
+            if not per:
+                del self.by_section[section]
+        if not self.by_status[status]:
+            del self.by_status[status]
+
+    def add(self, badge: Badge) -> None:
+        self._bump(badge, +1)
+
+    def remove(self, badge: Badge) -> None:
+        self._bump(badge, -1)
+
+    def replace(self, old: Optional[Badge], new: Optional[Badge]) -> None:
+        """Account for one badge changing from *old* to *new* (either may be None)."""
+        if old is not None:
+            self.remove(old)
+        if new is not None:
+            self.add(new)
+
+    # ----------------------------- reading ------------------------------- #
+    def count(self, status: Optional[str] = None, section: Optional[str] = None) -> int:
+        if section is None:
+            return self.total if status is None else self.by_status.get(status, 0)
+        per = self.by_section.get(section, {})
+        return sum(per.values()) if status is None else per.get(status, 0)
+
+    @property
+    def average_completion(self) -> float:
+        return self.completion_sum / self.total if self.total else 0.0
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "total": self.total,
+            "completed": self.by_status.get("Completed", 0),
+            "average_completion": round(self.average_completion, 1),
+            "by_status": dict(self.by_status),
+            "by_section": {s: dict(c) for s, c in self.by_section.items()},
+        }
+
+    # --------------------------- persistence ----------------------------- #
+    def to_dict(self, version: int) -> Dict[str, Any]:
+        return {
+            "version": version,
+            "total": self.total,
+            "completion_sum": self.completion_sum,
+            "by_status": self.by_status,
+            "by_section": self.by_section,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "BadgeStats":
+        stats = cls()
+        stats.total = data["total"]
+        stats.completion_sum = data["completion_sum"]
+        stats.by_status = dict(data["by_status"])
+        stats.by_section = {s: dict(c) for s, c in data["by_section"].items()}
+        return stats
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, BadgeStats):
+            return NotImplemented
+        return (self.total == other.total
+                and abs(self.completion_sum - other.completion_sum) < 1e-6
+                and self.by_status == other.by_status
+                and self.by_section == other.by_section)
+
+    def __repr__(self) -> str:
+        return f"BadgeStats(total={self.total}, by_status={self.by_status})"
@@ -0,0 +1,138 @@
+"""
+iCalendar (.ics) feed of the event store.
+
+Mounted on the FastAPI app in ``badge.py`` as ``GET /calendar.ics``.
+Calendar clients poll feeds every few minutes, so:
+
+* the ``ETag`` is derived from the events store version and the date window
+  alone – a matching ``If-None-Match`` is answered with ``304`` without
+  touching ``events.json``;
+* a rendered feed is cached per (version, window) and replayed verbatim;
+* a cache miss streams VEVENTs straight from the shared ``EventTable``
+  (``data_store.load_event_table``) – the window is found on the day
+  column and only the recurring rows are expanded – filling the cache on
+  the way through.
+"""
+from __future__ import annotations
+
+import datetime as dt
+import hashlib
+from typing import Any, Dict, Iterator, List, Optional
+
+from cachetools import LRUCache
+from fastapi import APIRouter, Header, Query
+from fastapi.responses import Response, StreamingResponse
+
+from .data_store import load_event_table, store_version
+from .event_table import EventTable
+from .recurrence import expand_table
+
+router = APIRouter()
+
+ICS_MEDIA_TYPE = "text/calendar; charset=utf-8"
+PAST_DAYS = 30
+FUTURE_DAYS = 365
+
+_feed_cache: LRUCache = LRUCache(maxsize=32)
+
+
+# --------------------------------------------------------------------------- #
+# iCalendar text helpers (RFC 5545)
+# --------------------------------------------------------------------------- #
+def _escape(text: str) -> str:
+    return (text.replace("\\", "\\\\").replace(";", "\\;")
+                .replace(",", "\\,").replace("\r\n", "\\n").replace("\n", "\\n"))
+
+
+def _fold(line: str) -> str:
+    """Fold content lines at 75 octets as the RFC requires."""
+    raw = line.encode("utf-8")
+    if len(raw) <= 75:
+        return line + "\r\n"
+    parts: List[str] = []
+    limit = 75
+    while raw:
+        cut = min(limit, len(raw))
+        while cut < len(raw) and (raw[cut] & 0xC0) == 0x80:   # don't split a UTF-8 char
+            cut -= 1
+        parts.append(raw[:cut].decode("utf-8"))
+        raw = raw[cut:]
+        limit = 74                                           # leading space counts
+    return "\r\n ".join(parts) + "\r\n"
+
+
+def _vevent(ev: Dict[str, Any], stamp: str) -> str:
+    day = dt.date.fromisoformat(ev["date"][:10])
+    uid_src = f"{ev.get('title', '')}|{ev.get('recurrence_id', ev['date'])}"
+    uid = hashlib.sha1(uid_src.encode("utf-8")).hexdigest()
+    lines = [
+        "BEGIN:VEVENT",
+        f"UID:{uid}@scout-scheduler",
+        f"DTSTAMP:{stamp}",
+        f"DTSTART;VALUE=DATE:{day:%Y%m%d}",
+        f"DTEND;VALUE=DATE:{day + dt.timedelta(days=1):%Y%m%d}",
+        f"SUMMARY:{_escape(ev.get('title', ''))}",
+    ]
+    if ev.get("description"):
+        lines.append(f"DESCRIPTION:{_escape(ev['description'])}")
+    lines.append("END:VEVENT")
+    return "".join(_fold(l) for l in lines)
+
+
+def render_feed(table: EventTable, start: dt.date, end: dt.date) -> Iterator[str]:
+    """Yield the calendar text chunk by chunk (header, one VEVENT each, footer)."""
+    stamp = dt.datetime.now(dt.timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    yield ("BEGIN:VCALENDAR\r\nVERSION:2.0\r\nPRODID:-//Scout Scheduler//EN\r\n"
+           "CALSCALE:GREGORIAN\r\nX-WR-CALNAME:Scout sessions\r\n")
+    for ev in expand_table(table, start, end):
+        yield _vevent(ev, stamp)
+    yield "END:VCALENDAR\r\n"
+
+
+def _etag(version: int, start: dt.date, end: dt.date) -> str:
+    return f'"ev{version}-{start:%Y%m%d}-{end:%Y%m%d}"'
+
+
+def _caching(chunks: Iterator[str], key: tuple) -> Iterator[bytes]:
+    """Pass chunks through to the client and cache the full body at the end."""
+    body: List[bytes] = []
+    for chunk in chunks:
+        data = chunk.encode("utf-8")
+        body.append(data)
+        yield data
+    _feed_cache[key] = b"".join(body)
+
+
+# --------------------------------------------------------------------------- #
+# Route
+# --------------------------------------------------------------------------- #
+@router.get("/calendar.ics")
+def calendar_feed(
+    start: Optional[dt.date] = Query(None, description="first day (default: 30 days ago)"),
+    end: Optional[dt.date] = Query(None, description="last day (default: a year ahead)"),
+    if_none_match: Optional[str] = Header(None),
+):
+    """
+    Return the schedule as an iCalendar feed for ``[start, end]``.
+    """
+    today = dt.date.today()
+    start = start or today - dt.timedelta(days=PAST_DAYS)
+    end = end or today + dt.timedelta(days=FUTURE_DAYS)
+
+    etag = _etag(store_version("events"), start, end)
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if if_none_match and etag in (t.strip() for t in if_none_match.split(",")):
+        return Response(status_code=304, headers=headers)
+
+    key = (etag,)
+    if key in _feed_cache:
+        return Response(_feed_cache[key], media_type=ICS_MEDIA_TYPE, headers=headers)
+
+    table, version = load_event_table()
+    etag = _etag(version, start, end)            # the data we actually read
+    headers["ETag"] = etag
+    return StreamingResponse(
+        _caching(render_feed(table, start, end), (etag,)),
+        media_type=ICS_MEDIA_TYPE,
+        headers=headers,
+    )
@@ -0,0 +1,176 @@
+"""
+Serialisation codecs for the persisted stores.
+
+A codec is a serialiser plus an optional compressor, written as
+``"<serialiser>[+<compression>]"``:
+
+==============  ==========================================================
+``json``        pretty stdlib JSON (``indent=2``) – the default, diffable,
+                and what exports use
+``orjson``      compact JSON via orjson (falls back to stdlib if missing)
+``msgpack``     MessagePack – smaller and faster to decode than JSON
+``+gzip``       stdlib gzip
+``+zstd``       Zstandard (``zstandard`` package)
+==============  ==========================================================
+
+Plain JSON (``json`` / ``orjson`` without compression) is written as is, so
+those files stay readable by any JSON tool.  Everything else starts with a
+six-byte header – ``b"\\0SCD"`` then one byte each for the serialiser and
+the compressor – which no JSON document can begin with.  ``loads``
+inspects the first bytes, so readers never need to know which codec wrote
+a file and the configured codec can be changed at any time: existing files
+are read as they are and converted on their next write.
+
+    SCOUT_STORE_CODEC=msgpack+zstd streamlit run ScoutScheduler/streamlit_app.py
+"""
+from __future__ import annotations
+
+import gzip
+import json
+import os
+from dataclasses import dataclass
+from typing import Any
+
+try:
+    import orjson
+except ImportError:          # pragma: no cover - orjson is optional
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:          # pragma: no cover - msgpack is optional
+    msgpack = None
+
+try:
+    import zstandard
+except ImportError:          # pragma: no cover - zstandard is optional
+    zstandard = None
+
+MAGIC = b"\0SCD"
+HEADER_SIZE = len(MAGIC) + 2
+
+SERIALISERS = ("json", "orjson", "msgpack")
+COMPRESSIONS = ("none", "gzip", "zstd")
+
+# wire ids – append only, never renumber
+_SER_ID = {"json": 1, "orjson": 2, "msgpack": 3}
+_COMP_ID = {"none": 0, "gzip": 1, "zstd": 2}
+_SER_NAME = {v: k for k, v in _SER_ID.items()}
+_COMP_NAME = {v: k for k, v in _COMP_ID.items()}
+
+GZIP_LEVEL = 6
+ZSTD_LEVEL = 3
+
+
+class CodecError(ValueError):
+    """Unknown codec name, missing optional package, or an unreadable header."""
+
+
+@dataclass(frozen=True)
+class Codec:
+    serialiser: str = "json"
+    compression: str = "none"
+
+    @classmethod
+    def parse(cls, spec: str) -> "Codec":
+        ser, _, comp = spec.strip().lower().partition("+")
+        codec = cls(ser or "json", comp or "none")
+        if codec.serialiser not in SERIALISERS:
+            raise CodecError(f"unknown serialiser {codec.serialiser!r} (choose from {SERIALISERS})")
+        if codec.compression not in COMPRESSIONS:
+            raise CodecError(f"unknown compression {codec.compression!r} (choose from {COMPRESSIONS})")
+        if codec.serialiser == "msgpack" and msgpack is None:
+            raise CodecError("msgpack codec needs the 'msgpack' package")
+        if codec.compression == "zstd" and zstandard is None:
+            raise CodecError("zstd compression needs the 'zstandard' package")
+        return codec
+
+    def __str__(self) -> str:
+        return self.serialiser if self.compression == "none" else f"{self.serialiser}+{self.compression}"
+
+    @property
+    def plain_json(self) -> bool:
+        return self.serialiser != "msgpack" and self.compression == "none"
+
+    def dumps(self, obj: Any) -> bytes:
+        body = _serialise(self.serialiser, obj)
+        if self.plain_json:
+            return body
+        header = MAGIC + bytes((_SER_ID[self.serialiser], _COMP_ID[self.compression]))
+        return header + _compress(self.compression, body)
+
+
+def _serialise(name: str, obj: Any) -> bytes:
+    if name == "json":
+        return json.dumps(obj, indent=2).encode("utf-8")
+    if name == "orjson":
+        if orjson is None:
+            return json.dumps(obj, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+        return orjson.dumps(obj)
+    return msgpack.packb(obj, use_bin_type=True)
+
+
+def _compress(name: str, data: bytes) -> bytes:
+    if name == "gzip":
+        return gzip.compress(data, compresslevel=GZIP_LEVEL, mtime=0)
+    if name == "zstd":
+        return zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(data)
+    return data
+
+
+def _decompress(name: str, data: bytes) -> bytes:
+    if name == "gzip":
+        return gzip.decompress(data)
+    if name == "zstd":
+        if zstandard is None:
+            raise CodecError("file is zstd-compressed but 'zstandard' is not installed")
+        return zstandard.ZstdDecompressor().decompress(data)
+    return data
+
+
+def _parse_json(data: bytes) -> Any:
+    return orjson.loads(data) if orjson is not None else json.loads(data)
+
+
+def detect(data: bytes) -> Codec:
+    """The codec that wrote *data* (plain JSON if there is no header)."""
+    if not data.startswith(MAGIC):
+        return Codec("json")
+    if len(data) < HEADER_SIZE:
+        raise CodecError("truncated codec header")
+    try:
+        return Codec(_SER_NAME[data[4]], _COMP_NAME[data[5]])
+    except KeyError:
+        raise CodecError(f"unknown codec ids {data[4]}/{data[5]}") from None
+
+
+def loads(data: bytes) -> Any:
+    """Decode bytes written by any codec."""
+    if not data.startswith(MAGIC):
+        return _parse_json(data)
+    codec = detect(data)
+    body = _decompress(codec.compression, data[HEADER_SIZE:])
+    if codec.serialiser == "msgpack":
+        if msgpack is None:
+            raise CodecError("file is MessagePack but 'msgpack' is not installed")
+        return msgpack.unpackb(body, raw=False, strict_map_key=False)
+    return _parse_json(body)
+
+
+def dumps(obj: Any, codec: "Codec | str | None" = None) -> bytes:
+    """Encode with *codec* (default: the configured one)."""
+    if codec is None:
+        codec = configured()
+    elif isinstance(codec, str):
+        codec = Codec.parse(codec)
+    return codec.dumps(obj)
+
+
+def export_json(obj: Any) -> str:
+    """Pretty JSON for downloads and hand editing, whatever the store codec."""
+    return json.dumps(obj, indent=2)
+
+
+def configured() -> Codec:
+    """The codec named by ``SCOUT_STORE_CODEC`` (default ``json``)."""
+    return Codec.parse(os.getenv("SCOUT_STORE_CODEC", "json"))
@@ -1,6 +1,7 @@
 # ScoutScheduler/backend/data_models.py
 
-from typing import List, Optional
+import sys
+from typing import Dict, List, Optional
 from pydantic import BaseModel
 
 class Badge(BaseModel):
@@ -16,3 +17,77 @@ class Session(BaseModel):
 class Preferences(BaseModel):
     # example field — add whatever you need here
     default_schedule: List[Session] = []
+
+
+class BadgeRecord:
+    """
+    Compact, slot-based badge record for bulk in-memory work.
+
+    Mirrors one value of ``badges.json``; ``section``/``status`` are interned
+    and ``requirements`` is a tuple.  Unknown keys survive in ``extra``.
+    """
+
+    __slots__ = ("name", "section", "status", "completion", "sessions",
+                 "description", "requirements", "extra")
+
+    _KEYS = ("name", "section", "status", "completion", "sessions",
+             "description", "requirements")
+
+    def __init__(
+        self,
+        name: str,
+        section: str = "",
+        status: str = "Not Started",
+        completion: int = 0,
+        sessions: int = 1,
+        description: str = "",
+        requirements: tuple = (),
+        extra: Optional[dict] = None,
+    ) -> None:
+        self.name = name
+        self.section = sys.intern(section)
+        self.status = sys.intern(status)
+        self.completion = completion
+        self.sessions = sessions
+        self.description = description
+        self.requirements = tuple(requirements)
+        self.extra = extra
+
+    @classmethod
+    def from_dict(cls, name: str, data: dict) -> "BadgeRecord":
+        extra = {k: v for k, v in data.items() if k not in cls._KEYS}
+        return cls(
+            name=data.get("name", name),
+            section=data.get("section", ""),
+            status=data.get("status", "Not Started"),
+            completion=data.get("completion", 0),
+            sessions=data.get("sessions", 1),
+            description=data.get("description", ""),
+            requirements=tuple(data.get("requirements", ())),
+            extra=extra or None,
+        )
+
+    def to_dict(self) -> dict:
+        out = {
+            "name":         self.name,
+            "sessions":     self.sessions,
+            "status":       self.status,
+            "completion":   self.completion,
+            "description":  self.description,
+            "requirements": list(self.requirements),
+            "section":      self.section,
+        }
+        if self.extra:
+            out.update(self.extra)
+        return out
+
+    def __repr__(self) -> str:
+        return f"BadgeRecord({self.name!r}, {self.status!r}, {self.completion}%)"
+
+
+def badges_from_dicts(badges: Dict[str, dict]) -> Dict[str, BadgeRecord]:
+    return {n: BadgeRecord.from_dict(n, b) for n, b in badges.items()}
+
+
+def badges_to_dicts(records: Dict[str, BadgeRecord]) -> Dict[str, dict]:
+    return {n: r.to_dict() for n, r in records.items()}
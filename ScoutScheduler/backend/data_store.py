@@ -1,35 +1,345 @@
 """
-Unified JSON persistence for badges, events and holidays.
+Unified persistence for badges, events and holidays.
 
 All Streamlit pages should import *only* from this module.
+
+Concurrency model
+-----------------
+Several Streamlit sessions and the FastAPI app share the files in
+``DATA_DIR``.  Writes are made safe across processes by:
+
+* writing to a temp file in the same directory and ``os.replace``-ing it over
+  the target, so readers only ever see a complete file;
+* holding an advisory lock (``<name>.lock``) for the short compare-and-swap;
+* bumping a monotonically increasing version (``<name>.version``) on every
+  write.  ``save_*(..., expected_version=v)`` raises ``StaleWriteError`` if
+  someone else wrote in between, and ``update_*`` re-applies a mutator on the
+  fresh copy until it wins.
+
+The payload and its version are two files, so the version file is stamped
+with the payload it describes: its inode / size / mtime (a cheap ``stat``
+check for ``store_version``) and a length + CRC-32 digest of its bytes.  A
+versioned read takes the version only if the digest matches the bytes it
+actually read; a mismatch means a writer is between its two renames – or
+died there – and is settled under the lock (``_repair``), so a payload is
+never paired with another write's version.
+
+Reads take the lock only to settle such a mismatch.
+
+Files are encoded with ``CODEC`` (``SCOUT_STORE_CODEC``, default pretty
+JSON – see ``codec``); reads auto-detect the codec, so switching it only
+changes how the next write of each store is encoded.
+
+In-process observers (e.g. the availability index) can ``subscribe`` to
+single-record changes made through ``add_*`` / ``remove_*`` and to
+whole-store writes.
 """
 from __future__ import annotations
 
+import copy
 import json
 import os
+import tempfile
+import threading
+import zlib
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import Any, Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+from . import codec, metrics
+from .badge_stats import BadgeStats
+from .event_table import EventTable
+
+if os.name == "nt":  # pragma: no cover - exercised on Windows only
+    import msvcrt
+else:
+    import fcntl
 
 ROOT = Path(__file__).resolve().parents[1]
 DATA_DIR = ROOT / "data"
 DATA_DIR.mkdir(exist_ok=True)
 
+MAX_RETRIES = 10
+CODEC = codec.configured()
+
+_CONFLICTS = metrics.counter("scout_store_conflicts_total", "optimistic write retries")
+
+Listener = Callable[[str, str, Dict[str, Any]], None]
+_listeners: List[Listener] = []
+
+
+class StaleWriteError(RuntimeError):
+    """Raised when a save was based on an older version of the store."""
+
+    def __init__(self, name: str, expected: int, actual: int) -> None:
+        super().__init__(f"{name}: expected version {expected}, store is at {actual}")
+        self.name = name
+        self.expected = expected
+        self.actual = actual
+
+
 # --------------------------- generic helpers --------------------------- #
 def _path(name: str) -> Path:
     return DATA_DIR / f"{name}.json"
 
 
+def _version_path(name: str) -> Path:
+    return DATA_DIR / f"{name}.version"
+
+
+@contextmanager
+def _locked(name: str) -> Iterator[None]:
+    """Exclusive advisory lock on ``<name>.lock`` (blocks until acquired)."""
+    with _lock_file(DATA_DIR / f"{name}.lock"):
+        yield
+
+
+@contextmanager
+def _lock_file(lock: Path) -> Iterator[None]:
+    """Exclusive advisory lock on the file *lock*; not re-entrant."""
+    with lock.open("a+b") as fh:
+        if os.name == "nt":  # pragma: no cover
+            fh.seek(0)
+            msvcrt.locking(fh.fileno(), msvcrt.LK_LOCK, 1)
+        else:
+            fcntl.flock(fh.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if os.name == "nt":  # pragma: no cover
+                fh.seek(0)
+                msvcrt.locking(fh.fileno(), msvcrt.LK_UNLCK, 1)
+            else:
+                fcntl.flock(fh.fileno(), fcntl.LOCK_UN)
+
+
+def _atomic_write_text(file: Path, text: str) -> None:
+    _atomic_write_bytes(file, text.encode("utf-8"))
+
+
+def _atomic_write_bytes(file: Path, data: bytes) -> None:
+    """Write *data* to a sibling temp file, fsync it, then rename over *file*."""
+    fd, tmp = tempfile.mkstemp(dir=file.parent, prefix=f".{file.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as fh:
+            fh.write(data)
+            fh.flush()
+            os.fsync(fh.fileno())
+        os.replace(tmp, file)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except FileNotFoundError:
+            pass
+        raise
+
+
+_MISSING = "-"        # stamp of a payload file that doesn't exist
+
+
+class _Stamp(NamedTuple):
+    """``<name>.version``: the version and the payload it was written with."""
+
+    version: int
+    identity: Optional[str] = None   # inode:size:mtime; None in pre-stamp files
+    digest: Optional[str] = None     # length:crc32 of the payload bytes
+
+    def __str__(self) -> str:
+        return f"{self.version} {self.identity} {self.digest}"
+
+
+def _identity(st: os.stat_result) -> str:
+    return f"{st.st_ino}:{st.st_size}:{st.st_mtime_ns}"
+
+
+def _digest(data: Optional[bytes]) -> str:
+    return _MISSING if data is None else f"{len(data)}:{zlib.crc32(data):08x}"
+
+
+def _payload_identity(name: str) -> str:
+    try:
+        return _identity(_path(name).stat())
+    except FileNotFoundError:
+        return _MISSING
+
+
+def _read_stamp(name: str) -> _Stamp:
+    try:
+        fields = _version_path(name).read_text(encoding="utf-8").split()
+    except FileNotFoundError:
+        return _Stamp(0, _MISSING, _MISSING)    # never written: there is no payload
+    if not fields:
+        return _Stamp(0, _MISSING, _MISSING)
+    return _Stamp(int(fields[0]), *fields[1:3])
+
+
+def _repair(name: str, verify: bool = False) -> int:
+    """
+    Current version, with the lock held.  If the payload on disk isn't the
+    one the version file describes (a writer died between its renames),
+    count it as a write of its own and stamp it.  *verify* compares the
+    payload's digest rather than its ``stat``.
+    """
+    stamp = _read_stamp(name)
+    identity = _payload_identity(name)
+    if stamp.identity is None or (stamp.identity == identity and not verify):
+        return stamp.version
+    try:
+        data: Optional[bytes] = _path(name).read_bytes()
+    except FileNotFoundError:
+        data = None
+    if verify and stamp.digest == _digest(data):
+        return stamp.version
+    version = stamp.version + 1
+    _atomic_write_text(_version_path(name), str(_Stamp(version, identity, _digest(data))))
+    return version
+
+
+def store_version(name: str) -> int:
+    """Current version of store *name* (0 if it has never been written)."""
+    stamp = _read_stamp(name)
+    if stamp.identity is None or stamp.identity == _payload_identity(name):
+        return stamp.version
+    with _locked(name):                  # a write is half done: wait for it
+        return _repair(name)
+
+
 def _read(name: str, default: Any) -> Any:
     file = _path(name)
     if not file.exists():
         return default
-    with file.open(encoding="utf-8") as fh:
-        return json.load(fh)
+    with metrics.span("scout_store_io_seconds", store=name, op="read"):
+        return codec.loads(file.read_bytes())
+
+
+def _read_versioned(name: str, default: Any) -> Tuple[Any, int]:
+    """
+    Consistent read: the payload is taken with the version only if the
+    version file's digest matches the bytes read; otherwise the mismatch is
+    settled under the lock and the read repeated.
+    """
+    while True:
+        try:
+            data: Optional[bytes] = _path(name).read_bytes()
+        except FileNotFoundError:
+            data = None
+        stamp = _read_stamp(name)
+        if stamp.digest is None or stamp.digest == _digest(data):
+            if data is None:
+                return default, stamp.version
+            with metrics.span("scout_store_io_seconds", store=name, op="read"):
+                return codec.loads(data), stamp.version
+        with _locked(name):
+            _repair(name, verify=True)
+
+
+def _write(name: str, payload: Any, expected_version: Optional[int] = None) -> int:
+    """Atomically replace store *name*; return the new version."""
+    with metrics.span("scout_store_io_seconds", store=name, op="write"), _locked(name):
+        current = _repair(name)
+        if expected_version is not None and expected_version != current:
+            raise StaleWriteError(name, expected_version, current)
+        data = CODEC.dumps(payload)
+        _atomic_write_bytes(_path(name), data)
+        stamp = _Stamp(current + 1, _payload_identity(name), _digest(data))
+        _atomic_write_text(_version_path(name), str(stamp))
+        return current + 1
+
+
+def _update(name: str, default: Any, mutate: Callable[[Any], Any]) -> Tuple[Any, int]:
+    """
+    Optimistic read-modify-write.  *mutate* receives a private copy of the
+    current payload and returns the new one; it is re-run on a fresh copy
+    whenever another writer got there first.
+    """
+    _, new, version = _update_from(name, default, mutate)
+    return new, version
+
+
+def _update_from(name: str, default: Any, mutate: Callable[[Any], Any]) -> Tuple[Any, Any, int]:
+    """``_update`` that also returns the payload the winning write replaced."""
+    for _ in range(MAX_RETRIES):
+        current, version = _read_versioned(name, default)
+        new = mutate(copy.deepcopy(current))
+        try:
+            return current, new, _write(name, new, expected_version=version)
+        except StaleWriteError:
+            _CONFLICTS.inc(store=name)
+            continue
+    raise RuntimeError(f"{name}: gave up after {MAX_RETRIES} conflicting writes")
+
+
+def _key(item: Any) -> str:
+    return json.dumps(item, sort_keys=True)
+
+
+def merge_lists(base: List[Any], mine: List[Any], theirs: List[Any]) -> List[Any]:
+    """
+    Three-way merge of record lists: keep *theirs*, drop what *mine* deleted
+    relative to *base* and append what *mine* added.
+    """
+    base_keys = {_key(x) for x in base}
+    mine_keys = {_key(x) for x in mine}
+    removed = base_keys - mine_keys
+    merged = [x for x in theirs if _key(x) not in removed]
+    seen = {_key(x) for x in merged}
+    for x in mine:
+        k = _key(x)
+        if k not in base_keys and k not in seen:
+            merged.append(x)
+            seen.add(k)
+    return merged
+
+
+def merge_dicts(
+    base: Dict[str, Any], mine: Dict[str, Any], theirs: Dict[str, Any]
+) -> Dict[str, Any]:
+    """Three-way merge of keyed records; on a true conflict *mine* wins."""
+    merged = dict(theirs)
+    for k in base.keys() - mine.keys():
+        merged.pop(k, None)
+    for k, v in mine.items():
+        if k not in base or _key(base[k]) != _key(v):
+            merged[k] = v
+    return merged
+
+
+def _save(
+    name: str,
+    payload: Any,
+    default: Any,
+    expected_version: Optional[int],
+    base: Any,
+    merge: Callable[[Any, Any, Any], Any],
+) -> Tuple[Any, int]:
+    """Write *payload*; return what was actually stored and its version."""
+    try:
+        return payload, _write(name, payload, expected_version=expected_version)
+    except StaleWriteError:
+        if base is None:
+            raise
+    return _update(name, default, lambda theirs: merge(base, payload, theirs))
 
 
-def _write(name: str, payload: Any) -> None:
-    with _path(name).open("w", encoding="utf-8") as fh:
-        json.dump(payload, fh, indent=2)  # pretty print for Git diffs :contentReference[oaicite:3]{index=3}
+# ----------------------------- listeners ------------------------------- #
+def subscribe(listener: Listener) -> Callable[[], None]:
+    """
+    Call ``listener(store, op, record)`` after every change to the events or
+    holidays store.  *store* is ``"events"``/``"holidays"``; *op* is ``"add"``
+    or ``"remove"`` for a single record, or ``"reset"`` after a whole-store
+    write (``save_*`` / ``update_*``), with the new contents in
+    ``record["items"]``.  Returns an unsubscribe function.
+
+    Only writes made in this process are reported; compare
+    ``store_version`` to notice the others.
+    """
+    _listeners.append(listener)
+    return lambda: _listeners.remove(listener) if listener in _listeners else None
+
+
+def _notify(store: str, op: str, record: Dict[str, Any]) -> None:
+    for listener in list(_listeners):
+        listener(store, op, record)
 
 
 # ------------------------------ badges --------------------------------- #
@@ -37,8 +347,105 @@ def load_badges() -> Dict[str, Dict[str, Any]]:
     return _read("badges", {})
 
 
-def save_badges(badges: Dict[str, Dict[str, Any]]) -> None:
-    _write("badges", badges)
+def load_badges_versioned() -> Tuple[Dict[str, Dict[str, Any]], int]:
+    return _read_versioned("badges", {})
+
+
+def save_badges(
+    badges: Dict[str, Dict[str, Any]],
+    expected_version: Optional[int] = None,
+    base: Optional[Dict[str, Dict[str, Any]]] = None,
+) -> int:
+    """
+    Persist *badges*.  With *expected_version* the save is rejected
+    (``StaleWriteError``) if the store moved on, unless *base* — the copy the
+    caller started from — is given, in which case the edits are merged.
+    """
+    stored, version = _save("badges", badges, {}, expected_version, base, merge_dicts)
+    if base is not None and stored is badges and expected_version is not None \
+            and version == expected_version + 1:
+        _advance_badge_stats(base, stored, version)     # written as is: delta against *base*
+    else:
+        _store_badge_stats(BadgeStats.from_badges(stored.values()), version)
+    return version
+
+
+def update_badges(
+    mutate: Callable[[Dict[str, Dict[str, Any]]], Dict[str, Dict[str, Any]]],
+    changed: Optional[Iterable[str]] = None,
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Read-modify-write the badge store.  If *changed* names every badge
+    *mutate* touches, the progress counters are adjusted for just those;
+    it is read after the write, so *mutate* may fill it in as it goes.
+    Without it each badge's counted fields are compared before and after.
+    """
+    old, badges, version = _update_from("badges", {}, mutate)
+    _advance_badge_stats(old, badges, version, changed)
+    return badges
+
+
+def _stat_view(badge: Optional[Dict[str, Any]]) -> Optional[Tuple[Any, ...]]:
+    return None if badge is None else (badge.get("section"), badge.get("status"), badge.get("completion"))
+
+
+def _advance_badge_stats(
+    before: Dict[str, Dict[str, Any]],
+    after: Dict[str, Dict[str, Any]],
+    version: int,
+    names: Optional[Iterable[str]] = None,
+) -> None:
+    """
+    Move the counters from ``version - 1`` to *version* by per-badge deltas;
+    rebuild only if the stored counters weren't at the previous version.
+    """
+    stats = _stored_badge_stats(version - 1)
+    if stats is None:
+        stats = BadgeStats.from_badges(after.values())
+    else:
+        for name in (before.keys() | after.keys()) if names is None else set(names):
+            old, new = before.get(name), after.get(name)
+            if _stat_view(old) != _stat_view(new):
+                stats.replace(old, new)
+    _store_badge_stats(stats, version)
+
+
+def _stored_badge_stats(version: int) -> Optional[BadgeStats]:
+    try:
+        data = json.loads(_path("badge_stats").read_text(encoding="utf-8"))
+    except (FileNotFoundError, ValueError):
+        return None
+    return BadgeStats.from_dict(data) if data.get("version") == version else None
+
+
+def _store_badge_stats(stats: BadgeStats, version: int) -> None:
+    # written after the badges and tagged with their version: a reader that
+    # finds another version (crash, racing writer) just rebuilds
+    _atomic_write_text(_path("badge_stats"), json.dumps(stats.to_dict(version)))
+
+
+def load_badge_stats() -> BadgeStats:
+    """Progress counters for the badge store – O(1) unless they're stale."""
+    stats = _stored_badge_stats(store_version("badges"))
+    return stats if stats is not None else rebuild_badge_stats()
+
+
+def rebuild_badge_stats() -> BadgeStats:
+    badges, version = load_badges_versioned()
+    stats = BadgeStats.from_badges(badges.values())
+    _store_badge_stats(stats, version)
+    return stats
+
+
+def verify_badge_stats() -> bool:
+    """Rebuild the counters from scratch; return whether the stored ones matched."""
+    try:
+        data = json.loads(_path("badge_stats").read_text(encoding="utf-8"))
+    except (FileNotFoundError, ValueError):
+        data = None
+    fresh = rebuild_badge_stats()
+    return bool(data) and data.get("version") == store_version("badges") \
+        and BadgeStats.from_dict(data) == fresh
 
 
 # ------------------------------ events --------------------------------- #
@@ -46,8 +453,112 @@ def load_events() -> List[Dict[str, Any]]:
     return _read("events", [])
 
 
-def save_events(events: List[Dict[str, Any]]) -> None:
-    _write("events", events)
+def load_events_versioned() -> Tuple[List[Dict[str, Any]], int]:
+    return _read_versioned("events", [])
+
+
+_event_table: Optional[Tuple[Path, int, EventTable]] = None
+_event_table_lock = threading.Lock()
+
+
+def load_event_table() -> Tuple[EventTable, int]:
+    """
+    The events store as a columnar ``EventTable`` and its version.  Built
+    once per version and shared by every caller in the process – treat it
+    as read-only.
+    """
+    global _event_table
+    cached = _event_table
+    version = store_version("events")
+    if cached is not None and cached[:2] == (DATA_DIR, version):
+        return cached[2], version
+    with _event_table_lock:
+        events, version = load_events_versioned()
+        table = EventTable.from_dicts(events)
+        _event_table = (DATA_DIR, version, table)
+    return table, version
+
+
+def save_events(
+    events: List[Dict[str, Any]],
+    expected_version: Optional[int] = None,
+    base: Optional[List[Dict[str, Any]]] = None,
+) -> int:
+    """See ``save_badges`` for the meaning of *expected_version* / *base*."""
+    stored, version = _save("events", events, [], expected_version, base, merge_lists)
+    _notify("events", "reset", {"items": stored})
+    return version
+
+
+def update_events(
+    mutate: Callable[[List[Dict[str, Any]]], List[Dict[str, Any]]]
+) -> List[Dict[str, Any]]:
+    events = _update("events", [], mutate)[0]
+    _notify("events", "reset", {"items": events})
+    return events
+
+
+def add_event(event: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Append one event without clobbering concurrent edits; return the new list."""
+    events = _update("events", [], lambda evs: evs + [event])[0]
+    _notify("events", "add", event)
+    return events
+
+
+def _remove_first(record: Dict[str, Any], removed: List[bool]) -> Callable[[List[Any]], List[Any]]:
+    def _drop(items: List[Any]) -> List[Any]:
+        removed[:] = [record in items]
+        if removed[0]:
+            items.remove(record)
+        return items
+    return _drop
+
+
+def remove_event(event: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Remove the first event equal to *event* (no-op if absent)."""
+    removed: List[bool] = []
+    events = _update("events", [], _remove_first(event, removed))[0]
+    if removed[0]:
+        _notify("events", "remove", event)
+    return events
+
+
+def event_key(event: Dict[str, Any]) -> Tuple[str, ...]:
+    """Identity used by ``upsert_events``: the ``id`` if set, else (date, title)."""
+    if event.get("id"):
+        return ("id", str(event["id"]))
+    return ("dt", str(event.get("date", ""))[:10], event.get("title", ""))
+
+
+def upsert_events(events: List[Dict[str, Any]]) -> Tuple[int, int, int]:
+    """
+    Insert or replace *events* (matched by ``event_key``) in one write.
+    Returns ``(inserted, updated, version)``.
+    """
+    changes: List[Tuple[Optional[Dict[str, Any]], Dict[str, Any]]] = []
+
+    def _apply(items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        changes.clear()                      # re-run on a conflicting write
+        index = {event_key(e): i for i, e in enumerate(items)}
+        for ev in events:
+            k = event_key(ev)
+            i = index.get(k)
+            if i is None:
+                index[k] = len(items)
+                items.append(ev)
+                changes.append((None, ev))
+            elif items[i] != ev:
+                changes.append((items[i], ev))
+                items[i] = ev
+        return items
+
+    _, version = _update("events", [], _apply)
+    for old, new in changes:
+        if old is not None:
+            _notify("events", "remove", old)
+        _notify("events", "add", new)
+    inserted = sum(1 for old, _ in changes if old is None)
+    return inserted, len(changes) - inserted, version
 
 
 # ----------------------------- holidays -------------------------------- #
@@ -55,5 +566,60 @@ def load_holidays() -> List[Dict[str, Any]]:
     return _read("holidays", [])
 
 
-def save_holidays(holidays: List[Dict[str, Any]]) -> None:
-    _write("holidays", holidays)
+def load_holidays_versioned() -> Tuple[List[Dict[str, Any]], int]:
+    return _read_versioned("holidays", [])
+
+
+def save_holidays(holidays: List[Dict[str, Any]], expected_version: Optional[int] = None) -> int:
+    version = _write("holidays", holidays, expected_version=expected_version)
+    _notify("holidays", "reset", {"items": holidays})
+    return version
+
+
+def update_holidays(
+    mutate: Callable[[List[Dict[str, Any]]], List[Dict[str, Any]]]
+) -> List[Dict[str, Any]]:
+    holidays = _update("holidays", [], mutate)[0]
+    _notify("holidays", "reset", {"items": holidays})
+    return holidays
+
+
+def add_holiday(holiday: Dict[str, Any]) -> List[Dict[str, Any]]:
+    holidays = _update("holidays", [], lambda hs: hs + [holiday])[0]
+    _notify("holidays", "add", holiday)
+    return holidays
+
+
+def remove_holiday(holiday: Dict[str, Any]) -> List[Dict[str, Any]]:
+    removed: List[bool] = []
+    holidays = _update("holidays", [], _remove_first(holiday, removed))[0]
+    if removed[0]:
+        _notify("holidays", "remove", holiday)
+    return holidays
+
+
+# ---------------------------- crawl state ------------------------------ #
+def load_crawl_state() -> Dict[str, Any]:
+    """Progress of the badge detail-page crawler (see ``badge_crawler``)."""
+    return _read("crawl_state", {})
+
+
+def save_crawl_state(state: Dict[str, Any]) -> int:
+    return _write("crawl_state", state)
+
+
+# ----------------------------- sessions -------------------------------- #
+# Structured sessions (see ``session_store``); kept apart from the legacy
+# string list that ``data_management`` writes to ``sessions.json``.
+def load_session_records() -> List[Dict[str, Any]]:
+    return _read("session_records", [])
+
+
+def load_session_records_versioned() -> Tuple[List[Dict[str, Any]], int]:
+    return _read_versioned("session_records", [])
+
+
+def save_session_records(
+    records: List[Dict[str, Any]], expected_version: Optional[int] = None
+) -> int:
+    return _write("session_records", records, expected_version=expected_version)
@@ -0,0 +1,195 @@
+"""
+Columnar in-memory table for events.
+
+``events.json`` holds a list of ``{"date", "title", "description"}`` dicts.
+For filters over multi-year histories that shape is expensive: every dict
+costs a few hundred bytes and every comparison re-parses an ISO string.
+``EventTable`` stores the same data column-wise:
+
+* ``days``   – ``array('i')`` of proleptic date ordinals (int32);
+* titles     – an interned string pool plus an ``array('I')`` of pool ids;
+* descriptions and any extra keys – sparse ``{row: value}`` dicts, since most
+  events have neither.
+
+NumPy is optional; ``as_numpy()`` returns a zero-copy ``int32`` view when it
+is installed.
+
+``data_store.load_event_table`` keeps one table per store version, and
+``recurrence.expand_table`` answers window queries from it by bisecting the
+day column – the API range endpoint and the calendar feed no longer parse
+every event's date on each request.
+"""
+from __future__ import annotations
+
+import datetime as dt
+import sys
+from array import array
+from bisect import bisect_left, bisect_right
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - numpy is optional
+    np = None
+
+_CORE_KEYS = ("date", "title", "description")
+
+
+def to_ordinal(value: Any) -> int:
+    """ISO string / date / datetime → proleptic ordinal."""
+    if isinstance(value, dt.datetime):
+        return value.date().toordinal()
+    if isinstance(value, dt.date):
+        return value.toordinal()
+    return dt.date.fromisoformat(str(value)[:10]).toordinal()
+
+
+def from_ordinal(day: int) -> str:
+    return dt.date.fromordinal(day).isoformat()
+
+
+class EventTable:
+    """Append-only columnar event store with sorted range queries."""
+
+    __slots__ = ("_days", "_title_ids", "_titles", "_title_index",
+                 "_descriptions", "_extra", "_order", "_recurring")
+
+    def __init__(self) -> None:
+        self._days = array("i")
+        self._title_ids = array("I")
+        self._titles: List[str] = []
+        self._title_index: Dict[str, int] = {}
+        self._descriptions: Dict[int, str] = {}
+        self._extra: Dict[int, Dict[str, Any]] = {}
+        self._order: Optional[Tuple[array, array]] = None  # (rows, days) by day, lazy
+        self._recurring: List[int] = []                     # rows with an ``rrule``
+
+    # ------------------------------ building ----------------------------- #
+    @classmethod
+    def from_dicts(cls, events: Iterable[Dict[str, Any]]) -> "EventTable":
+        table = cls()
+        for ev in events:
+            table.append(ev)
+        return table
+
+    def _title_id(self, title: str) -> int:
+        tid = self._title_index.get(title)
+        if tid is None:
+            tid = len(self._titles)
+            title = sys.intern(title)
+            self._titles.append(title)
+            self._title_index[title] = tid
+        return tid
+
+    def append(self, event: Dict[str, Any]) -> int:
+        """Add one event dict; return its row number."""
+        row = len(self._days)
+        self._days.append(to_ordinal(event["date"]))
+        self._title_ids.append(self._title_id(event.get("title", "")))
+        if event.get("description"):
+            self._descriptions[row] = event["description"]
+        extra = {k: v for k, v in event.items() if k not in _CORE_KEYS}
+        if extra:
+            self._extra[row] = extra
+            if extra.get("rrule"):
+                self._recurring.append(row)
+        self._order = None
+        return row
+
+    # ------------------------------ access ------------------------------- #
+    def __len__(self) -> int:
+        return len(self._days)
+
+    @property
+    def days(self) -> array:
+        return self._days
+
+    def as_numpy(self):
+        """
+        Zero-copy ``int32`` view of the day column (requires NumPy).
+        Drop the view before appending: an exported buffer cannot be resized.
+        """
+        if np is None:
+            raise RuntimeError("numpy is not installed")
+        return np.frombuffer(self._days, dtype=np.int32)
+
+    def title(self, row: int) -> str:
+        return self._titles[self._title_ids[row]]
+
+    def row(self, row: int) -> Dict[str, Any]:
+        """Rebuild the JSON dict shape for *row*."""
+        ev: Dict[str, Any] = {
+            "date": from_ordinal(self._days[row]),
+            "title": self.title(row),
+            "description": self._descriptions.get(row, ""),
+        }
+        if row in self._extra:
+            ev.update(self._extra[row])
+        return ev
+
+    def is_recurring(self, row: int) -> bool:
+        return bool(self._extra.get(row, {}).get("rrule"))
+
+    @property
+    def recurring_rows(self) -> List[int]:
+        return self._recurring
+
+    def to_dicts(self) -> List[Dict[str, Any]]:
+        return [self.row(i) for i in range(len(self))]
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        return (self.row(i) for i in range(len(self)))
+
+    # ------------------------------ queries ------------------------------ #
+    def _sorted(self) -> Tuple[array, array]:
+        if self._order is None:
+            order = array("I", sorted(range(len(self._days)), key=self._days.__getitem__))
+            self._order = (order, array("i", (self._days[i] for i in order)))
+        return self._order
+
+    def between(self, start: Any, end: Any) -> List[int]:
+        """Row numbers with ``start <= date <= end``, in date order."""
+        lo_day, hi_day = to_ordinal(start), to_ordinal(end)
+        order, sorted_days = self._sorted()
+        lo = bisect_left(sorted_days, lo_day)
+        hi = bisect_right(sorted_days, hi_day)
+        return list(order[lo:hi])
+
+    def overlapping(self, intervals: Sequence[Dict[str, Any]]) -> List[int]:
+        """Row numbers whose date falls inside any ``{start, end}`` interval."""
+        spans = sorted((to_ordinal(h["start"]), to_ordinal(h["end"])) for h in intervals)
+        if not spans:
+            return []
+        # merge so that each day is checked against one candidate span
+        starts: List[int] = []
+        ends: List[int] = []
+        for s, e in spans:
+            if ends and s <= ends[-1] + 1:
+                ends[-1] = max(ends[-1], e)
+            else:
+                starts.append(s)
+                ends.append(e)
+        if np is not None:
+            days = self.as_numpy()
+            idx = np.searchsorted(np.asarray(starts, dtype=np.int32), days, side="right") - 1
+            ok = idx >= 0
+            hit = np.zeros(len(days), dtype=bool)
+            hit[ok] = days[ok] <= np.asarray(ends, dtype=np.int32)[idx[ok]]
+            return np.nonzero(hit)[0].tolist()
+        out = []
+        for row, day in enumerate(self._days):
+            i = bisect_right(starts, day) - 1
+            if i >= 0 and day <= ends[i]:
+                out.append(row)
+        return out
+
+    def busy_days(self) -> set:
+        """Set of ordinals that have at least one event."""
+        return set(self._days)
+
+    def dates(self) -> List[str]:
+        return [from_ordinal(d) for d in self._days]
+
+    def distinct_dates(self) -> List[str]:
+        """Every day with an event, ascending, each once."""
+        return [from_ordinal(d) for d in sorted(set(self._days))]
@@ -0,0 +1,278 @@
+"""
+School-holiday sources, one adapter per council.
+
+Each ``HolidaySource`` knows how to fetch its council's term-dates page and
+turn it into ``{"name", "start", "end"}`` periods.  ``refresh_holidays``
+runs the selected sources concurrently:
+
+* every source has its own timeout, counted from when it actually starts –
+  a slow council site is abandoned and the others still land; fetchers
+  must honour the timeout themselves (``fetch_static`` enforces it as a
+  total deadline), so the refresh never leaves a fetch running behind it;
+* sources that render JavaScript (``threaded=False``) run in the calling
+  thread while the others fetch on the pool: the headless browser needs
+  an asyncio loop and installs signal handlers, neither of which works on
+  a worker thread.  Their timeout is a wall-clock budget too –
+  ``fetch_rendered`` splits it between the download and the render, and a
+  source that still overruns (e.g. in ``parse``) is reported as timed out,
+  as it would be on the pool;
+* a source that fails or times out keeps whatever the store already holds
+  for that council;
+* each council's periods are normalised (sorted, overlapping/adjacent
+  periods merged, duplicates dropped) and tagged with ``"council"`` before
+  being swapped into ``holidays.json`` in one optimistic update.
+
+Holidays without a ``"council"`` key (added by hand, or written by older
+versions) are left alone unless a refreshed period covers exactly the same
+dates.
+
+New councils plug in with ``register_source``::
+
+    register_source(HolidaySource("brent", BRENT_URL, fetch=..., parse=...))
+"""
+from __future__ import annotations
+
+import asyncio
+import datetime as dt
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+import requests
+
+from . import jobs, metrics, snapshot
+from .data_store import load_holidays, update_holidays
+
+log = logging.getLogger(__name__)
+
+DEFAULT_TIMEOUT = 45.0         # seconds per source, fetch + parse
+MAX_WORKERS = 4
+QUEUE_POLL = 0.1               # seconds between checks on a source still waiting for a thread
+CHUNK = 64 * 1024
+
+HARROW_URL = "https://www.harrow.gov.uk/schools-learning/school-term-dates"
+
+_REFRESHES = metrics.counter("scout_holiday_refresh_total", "holiday source refreshes by outcome")
+
+
+@dataclass(frozen=True)
+class HolidaySource:
+    council: str
+    url: str
+    fetch: Callable[[str, float], str]              # (url, timeout) -> html/text
+    parse: Callable[[str], List[Dict[str, Any]]]    # text -> periods
+    timeout: float = DEFAULT_TIMEOUT
+    threaded: bool = True                           # False: must run in the calling thread
+
+    def load(self) -> List[Dict[str, Any]]:
+        return self.parse(self.fetch(self.url, self.timeout))
+
+
+_SOURCES: Dict[str, HolidaySource] = {}
+
+
+def register_source(source: HolidaySource) -> HolidaySource:
+    _SOURCES[source.council] = source
+    return source
+
+
+def sources() -> Dict[str, HolidaySource]:
+    return dict(_SOURCES)
+
+
+# --------------------------------------------------------------------------- #
+# Fetchers
+# --------------------------------------------------------------------------- #
+def fetch_static(url: str, timeout: float) -> str:
+    """GET *url*; *timeout* bounds the whole download, not just each read."""
+    deadline = time.monotonic() + timeout
+    with requests.get(url, timeout=timeout, stream=True) as resp:
+        resp.raise_for_status()
+        body = bytearray()
+        for chunk in resp.iter_content(CHUNK):
+            if time.monotonic() > deadline:
+                raise TimeoutError(f"timed out after {timeout:g}s")
+            body += chunk
+        return body.decode(resp.encoding or "utf-8", errors="replace")
+
+
+def fetch_rendered(url: str, timeout: float) -> str:
+    """
+    Fetch and run the page's JavaScript (requests-html is only needed here);
+    *timeout* bounds the download and the render together.
+    """
+    from requests_html import HTMLSession
+
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        pass
+    else:                        # pragma: no cover - render() can't nest in a running loop
+        raise RuntimeError("fetch_rendered must not be called from a running event loop")
+    if threading.current_thread() is not threading.main_thread():
+        # render() uses the thread's default loop, which only the main thread gets for free
+        asyncio.set_event_loop(asyncio.new_event_loop())
+
+    deadline = time.monotonic() + timeout
+    session = HTMLSession()
+    try:
+        r = session.get(url, timeout=timeout)
+        left = deadline - time.monotonic()
+        if left <= 0:
+            raise TimeoutError(f"timed out after {timeout:g}s")
+        r.html.render(timeout=left, retries=1)      # the default 8 retries would multiply it
+        return r.html.html
+    finally:
+        session.close()
+
+
+# --------------------------------------------------------------------------- #
+# Normalisation
+# --------------------------------------------------------------------------- #
+def normalise(periods: Iterable[Dict[str, Any]], council: str) -> List[Dict[str, Any]]:
+    """Sort, merge overlapping or touching periods and tag them with *council*."""
+    spans = []
+    for p in periods:
+        try:
+            start = dt.date.fromisoformat(str(p["start"])[:10])
+            end = dt.date.fromisoformat(str(p["end"])[:10])
+        except (KeyError, ValueError):
+            continue
+        if end < start:
+            start, end = end, start
+        spans.append((start, end, p.get("name") or "Holiday"))
+    spans.sort()
+
+    merged: List[List[Any]] = []
+    for start, end, name in spans:
+        if merged and start <= merged[-1][1] + dt.timedelta(days=1):
+            last = merged[-1]
+            last[1] = max(last[1], end)
+            if name not in last[2]:
+                last[2].append(name)
+        else:
+            merged.append([start, end, [name]])
+
+    return [
+        {"council": council, "name": " / ".join(names),
+         "start": start.isoformat(), "end": end.isoformat()}
+        for start, end, names in merged
+    ]
+
+
+def _swap_councils(
+    holidays: List[Dict[str, Any]], fresh: Dict[str, List[Dict[str, Any]]]
+) -> List[Dict[str, Any]]:
+    """Replace the refreshed councils' periods, keeping everything else."""
+    covered = {(h["start"], h["end"]) for periods in fresh.values() for h in periods}
+    kept = [
+        h for h in holidays
+        if h.get("council") not in fresh
+        and not ("council" not in h and (h.get("start"), h.get("end")) in covered)
+    ]
+    for periods in fresh.values():
+        kept.extend(periods)
+    return kept
+
+
+# --------------------------------------------------------------------------- #
+# Refresh
+# --------------------------------------------------------------------------- #
+def refresh_holidays(
+    councils: Optional[Iterable[str]] = None, max_workers: int = MAX_WORKERS
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Refresh *councils* (default: all registered) concurrently.
+
+    Returns ``{council: {"ok": bool, "periods": [...], "error": str|None}}``;
+    on failure ``periods`` is what the store already held for that council.
+    """
+    selected = [_SOURCES[c] for c in (councils or _SOURCES)]
+    results: Dict[str, Dict[str, Any]] = {}
+    fresh: Dict[str, List[Dict[str, Any]]] = {}
+    began: Dict[str, float] = {}
+
+    def run(src: HolidaySource) -> List[Dict[str, Any]]:
+        began[src.council] = time.monotonic()
+        return src.load()
+
+    def wait(src: HolidaySource, fut) -> List[Dict[str, Any]]:
+        # the timeout starts when a worker picks the source up, not at submit
+        while True:
+            start = began.get(src.council)
+            left = QUEUE_POLL if start is None else max(0.0, start + src.timeout - time.monotonic())
+            try:
+                return fut.result(timeout=left)
+            except FutureTimeout:
+                if start is not None:
+                    fut.cancel()
+                    raise
+
+    def inline(src: HolidaySource) -> List[Dict[str, Any]]:
+        start = time.monotonic()
+        periods = src.load()
+        if time.monotonic() - start > src.timeout:   # over budget: same as on the pool
+            raise FutureTimeout()
+        return periods
+
+    def record(src: HolidaySource, load: Callable[[], List[Dict[str, Any]]]) -> None:
+        council = src.council
+        jobs.progress(len(results) / len(selected), f"Fetching {council}")
+        try:
+            periods = normalise(load(), council)
+        except FutureTimeout:        # also raised by fetch_static's deadline
+            results[council] = {"ok": False, "error": f"timed out after {src.timeout:g}s"}
+        except Exception as exc:     # one bad site must not sink the rest
+            log.warning("holiday source %s failed: %s", council, exc)
+            results[council] = {"ok": False, "error": str(exc) or type(exc).__name__}
+        else:
+            if periods:
+                fresh[council] = periods
+                results[council] = {"ok": True, "periods": periods, "error": None}
+            else:
+                results[council] = {"ok": False, "error": "no holiday periods found"}
+        _REFRESHES.inc(council=council, outcome="ok" if results[council]["ok"] else "error")
+
+    pooled = [src for src in selected if src.threaded]
+    pool = ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(pooled) or 1)),
+                              thread_name_prefix="holidays")
+    try:
+        futures = [(src, pool.submit(run, src)) for src in pooled]
+        for src in selected:
+            if not src.threaded:     # rendered here while the pool fetches the rest
+                record(src, lambda: inline(src))
+        for src, fut in futures:
+            record(src, lambda: wait(src, fut))
+    finally:
+        # fetchers honour their timeout, so this is bounded; queued sources are dropped
+        pool.shutdown(wait=True, cancel_futures=True)
+
+    if fresh:
+        stored = update_holidays(lambda hs: _swap_councils(hs, fresh))
+        snapshot.publish()
+    else:
+        stored = load_holidays()
+    for council, res in results.items():
+        if not res["ok"]:
+            res["periods"] = [h for h in stored if h.get("council") == council]
+    return results
+
+
+# --------------------------------------------------------------------------- #
+# Adapters
+# --------------------------------------------------------------------------- #
+def _parse_harrow(html: str) -> List[Dict[str, Any]]:
+    from .webscraper import parse_harrow_holidays
+    return parse_harrow_holidays(html)
+
+
+HARROW = register_source(HolidaySource(
+    council="harrow",
+    url=HARROW_URL,
+    fetch=fetch_rendered,
+    parse=_parse_harrow,
+    threaded=False,
+))
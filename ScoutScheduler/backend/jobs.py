@@ -0,0 +1,473 @@
+"""
+Persistent background jobs (SQLite queue + worker processes).
+
+Scrapes, crawls and Writer calls take up to a minute; run inline they block
+the Streamlit rerun and die with the browser tab.  Pages ``submit`` them
+here instead and poll ``get(job_id)`` for status, progress and the result:
+
+* jobs live in ``jobs.sqlite3`` (WAL mode) in ``DATA_DIR`` – they survive
+  page reloads and server restarts;
+* submitting a job identical to one still queued or running (same kind and
+  arguments) returns the existing id instead of queuing a duplicate;
+* a ``WorkerPool`` of separate processes claims jobs atomically
+  (``BEGIN IMMEDIATE``); a job whose worker stops heartbeating is requeued,
+  up to ``MAX_ATTEMPTS`` times;
+* job code may call ``progress(fraction, message)`` – a no-op outside a
+  worker – which also raises ``JobCancelled`` once ``cancel`` was requested.
+
+    job_id = jobs.submit("refresh_badge_catalogue")
+    jobs.get(job_id).status      # queued → running → done / failed / cancelled
+
+``ensure_workers()`` starts the pool once per server process; or run it on
+its own with ``python -m ScoutScheduler.backend.jobs --processes 2``.
+Workers note themselves in the ``workers`` table every ``HEARTBEAT_SECONDS``,
+so ``workers_alive()`` also sees a pool running elsewhere.
+"""
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import logging
+import multiprocessing as mp
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from . import metrics
+from .data_store import DATA_DIR
+
+log = logging.getLogger(__name__)
+
+JOBS_DB = Path(os.getenv("SCOUT_JOBS_DB", DATA_DIR / "jobs.sqlite3"))
+PROCESSES = 2
+POLL_SECONDS = 0.5         # idle worker sleep between claims
+HEARTBEAT_SECONDS = 5
+STALE_AFTER = 60           # a running job without heartbeat for this long is requeued
+MAX_ATTEMPTS = 3
+PROGRESS_EVERY = 0.5       # seconds between progress writes
+
+ACTIVE = ("queued", "running")
+FINISHED = ("done", "failed", "cancelled")
+
+_JOBS = metrics.counter("scout_jobs_total", "Background jobs by kind and outcome")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id        INTEGER PRIMARY KEY AUTOINCREMENT,
+    kind      TEXT NOT NULL,
+    args      TEXT NOT NULL,
+    key       TEXT NOT NULL,
+    status    TEXT NOT NULL DEFAULT 'queued',
+    progress  REAL NOT NULL DEFAULT 0,
+    message   TEXT NOT NULL DEFAULT '',
+    result    TEXT,
+    error     TEXT,
+    attempts  INTEGER NOT NULL DEFAULT 0,
+    cancel    INTEGER NOT NULL DEFAULT 0,
+    created   REAL NOT NULL,
+    started   REAL,
+    finished  REAL,
+    heartbeat REAL
+);
+CREATE UNIQUE INDEX IF NOT EXISTS jobs_active_key ON jobs(key)
+    WHERE status IN ('queued', 'running');
+CREATE INDEX IF NOT EXISTS jobs_status ON jobs(status, id);
+CREATE TABLE IF NOT EXISTS workers (
+    pid       INTEGER PRIMARY KEY,
+    seen      REAL NOT NULL
+);
+"""
+
+
+class JobCancelled(Exception):
+    """Raised from ``progress`` inside a job whose cancellation was requested."""
+
+
+@dataclass
+class Job:
+    id: int
+    kind: str
+    args: Dict[str, Any]
+    status: str
+    progress: float
+    message: str
+    result: Any
+    error: Optional[str]
+    attempts: int
+    created: float
+    started: Optional[float]
+    finished: Optional[float]
+
+    @property
+    def done(self) -> bool:
+        return self.status in FINISHED
+
+    @classmethod
+    def _from_row(cls, row: sqlite3.Row) -> "Job":
+        return cls(
+            id=row["id"], kind=row["kind"], args=json.loads(row["args"]),
+            status=row["status"], progress=row["progress"], message=row["message"],
+            result=json.loads(row["result"]) if row["result"] is not None else None,
+            error=row["error"], attempts=row["attempts"], created=row["created"],
+            started=row["started"], finished=row["finished"],
+        )
+
+
+# --------------------------------------------------------------------------- #
+# Job kinds
+# --------------------------------------------------------------------------- #
+_KINDS: Dict[str, Callable[..., Any]] = {}
+
+
+def register(kind: str) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
+    """
+    Decorator adding a job kind.  Workers are separate processes, so the
+    registering module must be imported by this one (as the built-ins below
+    are); results must be JSON-serialisable.
+    """
+    def deco(fn: Callable[..., Any]) -> Callable[..., Any]:
+        _KINDS[kind] = fn
+        return fn
+    return deco
+
+
+def kinds() -> List[str]:
+    return sorted(_KINDS)
+
+
+@register("refresh_holidays")
+def _refresh_holidays(councils: Optional[List[str]] = None) -> Dict[str, Any]:
+    from .holiday_sources import refresh_holidays
+    return refresh_holidays(councils)
+
+
+@register("refresh_badge_catalogue")
+def _refresh_badge_catalogue() -> Dict[str, Any]:
+    from .webscraper import refresh_badge_catalogue
+    return {"count": len(refresh_badge_catalogue())}
+
+
+@register("crawl_badge_details")
+def _crawl_badge_details(resume: bool = True) -> Dict[str, Any]:
+    from .badge_crawler import crawl_badge_details
+    return crawl_badge_details(resume=resume)
+
+
+@register("generate_schedule")
+def _generate_schedule(prefs: Dict[str, Any]) -> List[Dict[str, str]]:
+    from .data_store import load_badges, load_events, load_holidays
+    from .scheduler_logic import generate_schedule
+    return generate_schedule(load_events(), load_badges(), load_holidays(), prefs)
+
+
+# --------------------------------------------------------------------------- #
+# Storage
+# --------------------------------------------------------------------------- #
+_ready: set = set()
+
+
+@contextmanager
+def _connect(write: bool = False) -> Iterator[sqlite3.Connection]:
+    """One short-lived connection; ``write`` takes the write lock up front."""
+    conn = sqlite3.connect(JOBS_DB, timeout=30, isolation_level=None)
+    conn.row_factory = sqlite3.Row
+    try:
+        if JOBS_DB not in _ready:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+            _ready.add(JOBS_DB)
+        if write:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+        else:
+            yield conn
+    finally:
+        conn.close()
+
+
+def _key(kind: str, args: Dict[str, Any]) -> str:
+    return hashlib.sha256(json.dumps([kind, args], sort_keys=True).encode()).hexdigest()
+
+
+# --------------------------------------------------------------------------- #
+# Public API (pages)
+# --------------------------------------------------------------------------- #
+def submit(kind: str, **args: Any) -> int:
+    """Queue a job; an identical queued/running job is reused (its id returned)."""
+    if kind not in _KINDS:
+        raise ValueError(f"unknown job kind {kind!r}")
+    key = _key(kind, args)
+    with _connect(write=True) as conn:
+        row = conn.execute(
+            "SELECT id FROM jobs WHERE key = ? AND status IN ('queued', 'running')", (key,)
+        ).fetchone()
+        if row:
+            _JOBS.inc(kind=kind, outcome="deduplicated")
+            return row["id"]
+        cur = conn.execute(
+            "INSERT INTO jobs (kind, args, key, created) VALUES (?, ?, ?, ?)",
+            (kind, json.dumps(args, sort_keys=True), key, time.time()),
+        )
+        _JOBS.inc(kind=kind, outcome="submitted")
+        return cur.lastrowid
+
+
+def get(job_id: int) -> Optional[Job]:
+    with _connect() as conn:
+        row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+    return Job._from_row(row) if row else None
+
+
+def recent(kind: Optional[str] = None, limit: int = 20) -> List[Job]:
+    sql, params = "SELECT * FROM jobs", ()
+    if kind:
+        sql, params = sql + " WHERE kind = ?", (kind,)
+    with _connect() as conn:
+        rows = conn.execute(sql + " ORDER BY id DESC LIMIT ?", (*params, limit)).fetchall()
+    return [Job._from_row(r) for r in rows]
+
+
+def cancel(job_id: int) -> bool:
+    """
+    Cancel a queued job outright; ask a running one to stop at its next
+    ``progress`` call.  Returns False if the job had already finished.
+    """
+    now = time.time()
+    with _connect(write=True) as conn:
+        cur = conn.execute(
+            "UPDATE jobs SET status = 'cancelled', finished = ? WHERE id = ? AND status = 'queued'",
+            (now, job_id),
+        )
+        if cur.rowcount:
+            return True
+        cur = conn.execute("UPDATE jobs SET cancel = 1 WHERE id = ? AND status = 'running'", (job_id,))
+        return bool(cur.rowcount)
+
+
+def wait(job_id: int, timeout: Optional[float] = None, poll: float = 0.2) -> Job:
+    """Block until the job finishes (CLI / tests; pages should poll ``get``)."""
+    deadline = None if timeout is None else time.monotonic() + timeout
+    while True:
+        job = get(job_id)
+        if job is None:
+            raise KeyError(job_id)
+        if job.done:
+            return job
+        if deadline is not None and time.monotonic() > deadline:
+            raise TimeoutError(f"job {job_id} still {job.status}")
+        time.sleep(poll)
+
+
+def prune(older_than: float = 7 * 86400) -> int:
+    """Delete finished jobs older than *older_than* seconds."""
+    with _connect(write=True) as conn:
+        cur = conn.execute(
+            "DELETE FROM jobs WHERE status IN ('done', 'failed', 'cancelled') AND finished < ?",
+            (time.time() - older_than,),
+        )
+        return cur.rowcount
+
+
+# --------------------------------------------------------------------------- #
+# Worker side
+# --------------------------------------------------------------------------- #
+_current = threading.local()
+
+
+def progress(fraction: float, message: str = "") -> None:
+    """Report progress from inside a job (throttled); a no-op elsewhere."""
+    job_id = getattr(_current, "job_id", None)
+    if job_id is None:
+        return
+    now = time.monotonic()
+    if fraction < 1 and now - _current.last < PROGRESS_EVERY:
+        return
+    _current.last = now
+    with _connect() as conn:
+        conn.execute(
+            "UPDATE jobs SET progress = ?, message = ?, heartbeat = ? WHERE id = ?",
+            (max(0.0, min(1.0, fraction)), message, time.time(), job_id),
+        )
+        row = conn.execute("SELECT cancel FROM jobs WHERE id = ?", (job_id,)).fetchone()
+    if row and row["cancel"]:
+        raise JobCancelled(job_id)
+
+
+def _claim() -> Optional[sqlite3.Row]:
+    now = time.time()
+    with _connect(write=True) as conn:
+        # jobs whose worker died: retry, or give up after MAX_ATTEMPTS
+        conn.execute(
+            "UPDATE jobs SET status = 'failed', finished = ?, error = 'worker lost' "
+            "WHERE status = 'running' AND heartbeat < ? AND attempts >= ?",
+            (now, now - STALE_AFTER, MAX_ATTEMPTS),
+        )
+        conn.execute(
+            "UPDATE jobs SET status = 'queued' WHERE status = 'running' AND heartbeat < ?",
+            (now - STALE_AFTER,),
+        )
+        row = conn.execute(
+            "SELECT * FROM jobs WHERE status = 'queued' ORDER BY id LIMIT 1"
+        ).fetchone()
+        if row is None:
+            return None
+        conn.execute(
+            "UPDATE jobs SET status = 'running', started = ?, heartbeat = ?, "
+            "attempts = attempts + 1, progress = 0, message = '' WHERE id = ?",
+            (now, now, row["id"]),
+        )
+        return row
+
+
+def _heartbeat(job_id: int, stop: threading.Event) -> None:
+    while not stop.wait(HEARTBEAT_SECONDS):
+        try:
+            with _connect() as conn:
+                conn.execute("UPDATE jobs SET heartbeat = ? WHERE id = ?", (time.time(), job_id))
+        except sqlite3.Error as exc:
+            log.warning("job %s heartbeat failed: %s", job_id, exc)
+
+
+def run_one() -> bool:
+    """Claim and run one queued job in this process; False if none was queued."""
+    row = _claim()
+    if row is None:
+        return False
+    job_id, kind = row["id"], row["kind"]
+    stop = threading.Event()
+    beat = threading.Thread(target=_heartbeat, args=(job_id, stop), daemon=True)
+    beat.start()
+    _current.job_id, _current.last = job_id, 0.0
+    status, result, error = "done", None, None
+    try:
+        result = _KINDS[kind](**json.loads(row["args"]))
+    except JobCancelled:
+        status = "cancelled"
+    except Exception as exc:
+        log.exception("job %s (%s) failed", job_id, kind)
+        status, error = "failed", f"{type(exc).__name__}: {exc}"
+    finally:
+        _current.job_id = None
+        stop.set()
+        beat.join()
+    with _connect(write=True) as conn:
+        conn.execute(
+            "UPDATE jobs SET status = ?, result = ?, error = ?, finished = ?, "
+            "progress = CASE WHEN ? = 'done' THEN 1 ELSE progress END WHERE id = ?",
+            (status, json.dumps(result, default=str) if status == "done" else None,
+             error, time.time(), status, job_id),
+        )
+    _JOBS.inc(kind=kind, outcome=status)
+    return True
+
+
+def _announce() -> None:
+    """Record that this worker process is alive (``workers_alive`` reads it)."""
+    with _connect() as conn:
+        conn.execute("INSERT OR REPLACE INTO workers (pid, seen) VALUES (?, ?)",
+                     (os.getpid(), time.time()))
+
+
+def _seen_worker() -> bool:
+    with _connect() as conn:
+        row = conn.execute("SELECT 1 FROM workers WHERE seen >= ? LIMIT 1",
+                           (time.time() - STALE_AFTER,)).fetchone()
+    return row is not None
+
+
+def _worker_main(db: str, stop) -> None:
+    global JOBS_DB
+    JOBS_DB = Path(db)
+    logging.basicConfig(level=logging.INFO)
+    announced = 0.0
+    while not stop.is_set():
+        try:
+            if time.monotonic() - announced >= HEARTBEAT_SECONDS:
+                _announce()
+                announced = time.monotonic()
+            if not run_one():
+                stop.wait(POLL_SECONDS)
+        except sqlite3.Error as exc:       # e.g. lock timeout: try again later
+            log.warning("job worker: %s", exc)
+            stop.wait(POLL_SECONDS)
+
+
+class WorkerPool:
+    """``processes`` worker processes draining the queue until ``stop``."""
+
+    def __init__(self, processes: int = PROCESSES) -> None:
+        self._ctx = mp.get_context("spawn")      # never fork a threaded server
+        self._stop = self._ctx.Event()
+        self._procs: List[Any] = [None] * processes
+
+    def start(self) -> "WorkerPool":
+        for i, proc in enumerate(self._procs):
+            if proc is None or not proc.is_alive():
+                proc = self._ctx.Process(target=_worker_main, args=(str(JOBS_DB), self._stop),
+                                         name=f"scout-job-worker-{i}", daemon=True)
+                proc.start()
+                self._procs[i] = proc
+        return self
+
+    def alive(self) -> int:
+        return sum(1 for p in self._procs if p is not None and p.is_alive())
+
+    def stop(self, timeout: float = 10) -> None:
+        self._stop.set()
+        for p in self._procs:
+            if p is not None:
+                p.join(timeout)
+                if p.is_alive():
+                    p.terminate()
+
+
+_pool: Optional[WorkerPool] = None
+_pool_lock = threading.Lock()
+
+
+def ensure_workers(processes: int = PROCESSES) -> WorkerPool:
+    """Start (or revive dead members of) this server's worker pool."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = WorkerPool(processes)
+        return _pool.start()
+
+
+def workers_alive() -> bool:
+    """Whether a worker is serving the queue – this server's pool, or any
+    process that heartbeated or claimed a job within ``STALE_AFTER``."""
+    with _pool_lock:
+        if _pool is not None and _pool.alive():
+            return True
+    return _seen_worker()
+
+
+def main(argv=None) -> None:
+    ap = argparse.ArgumentParser(description="Run background job workers")
+    ap.add_argument("--processes", type=int, default=PROCESSES)
+    args = ap.parse_args(argv)
+    logging.basicConfig(level=logging.INFO)
+    pool = WorkerPool(args.processes).start()
+    log.info("%d job workers on %s", args.processes, JOBS_DB)
+    try:
+        while True:
+            time.sleep(1)
+            pool.start()                 # replace any worker that died
+    except KeyboardInterrupt:
+        pool.stop()
+
+
+if __name__ == "__main__":
+    main()
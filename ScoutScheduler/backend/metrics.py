@@ -0,0 +1,226 @@
+"""
+Lightweight in-process instrumentation: counters, histograms and timing spans.
+
+    from .metrics import counter, histogram, timed, span
+
+    @timed("scout_writer_request_seconds", endpoint="chat")
+    def _writer_chat(...): ...
+
+    with span("scout_store_io_seconds", store="events", op="read"):
+        ...
+
+``render_prometheus()`` produces the text exposition format served by the
+FastAPI app at ``/metrics``; ``snapshot()`` feeds the Streamlit debug page.
+
+Set ``SCOUT_METRICS=0`` to disable collection: every hook then costs one
+flag check and nothing is recorded.
+"""
+from __future__ import annotations
+
+import functools
+import inspect
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576)
+
+_enabled = os.getenv("SCOUT_METRICS", "1").lower() not in ("0", "false", "no", "off")
+_lock = threading.Lock()
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+def enabled() -> bool:
+    return _enabled
+
+
+def enable(on: bool = True) -> None:
+    global _enabled
+    _enabled = on
+
+
+def _labels(labels: Dict[str, Any]) -> LabelKey:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+# --------------------------------------------------------------------------- #
+# Metric types
+# --------------------------------------------------------------------------- #
+class Counter:
+    kind = "counter"
+
+    def __init__(self, name: str, help: str = "") -> None:
+        self.name, self.help = name, help
+        self._values: Dict[LabelKey, float] = {}
+
+    def inc(self, amount: float = 1, **labels: Any) -> None:
+        if not _enabled:
+            return
+        key = _labels(labels)
+        with _lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels: Any) -> float:
+        return self._values.get(_labels(labels), 0)
+
+    def _samples(self) -> Iterator[Tuple[str, LabelKey, float]]:
+        for key, v in self._values.items():
+            yield self.name, key, v
+
+
+class Histogram:
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str = "", buckets: Sequence[float] = LATENCY_BUCKETS) -> None:
+        self.name, self.help = name, help
+        self.buckets = tuple(buckets)
+        # per label set: [bucket counts..., +Inf count], sum
+        self._values: Dict[LabelKey, Tuple[List[int], List[float]]] = {}
+
+    def observe(self, value: float, **labels: Any) -> None:
+        if not _enabled:
+            return
+        key = _labels(labels)
+        i = bisect_left(self.buckets, value)
+        with _lock:
+            counts, total = self._values.setdefault(key, ([0] * (len(self.buckets) + 1), [0.0]))
+            counts[i] += 1
+            total[0] += value
+
+    def count(self, **labels: Any) -> int:
+        entry = self._values.get(_labels(labels))
+        return sum(entry[0]) if entry else 0
+
+    def total(self, **labels: Any) -> float:
+        entry = self._values.get(_labels(labels))
+        return entry[1][0] if entry else 0.0
+
+    def _samples(self) -> Iterator[Tuple[str, LabelKey, float]]:
+        for key, (counts, total) in self._values.items():
+            running = 0
+            for bound, c in zip(self.buckets + (float("inf"),), counts):
+                running += c
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                yield f"{self.name}_bucket", key + (("le", le),), running
+            yield f"{self.name}_sum", key, total[0]
+            yield f"{self.name}_count", key, running
+
+
+_registry: Dict[str, Any] = {}
+
+
+def counter(name: str, help: str = "") -> Counter:
+    m = _registry.get(name)
+    if m is None:
+        with _lock:
+            m = _registry.setdefault(name, Counter(name, help))
+    return m
+
+
+def histogram(name: str, help: str = "", buckets: Sequence[float] = LATENCY_BUCKETS) -> Histogram:
+    m = _registry.get(name)
+    if m is None:
+        with _lock:
+            m = _registry.setdefault(name, Histogram(name, help, buckets))
+    return m
+
+
+def reset() -> None:
+    """Forget every recorded value (registered metrics stay registered)."""
+    with _lock:
+        for m in _registry.values():
+            m._values.clear()
+
+
+# --------------------------------------------------------------------------- #
+# Timing helpers
+# --------------------------------------------------------------------------- #
+@contextmanager
+def span(name: str, **labels: Any) -> Iterator[None]:
+    """Observe the wall time of the block into histogram *name*."""
+    if not _enabled:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    except BaseException:
+        counter(f"{name.rsplit('_seconds', 1)[0]}_errors_total").inc(**labels)
+        raise
+    finally:
+        histogram(name).observe(time.perf_counter() - start, **labels)
+
+
+def timed(name: str, **labels: Any) -> Callable[[Callable], Callable]:
+    """Decorator form of ``span`` (sync or async functions)."""
+    def deco(fn: Callable) -> Callable:
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def awrapper(*args, **kwargs):
+                if not _enabled:
+                    return await fn(*args, **kwargs)
+                with span(name, **labels):
+                    return await fn(*args, **kwargs)
+            return awrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return fn(*args, **kwargs)
+            with span(name, **labels):
+                return fn(*args, **kwargs)
+        return wrapper
+    return deco
+
+
+# --------------------------------------------------------------------------- #
+# Exposition
+# --------------------------------------------------------------------------- #
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _fmt_labels(key: LabelKey) -> str:
+    if not key:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in key) + "}"
+
+
+def _fmt_value(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+def render_prometheus() -> str:
+    """Prometheus text exposition format (version 0.0.4)."""
+    lines: List[str] = []
+    with _lock:
+        metrics = sorted(_registry.values(), key=lambda m: m.name)
+        for m in metrics:
+            if m.help:
+                lines.append(f"# HELP {m.name} {m.help}")
+            lines.append(f"# TYPE {m.name} {m.kind}")
+            for sample, key, value in m._samples():
+                lines.append(f"{sample}{_fmt_labels(key)} {_fmt_value(value)}")
+    return "\n".join(lines) + "\n"
+
+
+def snapshot() -> List[Dict[str, Any]]:
+    """Flat rows (one per metric/label set) for tables and debugging."""
+    rows: List[Dict[str, Any]] = []
+    with _lock:
+        for m in sorted(_registry.values(), key=lambda m: m.name):
+            for key in list(m._values):
+                row: Dict[str, Any] = {"metric": m.name, "labels": dict(key)}
+                if m.kind == "counter":
+                    row["value"] = m._values[key]
+                else:
+                    counts, total = m._values[key]
+                    n = sum(counts)
+                    row.update(count=n, sum=total[0], mean=total[0] / n if n else 0.0)
+                rows.append(row)
+    return rows
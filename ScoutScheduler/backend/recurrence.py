@@ -0,0 +1,144 @@
+"""
+Recurring events with lazy, window-bounded expansion.
+
+A recurring event is stored *once* in ``events.json``::
+
+    {
+      "date": "2024-09-03",                       # first occurrence (DTSTART)
+      "title": "Cubs meeting",
+      "description": "",
+      "rrule": "FREQ=WEEKLY;BYDAY=TU;UNTIL=20250722",
+      "exdates": ["2024-10-29"],                  # cancelled occurrences
+      "overrides": {"2024-11-05": {"title": "Bonfire night"}}
+    }
+
+``exdates`` and ``overrides`` are sparse: only the exceptions are stored.
+An override may also carry a ``"date"`` to move that occurrence.
+
+Occurrences are produced by generators that only walk the rule inside the
+requested window, so cost scales with rules, not with stored occurrences.
+"""
+from __future__ import annotations
+
+import datetime as dt
+import heapq
+from typing import Any, Dict, Iterable, Iterator, List
+
+from dateutil.rrule import rrulestr
+
+from .event_table import EventTable, to_ordinal
+
+_RULE_KEYS = ("rrule", "exdates", "overrides")
+
+
+def is_recurring(event: Dict[str, Any]) -> bool:
+    return bool(event.get("rrule"))
+
+
+def _as_date(value: Any) -> dt.date:
+    return dt.date.fromordinal(to_ordinal(value))
+
+
+def _rule(event: Dict[str, Any]):
+    start = _as_date(event["date"])
+    return rrulestr(event["rrule"], dtstart=dt.datetime(start.year, start.month, start.day))
+
+
+def _instance(event: Dict[str, Any], day: dt.date) -> Dict[str, Any]:
+    base = {k: v for k, v in event.items() if k not in _RULE_KEYS}
+    base["date"] = day.isoformat()
+    base["recurrence_id"] = day.isoformat()
+    return base
+
+
+def occurrences(event: Dict[str, Any], start: Any, end: Any) -> Iterator[Dict[str, Any]]:
+    """
+    Yield concrete event dicts for *event* dated within ``[start, end]``,
+    in date order.  Non-recurring events yield themselves if in range.
+    """
+    lo, hi = _as_date(start), _as_date(end)
+    if not is_recurring(event):
+        if lo <= _as_date(event["date"]) <= hi:
+            yield event
+        return
+
+    exdates = set(event.get("exdates", ()))
+    overrides: Dict[str, Dict[str, Any]] = event.get("overrides", {})
+
+    # moved occurrences are yielded from a small side list at their new date
+    moved: List[Dict[str, Any]] = []
+    for rid, patch in overrides.items():
+        if "date" in patch and rid not in exdates and lo <= _as_date(patch["date"]) <= hi:
+            inst = _instance(event, _as_date(rid))
+            inst.update(patch)
+            moved.append(inst)
+
+    def _walk() -> Iterator[Dict[str, Any]]:
+        cursor = dt.datetime(lo.year, lo.month, lo.day)
+        for occ in _rule(event).xafter(cursor, inc=True):
+            day = occ.date()
+            if day > hi:
+                return
+            rid = day.isoformat()
+            if rid in exdates:
+                continue
+            patch = overrides.get(rid)
+            if patch and "date" in patch:
+                continue
+            inst = _instance(event, day)
+            if patch:
+                inst.update(patch)
+            yield inst
+
+    if moved:
+        yield from heapq.merge(_walk(), sorted(moved, key=_date_key), key=_date_key)
+    else:
+        yield from _walk()
+
+
+def _date_key(event: Dict[str, Any]) -> str:
+    return event["date"]
+
+
+def expand(events: Iterable[Dict[str, Any]], start: Any, end: Any) -> Iterator[Dict[str, Any]]:
+    """Lazily merge the occurrences of every event in ``[start, end]``, by date."""
+    singles: List[Dict[str, Any]] = []
+    streams = []
+    for ev in events:
+        if is_recurring(ev):
+            streams.append(occurrences(ev, start, end))
+        else:
+            singles.extend(occurrences(ev, start, end))
+    singles.sort(key=_date_key)
+    return heapq.merge(singles, *streams, key=_date_key)
+
+
+def expand_table(table: EventTable, start: Any, end: Any) -> Iterator[Dict[str, Any]]:
+    """
+    ``expand`` over an ``EventTable``: one-off events come from a bisect of
+    the day column, so only rules and the rows inside the window are touched.
+    """
+    singles = [table.row(i) for i in table.between(start, end) if not table.is_recurring(i)]
+    streams = [occurrences(table.row(i), start, end) for i in table.recurring_rows]
+    return heapq.merge(singles, *streams, key=_date_key)
+
+
+def occurs_on(event: Dict[str, Any], day: Any) -> bool:
+    """Clash check for one day without materialising other occurrences."""
+    return next(occurrences(event, day, day), None) is not None
+
+
+def add_exception(event: Dict[str, Any], day: Any) -> Dict[str, Any]:
+    """Cancel the occurrence on *day* (returns the updated event dict)."""
+    rid = _as_date(day).isoformat()
+    event.setdefault("exdates", [])
+    if rid not in event["exdates"]:
+        event["exdates"].append(rid)
+    return event
+
+
+def add_override(event: Dict[str, Any], day: Any, **fields: Any) -> Dict[str, Any]:
+    """Patch the occurrence on *day* (e.g. ``title=...`` or ``date=...``)."""
+    rid = _as_date(day).isoformat()
+    event.setdefault("overrides", {}).setdefault(rid, {}).update(fields)
+    return event
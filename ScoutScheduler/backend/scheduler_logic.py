@@ -5,7 +5,8 @@ Generates badge-session date suggestions with Writer’s API.
 """
 
 from __future__ import annotations
-import os, json, hashlib
+import os, json, hashlib, logging
+from datetime import date, timedelta
 from typing import List, Dict, Any
 
 import requests
@@ -13,7 +14,13 @@ from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
 from cachetools import TTLCache
 
-from .data_store import save_events
+from . import metrics
+from .availability import AvailabilityIndex
+from .data_store import add_event
+from .event_table import EventTable
+from .recurrence import expand
+
+log = logging.getLogger(__name__)
 
 # ─────────────────────────────────────────────────────────────────────────────
 # Writer configuration
@@ -22,34 +29,55 @@ API_KEY        = os.getenv("WRITER_API_KEY")        # set this in env or .env
 CHAT_MODEL     = os.getenv("WRITER_MODEL", "palmyra-chat")
 BASE_MODEL     = CHAT_MODEL.replace("-chat", "-base")  # fallback model
 
-CHAT_URL       = "https://api.writer.com/v1/chat/completions"
-COMP_URL       = "https://api.writer.com/v1/completions"
+PLANNING_DAYS  = 30                                  # horizon named in the prompt
+
+# point at writer_simulator (or any proxy) with WRITER_BASE_URL=http://host:port
+BASE_URL       = os.getenv("WRITER_BASE_URL", "https://api.writer.com").rstrip("/")
+CHAT_URL       = f"{BASE_URL}/v1/chat/completions"
+COMP_URL       = f"{BASE_URL}/v1/completions"
 
 # ─────────────────────────────────────────────────────────────────────────────
 # Retryable HTTP session (3 tries, 1.5-s back-off)
 # ─────────────────────────────────────────────────────────────────────────────
 _session = requests.Session()
-_session.mount(
-    "https://",
-    HTTPAdapter(
-        max_retries=Retry(
-            total=3,
-            backoff_factor=1.5,
-            status_forcelist=[502, 503, 504],
-            allowed_methods=["POST"],
-        )
-    ),
+_adapter = HTTPAdapter(
+    max_retries=Retry(
+        total=3,
+        backoff_factor=1.5,
+        status_forcelist=[502, 503, 504],
+        allowed_methods=["POST"],
+    )
 )
+_session.mount("https://", _adapter)
+_session.mount("http://", _adapter)     # local simulator
 
 # ─────────────────────────────────────────────────────────────────────────────
 # In-memory 10-minute cache
 # ─────────────────────────────────────────────────────────────────────────────
 _CACHE: TTLCache = TTLCache(maxsize=100, ttl=600)
 
+# ─────────────────────────────────────────────────────────────────────────────
+# Instrumentation
+# ─────────────────────────────────────────────────────────────────────────────
+_RETRIES      = metrics.counter("scout_writer_retries_total", "HTTP retries on Writer calls")
+_FALLBACKS    = metrics.counter("scout_writer_fallbacks_total", "chat 400s answered by completions")
+_CACHE_LOOKUP = metrics.counter("scout_schedule_cache_total", "generate_schedule cache lookups")
+_PROMPT_BYTES = metrics.histogram("scout_prompt_bytes", "Size of prompts sent to Writer",
+                                  buckets=metrics.SIZE_BUCKETS)
+_REPLAN       = metrics.counter("scout_replan_sessions_total",
+                                "Suggestions kept or re-requested by replan_schedule")
+
+
+def _count_retries(r: requests.Response, endpoint: str) -> None:
+    retries = getattr(r.raw, "retries", None)
+    if retries is not None and retries.history:
+        _RETRIES.inc(len(retries.history), endpoint=endpoint)
+
 
 # ─────────────────────────────────────────────────────────────────────────────
 # Writer helpers
 # ─────────────────────────────────────────────────────────────────────────────
+@metrics.timed("scout_writer_request_seconds", endpoint="chat")
 def _writer_chat(prompt: str) -> str:
     """Primary call – chat endpoint with strict JSON response."""
     body = {
@@ -67,6 +95,7 @@ def _writer_chat(prompt: str) -> str:
         json=body,
         timeout=60,
     )
+    _count_retries(r, "chat")
     if r.status_code == 400:
         raise requests.HTTPError(r.text, response=r)
     if r.status_code == 401:
@@ -82,6 +111,7 @@ def _writer_chat(prompt: str) -> str:
 
 
 
+@metrics.timed("scout_writer_request_seconds", endpoint="completions")
 def _writer_comp(prompt: str) -> str:
     """Fallback – Writer /v1/completions with JSON output."""
     body = {
@@ -100,6 +130,7 @@ def _writer_comp(prompt: str) -> str:
         json=body,
         timeout=60,
     )
+    _count_retries(r, "completions")
     if r.status_code == 400:
         raise RuntimeError(f"Writer 400 (completions): {r.text}")
     r.raise_for_status()
@@ -126,8 +157,8 @@ def _call_writer(prompt: str) -> str:
         return _writer_chat(prompt)
     except requests.HTTPError as e:
         if e.response is not None and e.response.status_code == 400:
-            # print body for debug
-            print("Writer chat 400 body →", e.response.text[:250])
+            log.warning("Writer chat 400 body → %s", e.response.text[:250])
+            _FALLBACKS.inc()
             return _writer_comp(prompt)
         raise RuntimeError(f"Writer error: {e}") from None
     except requests.Timeout:
@@ -138,9 +169,13 @@ def _call_writer(prompt: str) -> str:
 # Prompt builder
 # ─────────────────────────────────────────────────────────────────────────────
 def _build_prompt(events, holidays, badge_needs, prefs) -> str:
+    # merged holiday spans inside the horizon only – overlaps and past years are noise
+    today = date.today()
+    closed = AvailabilityIndex(holidays=holidays).holidays_between(
+        today, today + timedelta(days=PLANNING_DAYS))
     return f"""
-Existing events: {[e['date'] for e in events]}
-School holidays: {[ (h['start'], h['end']) for h in holidays ]}
+Existing events: {EventTable.from_dicts(events).distinct_dates()}
+School holidays: {[(s.isoformat(), e.isoformat()) for s, e in closed]}
 
 Badge sessions needed:
 {json.dumps(badge_needs, indent=2)}
@@ -149,7 +184,7 @@ Preferences:
   • weekend_only: {prefs['weekend_only']}
   • time_of_day:  {prefs['time_of_day']}
 
-For each badge, output exactly sessions_left dates within the next 30 days
+For each badge, output exactly sessions_left dates within the next {PLANNING_DAYS} days
 that do NOT clash with events or holidays and respect preferences.
 Return ONLY valid JSON in this form:
 
@@ -159,6 +194,27 @@ Return ONLY valid JSON in this form:
 """
 
 
+def _badge_needs(badges: Dict[str, Dict[str, Any]]) -> List[Dict[str, Any]]:
+    return [
+        {
+            "name": n,
+            "sessions_left": max(1, round((100 - b["completion"]) / 100 * b["sessions"])),
+        }
+        for n, b in badges.items()
+        if b["status"] != "Completed"
+    ]
+
+
+def _cache_key(events, holidays, badge_needs, prefs) -> str:
+    key_material = {
+        "events": sorted(e["date"] for e in events),
+        "holidays": sorted(f"{h['start']}_{h['end']}" for h in holidays),
+        "badge_needs": badge_needs,
+        "prefs": prefs,
+    }
+    return hashlib.sha256(json.dumps(key_material, sort_keys=True).encode()).hexdigest()
+
+
 # ─────────────────────────────────────────────────────────────────────────────
 # Public API
 # ─────────────────────────────────────────────────────────────────────────────
@@ -171,28 +227,27 @@ def generate_schedule(
     """
     Return list of {"badge","date"} suggestions (uses cache, raises RuntimeError on failure).
     """
-    badge_needs = [
-        {
-            "name": n,
-            "sessions_left": max(1, round((100 - b["completion"]) / 100 * b["sessions"])),
-        }
-        for n, b in badges.items()
-        if b["status"] != "Completed"
-    ]
+    badge_needs = _badge_needs(badges)
     if not badge_needs:
         return []
 
-    key_material = {
-        "events": sorted(e["date"] for e in events),
-        "holidays": sorted(f"{h['start']}_{h['end']}" for h in holidays),
-        "badge_needs": badge_needs,
-        "prefs": prefs,
-    }
-    cache_key = hashlib.sha256(json.dumps(key_material, sort_keys=True).encode()).hexdigest()
+    # only occurrences inside the planning horizon can clash; recurring
+    # events are expanded lazily for that window instead of stored per date
+    today = date.today()
+    events = list(expand(events, today, today + timedelta(days=PLANNING_DAYS)))
+    return _plan(events, holidays, badge_needs, prefs)
+
+
+def _plan(events, holidays, badge_needs, prefs) -> List[Dict[str, str]]:
+    """Ask Writer (through the cache) for dates covering *badge_needs*."""
+    cache_key = _cache_key(events, holidays, badge_needs, prefs)
     if (cached := _CACHE.get(cache_key)):
+        _CACHE_LOOKUP.inc(result="hit")
         return cached
+    _CACHE_LOOKUP.inc(result="miss")
 
     prompt = _build_prompt(events, holidays, badge_needs, prefs)
+    _PROMPT_BYTES.observe(len(prompt.encode("utf-8")))
     raw = _call_writer(prompt)
 
     try:
@@ -209,12 +264,130 @@ def generate_schedule(
     return suggestions
 
 
+# ─────────────────────────────────────────────────────────────────────────────
+# Incremental re-planning
+# ─────────────────────────────────────────────────────────────────────────────
+def _day(value: Any) -> str:
+    return str(value)[:10]
+
+
+def _suggestion_ok(s, event_days, holiday_index, prefs, today: date) -> bool:
+    """Would *s* still be accepted under the current constraints?"""
+    try:
+        d = date.fromisoformat(_day(s["date"]))
+    except (KeyError, ValueError):
+        return False
+    iso = d.isoformat()
+    if not today <= d <= today + timedelta(days=PLANNING_DAYS):
+        return False
+    if iso in event_days:
+        return False
+    if holiday_index.is_holiday(d):
+        return False
+    return not (prefs.get("weekend_only") and d.weekday() < 5)
+
+
+def diff_plan(previous, events, badges, holidays, prefs, changed=(), today=None):
+    """
+    Split *previous* suggestions against the current inputs.
+
+    Returns ``(kept, needs)``: the suggestions that are still valid, and the
+    ``{"name", "sessions_left"}`` entries still to be planned.  A suggestion
+    is dropped when its badge is done, its date now clashes or falls outside
+    the horizon, or it was accepted (an event with the badge's title now sits
+    on that date).  Every event in the horizon titled with a badge's name
+    counts as a booked session of that badge.  Badges listed in
+    *changed* are planned from scratch.  A badge with more valid dates than
+    ``sessions_left`` keeps the earliest ones.
+    """
+    today = today or date.today()
+    horizon = list(expand(events, today, today + timedelta(days=PLANNING_DAYS)))
+    return _split_plan(previous, horizon, badges, holidays, prefs, changed, today)
+
+
+def _split_plan(previous, horizon, badges, holidays, prefs, changed, today):
+    holiday_index = AvailabilityIndex(holidays=holidays)
+    event_days = {_day(e["date"]) for e in horizon}
+    accepted = {(e.get("title"), _day(e["date"])) for e in horizon}
+    booked: Dict[str, int] = {}
+    for title, _ in accepted:
+        booked[title] = booked.get(title, 0) + 1
+    changed = set(changed)
+
+    by_badge: Dict[str, List[Dict[str, str]]] = {}
+    for s in previous:
+        by_badge.setdefault(s.get("badge"), []).append(s)
+
+    kept: List[Dict[str, str]] = []
+    needs: List[Dict[str, Any]] = []
+    for need in _badge_needs(badges):
+        # accepted sessions count whether or not their suggestion is still in *previous*
+        name, left = need["name"], need["sessions_left"] - booked.get(need["name"], 0)
+        valid, seen = [], set()
+        if name not in changed:
+            for s in sorted(by_badge.get(name, ()), key=lambda s: _day(s.get("date"))):
+                day = _day(s.get("date"))
+                if (name, day) in accepted:
+                    continue
+                if day not in seen and _suggestion_ok(s, event_days, holiday_index, prefs, today):
+                    seen.add(day)
+                    valid.append(s)
+        left = max(left, 0)
+        kept.extend(valid[:left])
+        if len(valid) < left:
+            needs.append({"name": name, "sessions_left": left - len(valid)})
+    return kept, needs
+
+
+def replan_schedule(
+    previous: List[Dict[str, str]],
+    events: List[Dict[str, Any]],
+    badges: Dict[str, Dict[str, Any]],
+    holidays: List[Dict[str, Any]],
+    prefs: Dict[str, Any],
+    changed=(),
+) -> List[Dict[str, str]]:
+    """
+    Update *previous* (a ``generate_schedule`` result) for new inputs.
+
+    Only badges that lost dates to a clash, had ``sessions_left`` change or
+    are named in *changed* go back to Writer, and only for the dates they
+    are missing; everything else is kept as is.  With no previous plan this
+    is ``generate_schedule``.
+    """
+    if not previous:
+        return generate_schedule(events, badges, holidays, prefs)
+
+    today = date.today()
+    horizon = list(expand(events, today, today + timedelta(days=PLANNING_DAYS)))
+    kept, needs = _split_plan(previous, horizon, badges, holidays, prefs, changed, today)
+    _REPLAN.inc(len(kept), result="kept")
+    if not needs:
+        return kept
+    _REPLAN.inc(sum(n["sessions_left"] for n in needs), result="replanned")
+
+    event_days = {_day(e["date"]) for e in horizon}
+    holiday_index = AvailabilityIndex(holidays=holidays)
+    missing = {n["name"]: n["sessions_left"] for n in needs}
+    taken = {(s["badge"], _day(s["date"])) for s in kept}
+    fresh = []
+    for s in _plan(horizon, holidays, needs, prefs):
+        key = (s.get("badge"), _day(s.get("date")))
+        if (missing.get(key[0], 0) > 0 and key not in taken
+                and _suggestion_ok(s, event_days, holiday_index, prefs, today)):
+            missing[key[0]] -= 1
+            taken.add(key)
+            fresh.append(s)
+    return sorted(kept + fresh, key=lambda s: (_day(s["date"]), s["badge"]))
+
+
 def add_suggestion(events: List[Dict[str, Any]], suggestion: Dict[str, str]) -> List[Dict[str, Any]]:
     """
-    Append a suggestion to events list and persist to disk.
+    Append a suggestion to the persisted events and return the fresh list.
+
+    *events* is only kept for backwards compatibility: the append goes through
+    ``data_store.add_event`` so concurrent edits from other sessions survive.
     """
-    events.append(
+    return add_event(
         {"date": suggestion["date"], "title": suggestion["badge"], "description": ""}
     )
-    save_events(events)
-    return events
@@ -0,0 +1,375 @@
+"""
+Term / scout-year planner for badge sessions.
+
+``generate_schedule`` asks Writer for dates in the next 30 days one prompt at
+a time.  ``plan_season`` instead places every outstanding badge session on
+the troop's weekly meeting nights across a whole term or year, offline:
+
+* **nights** – the meeting weekday between ``start`` and ``end`` that is not a
+  holiday or already taken by an event (``AvailabilityIndex.free_days``);
+* **capacity** – at most ``capacity`` badge sessions per night, further
+  capped by how many leaders are available that night;
+* **leaders** – a badge listing ``"leaders"`` only goes on nights where one of
+  them is available (``leader_availability``: date → leader names; nights
+  not listed are unrestricted);
+* **spacing** – consecutive sessions of a badge are at least ``min_gap_days``
+  apart (hard) and ideally ``target_gap_days`` apart (soft).
+
+The objective (lower is better) is ``UNSCHEDULED_COST × priority`` for every
+session that could not be placed plus a squared penalty, per gap, for each
+week a badge's sessions fall short of the target gap.  Badges close to
+completion have a higher priority.
+
+A greedy pass places the most constrained badges first, spreading each
+badge's sessions evenly over the season; a seeded local search (relocate,
+swap, and steal-a-slot moves, each scored on the two badges it touches)
+then improves it until ``time_limit`` or ``max_iters``.  100+ badges over 52
+weeks solve in well under a second.
+
+    plan = plan_season(load_badges(), load_events(), load_holidays())
+    plan.summary()   # objective, greedy objective, solve time, ...
+"""
+from __future__ import annotations
+
+import argparse
+import datetime as dt
+import json
+import logging
+import random
+import time
+from bisect import bisect_left
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from . import metrics
+from .availability import AvailabilityIndex
+from .event_table import to_ordinal
+
+log = logging.getLogger(__name__)
+
+UNSCHEDULED_COST = 100.0   # per session left off the plan (× priority)
+SPACING_COST = 1.0         # per (weeks short of target)² per gap
+
+_SOLVE = metrics.histogram("scout_season_plan_seconds", "plan_season solve time")
+
+
+@dataclass
+class SeasonConfig:
+    meeting_weekday: int = 4        # Mon=0 … Sun=6
+    capacity: int = 2               # badge sessions per meeting night
+    min_gap_days: int = 7
+    target_gap_days: int = 14
+    time_limit: float = 2.0         # seconds of local search
+    max_iters: int = 200_000
+    patience: int = 20_000          # stop after this many moves without improvement
+    seed: int = 0
+
+
+@dataclass
+class SeasonPlan:
+    assignments: List[Dict[str, str]]   # [{"badge", "date"}] in date order
+    unscheduled: Dict[str, int]         # badge → sessions that did not fit
+    objective: float
+    greedy_objective: float
+    scheduled: int
+    spacing_penalty: float
+    nights: int
+    iterations: int
+    solve_seconds: float
+    config: SeasonConfig = field(repr=False, default_factory=SeasonConfig)
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "objective": round(self.objective, 3),
+            "greedy_objective": round(self.greedy_objective, 3),
+            "scheduled": self.scheduled,
+            "unscheduled": sum(self.unscheduled.values()),
+            "spacing_penalty": round(self.spacing_penalty, 3),
+            "nights": self.nights,
+            "iterations": self.iterations,
+            "solve_seconds": round(self.solve_seconds, 4),
+        }
+
+
+# --------------------------------------------------------------------------- #
+# Problem set-up
+# --------------------------------------------------------------------------- #
+def sessions_left(badge: Dict[str, Any]) -> int:
+    """Same rule as ``scheduler_logic``: the unfinished share of ``sessions``."""
+    if badge.get("status") == "Completed":
+        return 0
+    return max(1, round((100 - badge.get("completion", 0)) / 100 * badge.get("sessions", 1)))
+
+
+def meeting_nights(events, holidays, start, end, weekday) -> List[dt.date]:
+    index = AvailabilityIndex(events, holidays, horizon=(start, end))
+    return [d for d in index.free_days(start, end) if d.weekday() == weekday]
+
+
+class _Badge:
+    __slots__ = ("name", "need", "priority", "min_gap", "target_gap", "nights", "placed")
+
+    def __init__(self, name, need, priority, min_gap, target_gap, nights):
+        self.name = name
+        self.need = need
+        self.priority = priority
+        self.min_gap = min_gap
+        self.target_gap = target_gap
+        self.nights: List[int] = nights     # feasible night indices, ascending
+        self.placed: List[int] = []         # chosen night indices, ascending
+
+
+class _Problem:
+    def __init__(self, badges: List[_Badge], ords: List[int], caps: List[int]) -> None:
+        self.badges = badges
+        self.ords = ords
+        self.caps = caps
+        self.load = [0] * len(ords)
+        self.on_night: List[Set[int]] = [set() for _ in ords]   # badge indices
+
+    # ------------------------------ scoring ------------------------------ #
+    def cost(self, b: _Badge, placed: List[int]) -> float:
+        c = UNSCHEDULED_COST * b.priority * (b.need - len(placed))
+        for x, y in zip(placed, placed[1:]):
+            short = b.target_gap - (self.ords[y] - self.ords[x])
+            if short > 0:
+                c += SPACING_COST * (short / 7) ** 2
+        return c
+
+    def spaced(self, b: _Badge, placed: List[int]) -> bool:
+        return all(self.ords[y] - self.ords[x] >= b.min_gap for x, y in zip(placed, placed[1:]))
+
+    def total(self) -> Tuple[float, float]:
+        cost = spacing = 0.0
+        for b in self.badges:
+            c = self.cost(b, b.placed)
+            cost += c
+            spacing += c - UNSCHEDULED_COST * b.priority * (b.need - len(b.placed))
+        return cost, spacing
+
+    # ------------------------------ editing ------------------------------ #
+    def place(self, i: int, n: int) -> None:
+        b = self.badges[i]
+        b.placed.insert(bisect_left(b.placed, n), n)
+        self.load[n] += 1
+        self.on_night[n].add(i)
+
+    def unplace(self, i: int, n: int) -> None:
+        self.badges[i].placed.remove(n)
+        self.load[n] -= 1
+        self.on_night[n].discard(i)
+
+
+def _with(placed: List[int], add: Optional[int] = None, drop: Optional[int] = None) -> List[int]:
+    out = [n for n in placed if n != drop]
+    if add is not None:
+        out.insert(bisect_left(out, add), add)
+    return out
+
+
+def _build(badges, nights, config, leader_availability) -> _Problem:
+    ords = [d.toordinal() for d in nights]
+    available = None
+    if leader_availability is not None:
+        available = {to_ordinal(d): set(names) for d, names in leader_availability.items()}
+    caps = [
+        min(config.capacity, len(available[o])) if available is not None and o in available
+        else config.capacity
+        for o in ords
+    ]
+
+    out = []
+    for name, rec in badges.items():
+        need = sessions_left(rec)
+        if not need:
+            continue
+        leaders = set(rec.get("leaders") or ())
+        if leaders and available is not None:
+            feasible = [k for k, o in enumerate(ords)
+                        if caps[k] and leaders & available.get(o, leaders)]
+        else:
+            feasible = [k for k in range(len(ords)) if caps[k]]
+        out.append(_Badge(
+            name, need,
+            priority=1 + rec.get("completion", 0) / 100,
+            min_gap=int(rec.get("min_gap_days", config.min_gap_days)),
+            target_gap=int(rec.get("target_gap_days", config.target_gap_days)),
+            nights=feasible,
+        ))
+    return _Problem(out, ords, caps)
+
+
+# --------------------------------------------------------------------------- #
+# Solver
+# --------------------------------------------------------------------------- #
+def _greedy(p: _Problem) -> None:
+    """Most constrained first; session k aims for the k-th slice of the season."""
+    if not p.ords:
+        return
+    first, span = p.ords[0], p.ords[-1] - p.ords[0] + 1
+    order = sorted(range(len(p.badges)),
+                   key=lambda i: (len(p.badges[i].nights) / p.badges[i].need,
+                                  -p.badges[i].priority))
+    for i in order:
+        b = p.badges[i]
+        feasible_ords = [p.ords[n] for n in b.nights]
+        for k in range(b.need):
+            ideal = first + (k + 0.5) * span / b.need
+            j = bisect_left(feasible_ords, ideal)
+            lo, hi = j - 1, j
+            while lo >= 0 or hi < len(b.nights):
+                # walk outwards from the ideal night, nearest first
+                if hi >= len(b.nights) or (lo >= 0 and ideal - feasible_ords[lo] <= feasible_ords[hi] - ideal):
+                    n, lo = b.nights[lo], lo - 1
+                else:
+                    n, hi = b.nights[hi], hi + 1
+                if p.load[n] < p.caps[n] and n not in b.placed and p.spaced(b, _with(b.placed, add=n)):
+                    p.place(i, n)
+                    break
+
+
+def _search(p: _Problem, config: SeasonConfig, deadline: float) -> int:
+    rng = random.Random(config.seed)
+    movable = [i for i, b in enumerate(p.badges) if b.nights]
+    if not movable:
+        return 0
+    it = stale = 0
+    while it < config.max_iters and stale < config.patience:
+        if it & 255 == 0 and time.perf_counter() > deadline:
+            break
+        it += 1
+        stale += 1
+        i = rng.choice(movable)
+        b = p.badges[i]
+        n = rng.choice(b.nights)
+        if n in b.placed:
+            continue
+        old = p.cost(b, b.placed)
+
+        if len(b.placed) < b.need:
+            # insert a missing session, stealing the slot if the night is full
+            new_placed = _with(b.placed, add=n)
+            if not p.spaced(b, new_placed):
+                continue
+            if p.load[n] < p.caps[n]:
+                p.place(i, n)
+                stale = 0
+                continue
+            j = rng.choice(tuple(p.on_night[n]))
+            c = p.badges[j]
+            c_placed = _with(c.placed, drop=n)
+            delta = (p.cost(b, new_placed) - old) + (p.cost(c, c_placed) - p.cost(c, c.placed))
+            if delta < 0:
+                p.unplace(j, n)
+                p.place(i, n)
+                stale = 0
+            continue
+
+        if not b.placed:
+            continue
+        m = rng.choice(b.placed)
+        new_placed = _with(b.placed, add=n, drop=m)
+        if not p.spaced(b, new_placed):
+            continue
+        if p.load[n] < p.caps[n]:
+            # relocate m → n
+            delta = p.cost(b, new_placed) - old
+            if delta <= 0:
+                p.unplace(i, m)
+                p.place(i, n)
+                if delta < 0:
+                    stale = 0
+            continue
+        # swap with a badge on the full night n that can take night m
+        j = rng.choice(tuple(p.on_night[n]))
+        c = p.badges[j]
+        if j == i or m in c.placed or m not in c.nights:
+            continue
+        c_placed = _with(c.placed, add=m, drop=n)
+        if not p.spaced(c, c_placed):
+            continue
+        delta = (p.cost(b, new_placed) - old) + (p.cost(c, c_placed) - p.cost(c, c.placed))
+        if delta <= 0:
+            p.unplace(i, m)
+            p.unplace(j, n)
+            p.place(i, n)
+            p.place(j, m)
+            if delta < 0:
+                stale = 0
+    return it
+
+
+def plan_season(
+    badges: Dict[str, Dict[str, Any]],
+    events: Iterable[Dict[str, Any]] = (),
+    holidays: Iterable[Dict[str, Any]] = (),
+    start: Any = None,
+    end: Any = None,
+    config: Optional[SeasonConfig] = None,
+    leader_availability: Optional[Dict[Any, Iterable[str]]] = None,
+) -> SeasonPlan:
+    """
+    Plan every outstanding badge session between *start* (default today) and
+    *end* (default 52 weeks on).  Per-badge ``min_gap_days``,
+    ``target_gap_days`` and ``leaders`` in the badge records override the
+    config.  Never raises for an over-full season – what does not fit is
+    reported in ``unscheduled``.
+    """
+    config = config or SeasonConfig()
+    start = dt.date.fromordinal(to_ordinal(start)) if start else dt.date.today()
+    end = dt.date.fromordinal(to_ordinal(end)) if end else start + dt.timedelta(weeks=52)
+
+    t0 = time.perf_counter()
+    nights = meeting_nights(events, holidays, start, end, config.meeting_weekday)
+    p = _build(badges, nights, config, leader_availability)
+    _greedy(p)
+    greedy_objective, _ = p.total()
+    iterations = _search(p, config, t0 + config.time_limit)
+    objective, spacing = p.total()
+    elapsed = time.perf_counter() - t0
+    _SOLVE.observe(elapsed)
+
+    assignments = sorted(
+        ({"badge": b.name, "date": nights[n].isoformat()} for b in p.badges for n in b.placed),
+        key=lambda s: (s["date"], s["badge"]),
+    )
+    plan = SeasonPlan(
+        assignments=assignments,
+        unscheduled={b.name: b.need - len(b.placed) for b in p.badges if len(b.placed) < b.need},
+        objective=objective,
+        greedy_objective=greedy_objective,
+        scheduled=len(assignments),
+        spacing_penalty=spacing,
+        nights=len(nights),
+        iterations=iterations,
+        solve_seconds=elapsed,
+        config=config,
+    )
+    log.info("season plan: %s", plan.summary())
+    return plan
+
+
+def main(argv=None) -> None:
+    from . import data_store
+
+    ap = argparse.ArgumentParser(description="Plan badge sessions across a term or year")
+    ap.add_argument("--start", help="YYYY-MM-DD (default today)")
+    ap.add_argument("--weeks", type=int, default=52)
+    ap.add_argument("--weekday", type=int, default=SeasonConfig.meeting_weekday, help="Mon=0 … Sun=6")
+    ap.add_argument("--capacity", type=int, default=SeasonConfig.capacity)
+    ap.add_argument("--time-limit", type=float, default=SeasonConfig.time_limit)
+    ap.add_argument("--seed", type=int, default=SeasonConfig.seed)
+    args = ap.parse_args(argv)
+
+    start = dt.date.fromisoformat(args.start) if args.start else dt.date.today()
+    plan = plan_season(
+        data_store.load_badges(), data_store.load_events(), data_store.load_holidays(),
+        start=start, end=start + dt.timedelta(weeks=args.weeks),
+        config=SeasonConfig(meeting_weekday=args.weekday, capacity=args.capacity,
+                            time_limit=args.time_limit, seed=args.seed),
+    )
+    print(json.dumps(plan.summary(), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,287 @@
+"""
+Structured, date-indexed session store.
+
+Replaces the legacy ``sessions.json`` list of ``"DD-MM-YYYY HH:MM - title"``
+strings.  Sessions are ``data_models.Session`` objects with an ISO date and
+kept sorted by ``(date, time)``, so
+
+* a day or week lookup is two bisects plus the slice it returns;
+* add / remove find their slot by bisect (O(log n) search);
+* nothing is ever re-parsed from strings after the one-off migration.
+
+``migrate_legacy`` and ``sessions_from_events`` are generators and
+``iter_legacy_file`` decodes the old JSON array one string at a time, so the
+migration streams a source of any size into a single sorted bulk load.
+
+    store = SessionStore.load()          # migrates legacy sessions.json once
+    store.on_day(dt.date(2025, 3, 4))
+    store.add(Session(date="2025-03-04", time="18:30", title="Cubs"))
+    store.save()
+"""
+from __future__ import annotations
+
+import datetime as dt
+import heapq
+import json
+import logging
+import re
+from bisect import bisect_left, bisect_right
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from . import data_store
+from .data_models import Session
+
+log = logging.getLogger(__name__)
+
+Key = Tuple[str, str, str]
+
+CHUNK = 64 * 1024          # bytes read at a time from the legacy file
+
+_TIME_RE = re.compile(r"^\s*(\d{1,2}):(\d{2})\s*$")
+_LEGACY_RE = re.compile(
+    r"^\s*(?P<date>\d{1,2}-\d{1,2}-\d{4}|\d{4}-\d{2}-\d{2})"
+    r"(?:\s+(?P<time>\d{1,2}:\d{2}))?\s*-\s*(?P<title>.*?)\s*$"
+)
+
+
+def _key(s: Session) -> Key:
+    return (s.date, s.time, s.title)
+
+
+def _iso(day: Any) -> str:
+    return day.isoformat() if isinstance(day, dt.date) else str(day)[:10]
+
+
+def normalize_time(text: str) -> Optional[str]:
+    """``"9:30"`` → ``"09:30"``; None unless it is a valid 24-hour ``H:MM``."""
+    m = _TIME_RE.match(text)
+    if not m:
+        return None
+    h, mi = int(m.group(1)), int(m.group(2))
+    if h > 23 or mi > 59:
+        return None
+    return f"{h:02d}:{mi:02d}"
+
+
+def _ordered(sessions: Iterable[Session]) -> Tuple[List[Session], List[Key]]:
+    """Items and keys in (date, time, title) order; sorts only if they aren't already."""
+    items = list(sessions)
+    keys = [_key(s) for s in items]
+    if any(b < a for a, b in zip(keys, keys[1:])):
+        items.sort(key=_key)
+        keys = [_key(s) for s in items]
+    return items, keys
+
+
+def label(s: Session) -> str:
+    """The legacy display form, ``DD-MM-YYYY HH:MM - title``."""
+    d = dt.date.fromisoformat(s.date)
+    when = f"{d:%d-%m-%Y} {s.time}" if s.time else f"{d:%d-%m-%Y}"
+    return f"{when} - {s.title}"
+
+
+# --------------------------------------------------------------------------- #
+# Migration sources
+# --------------------------------------------------------------------------- #
+def parse_legacy(line: str) -> Optional[Session]:
+    """``"DD-MM-YYYY HH:MM - title"`` (time optional) → ``Session``, or None."""
+    m = _LEGACY_RE.match(line)
+    if not m:
+        return None
+    raw = m.group("date")
+    try:
+        if "-" in raw and len(raw.split("-")[0]) == 4:
+            day = dt.date.fromisoformat(raw)
+        else:
+            d, mth, y = (int(x) for x in raw.split("-"))
+            day = dt.date(y, mth, d)
+    except ValueError:
+        return None
+    time = m.group("time") or ""
+    if time:
+        time = normalize_time(time)
+        if time is None:
+            return None
+    return Session(date=day.isoformat(), time=time, title=m.group("title"))
+
+
+def iter_legacy_file(path: Path, chunk: int = CHUNK) -> Iterator[Any]:
+    """
+    Yield the items of the legacy ``sessions.json`` array one by one,
+    reading *chunk* characters at a time instead of loading the whole file.
+    """
+    decoder = json.JSONDecoder()
+    with open(path, encoding="utf-8") as fh:
+        buf, pos, eof = "", 0, False
+        expect = "["            # then "item" (or "]"), "sep" ("," or "]"), "value"
+        while True:
+            while pos < len(buf) and buf[pos].isspace():
+                pos += 1
+            if pos < len(buf):
+                ch = buf[pos]
+                if expect == "[":
+                    if ch != "[":
+                        raise ValueError(f"{path}: expected a JSON array")
+                    pos, expect = pos + 1, "item"
+                    continue
+                if expect == "sep":
+                    if ch == ",":
+                        pos, expect = pos + 1, "value"
+                        continue
+                    if ch == "]":
+                        return
+                    raise ValueError(f"{path}: malformed JSON array at {ch!r}")
+                if expect == "item" and ch == "]":
+                    return
+                try:
+                    item, end = decoder.raw_decode(buf, pos)
+                except json.JSONDecodeError:
+                    end = None
+                # an item running to the end of the buffer may continue in the next chunk
+                if end is not None and (end < len(buf) or eof):
+                    yield item
+                    pos, expect = end, "sep"
+                    continue
+            if eof:
+                raise ValueError(f"{path}: truncated or malformed JSON array")
+            more = fh.read(chunk)
+            eof = not more
+            buf, pos = buf[pos:] + more, 0
+
+
+def migrate_legacy(lines: Iterable[str]) -> Iterator[Session]:
+    """Stream legacy session strings as ``Session``s, skipping bad lines."""
+    for n, line in enumerate(lines):
+        s = parse_legacy(line)
+        if s is None:
+            log.warning("skipping unparseable legacy session %d: %r", n, line)
+            continue
+        yield s
+
+
+def sessions_from_events(
+    events: Iterable[Dict[str, Any]],
+    start: Optional[dt.date] = None,
+    end: Optional[dt.date] = None,
+) -> Iterator[Session]:
+    """
+    Stream ``data_store`` events as ``Session``s.  Recurring events are
+    expanded within ``[start, end]`` (default: today to a year ahead).
+    """
+    from .recurrence import is_recurring, occurrences
+
+    start = start or dt.date.today()
+    end = end or start + dt.timedelta(days=366)
+    for ev in events:
+        instances = occurrences(ev, start, end) if is_recurring(ev) else (ev,)
+        for inst in instances:
+            yield Session(date=_iso(inst["date"]), time=inst.get("time", ""),
+                          title=inst.get("title", ""))
+
+
+# --------------------------------------------------------------------------- #
+# Store
+# --------------------------------------------------------------------------- #
+class SessionStore:
+    def __init__(self, sessions: Iterable[Session] = (), version: Optional[int] = None) -> None:
+        self._items: List[Session]
+        self._keys: List[Key]
+        self._items, self._keys = _ordered(sessions)
+        self._version = version
+
+    # ---------------------------- persistence ---------------------------- #
+    @classmethod
+    def load(cls, legacy_file=None) -> "SessionStore":
+        """
+        Load the structured store.  If it has never been written and a
+        legacy string file exists, migrate it (the old file is left alone).
+        """
+        records, version = data_store.load_session_records_versioned()
+        if version == 0:
+            from .data_management import SESSION_FILE
+
+            legacy = Path(legacy_file or SESSION_FILE)
+            if legacy.exists():
+                store = cls(migrate_legacy(iter_legacy_file(legacy)), version=0)
+                store.save()
+                return store
+        # saved in order, so __init__ only checks the order and never sorts
+        return cls((Session(**r) for r in records), version)
+
+    def save(self) -> int:
+        """Write back; raises ``StaleWriteError`` if someone saved since ``load``."""
+        self._version = data_store.save_session_records(
+            [s.model_dump() for s in self._items], expected_version=self._version
+        )
+        return self._version
+
+    def extend(self, sessions: Iterable[Session]) -> int:
+        """Bulk add (sorts only the new sessions, then merges); returns how many were added."""
+        new, new_keys = _ordered(sessions)
+        if new:
+            merged = list(heapq.merge(zip(self._keys, self._items), zip(new_keys, new),
+                                      key=lambda pair: pair[0]))
+            self._keys = [k for k, _ in merged]
+            self._items = [s for _, s in merged]
+        return len(new)
+
+    def reset(self, sessions: Iterable[Session]) -> None:
+        """Replace the contents (the next ``save`` still checks the version)."""
+        self._items, self._keys = _ordered(sessions)
+
+    # ------------------------------ editing ------------------------------ #
+    def add(self, session: Session) -> int:
+        """Insert in order; returns the index it landed at."""
+        k = _key(session)
+        i = bisect_right(self._keys, k)
+        self._keys.insert(i, k)
+        self._items.insert(i, session)
+        return i
+
+    def index(self, session: Session) -> int:
+        k = _key(session)
+        i = bisect_left(self._keys, k)
+        if i < len(self._keys) and self._keys[i] == k:
+            return i
+        raise ValueError(f"{label(session)!r} not in store")
+
+    def remove(self, session: Session) -> int:
+        """Remove one matching session; returns the index it had."""
+        i = self.index(session)
+        del self._keys[i]
+        del self._items[i]
+        return i
+
+    def replace(self, old: Session, new: Session) -> int:
+        self.remove(old)
+        return self.add(new)
+
+    # ------------------------------ queries ------------------------------ #
+    def between(self, start: Any, end: Any) -> List[Session]:
+        """Sessions dated within ``[start, end]`` in (date, time) order."""
+        lo = bisect_left(self._keys, (_iso(start),))
+        hi = bisect_left(self._keys, (_next_day(end),))
+        return self._items[lo:hi]
+
+    def on_day(self, day: Any) -> List[Session]:
+        return self.between(day, day)
+
+    def in_week(self, day: Any) -> List[Session]:
+        """The Monday–Sunday week containing *day*."""
+        d = dt.date.fromisoformat(_iso(day))
+        monday = d - dt.timedelta(days=d.weekday())
+        return self.between(monday, monday + dt.timedelta(days=6))
+
+    def __iter__(self) -> Iterator[Session]:
+        return iter(self._items)
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __getitem__(self, i: int) -> Session:
+        return self._items[i]
+
+
+def _next_day(day: Any) -> str:
+    return (dt.date.fromisoformat(_iso(day)) + dt.timedelta(days=1)).isoformat()
@@ -0,0 +1,354 @@
+"""
+Read-only, memory-mapped snapshot of the badge catalogue and holidays.
+
+Every Streamlit session and API worker used to parse ``badges.json`` and
+``holidays.json`` into its own dicts.  ``catalogue.snap`` in ``DATA_DIR``
+is written once after each change and mapped by every process instead, so
+the pages are shared through the OS page cache and a record is decoded
+only when it is looked at.
+
+Layout (little-endian, every section 4-byte aligned)::
+
+    header      magic, badges version, holidays version, counts, meta length
+    meta        JSON: record codec, section and status tables
+    u32 arrays  name offsets (n+1), record offsets (n+1), section id (n),
+                status id (n), merged holiday starts / ends (k), holiday
+                record offsets (h+1)
+    names       badge names, UTF-8, sorted bytewise
+    records     one codec-encoded record per badge, then per holiday
+
+Names are found by binary search over the mapped index, ``filter`` checks
+section / status against the id arrays without decoding anything, and
+``is_holiday`` bisects the merged ordinal spans in place.
+
+``publish`` builds the file from the stores and ``os.replace``-s it over the
+old one; a process that still maps the old file keeps a valid view of it
+until it reopens.  ``current()`` compares the snapshot's versions with
+``data_store.store_version`` on every call (two tiny reads and stats), reopens after
+a swap, and republishes itself if a write happened since – under a lock,
+so only one process rebuilds.  Refreshes publish eagerly.
+
+On Windows a mapped file can't be replaced, so the snapshot is read into
+memory there instead.
+"""
+from __future__ import annotations
+
+import bisect
+import datetime as dt
+import json
+import mmap
+import os
+import struct
+import threading
+from collections.abc import Mapping
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from . import codec, data_store, metrics
+from .event_table import to_ordinal
+
+SNAPSHOT_FILE = "catalogue.snap"
+MAGIC = b"SCSNAP\x01\0"
+RECORD_CODEC = "msgpack" if codec.msgpack is not None else "orjson"
+
+# magic, badges version, holidays version, badges, holidays, merged spans, meta length
+_HEADER = struct.Struct("<8sQQIIII")
+_NONE = 0xFFFFFFFF             # section / status id of a record without one
+
+_PUBLISHED = metrics.counter("scout_snapshot_published_total", "catalogue snapshots written")
+
+
+class SnapshotError(ValueError):
+    """The snapshot file is missing, truncated or of an unknown format."""
+
+
+def _path() -> Path:
+    return data_store.DATA_DIR / SNAPSHOT_FILE
+
+
+def _pad(n: int) -> int:
+    return -n % 4
+
+
+# --------------------------------------------------------------------------- #
+# Writing
+# --------------------------------------------------------------------------- #
+def _merged_spans(holidays: List[Dict[str, Any]]) -> List[Tuple[int, int]]:
+    spans: List[Tuple[int, int]] = []
+    for s, e in sorted(
+        (to_ordinal(h["start"]), to_ordinal(h["end"])) for h in holidays
+        if h.get("start") and h.get("end")
+    ):
+        if e < s:
+            s, e = e, s
+        if spans and s <= spans[-1][1] + 1:
+            spans[-1] = (spans[-1][0], max(spans[-1][1], e))
+        else:
+            spans.append((s, e))
+    return spans
+
+
+def build(
+    badges: Dict[str, Dict[str, Any]],
+    holidays: List[Dict[str, Any]],
+    badges_version: int = 0,
+    holidays_version: int = 0,
+) -> bytes:
+    """Encode a snapshot of *badges* and *holidays*."""
+    enc = codec.Codec.parse(RECORD_CODEC)
+    names = sorted(badges, key=lambda n: n.encode("utf-8"))
+    sections = sorted({str(r["section"]) for r in badges.values() if r.get("section") is not None})
+    statuses = sorted({str(r["status"]) for r in badges.values() if r.get("status") is not None})
+    section_id = {s: i for i, s in enumerate(sections)}
+    status_id = {s: i for i, s in enumerate(statuses)}
+    spans = _merged_spans(holidays)
+
+    name_blob, name_offs = bytearray(), [0]
+    rec_blob, rec_offs = bytearray(), [0]
+    for name in names:
+        name_blob += name.encode("utf-8")
+        name_offs.append(len(name_blob))
+        rec_blob += enc.dumps(badges[name])
+        rec_offs.append(len(rec_blob))
+    hol_offs = [len(rec_blob)]
+    for h in holidays:
+        rec_blob += enc.dumps(h)
+        hol_offs.append(len(rec_blob))
+
+    def _id(table: Dict[str, int], value: Any) -> int:
+        return _NONE if value is None else table[str(value)]
+
+    meta = json.dumps({"codec": RECORD_CODEC, "sections": sections, "statuses": statuses}).encode()
+    meta += b" " * _pad(len(meta))
+    arrays = (
+        name_offs,
+        rec_offs,
+        [_id(section_id, badges[n].get("section")) for n in names],
+        [_id(status_id, badges[n].get("status")) for n in names],
+        [s for s, _ in spans],
+        [e for _, e in spans],
+        hol_offs,
+    )
+    parts = [
+        _HEADER.pack(MAGIC, badges_version, holidays_version,
+                     len(names), len(holidays), len(spans), len(meta)),
+        meta,
+        *(struct.pack(f"<{len(a)}I", *a) for a in arrays),
+        bytes(name_blob), b"\0" * _pad(len(name_blob)),
+        bytes(rec_blob),
+    ]
+    return b"".join(parts)
+
+
+def publish(force: bool = False) -> Path:
+    """
+    Write the snapshot for the stores' current contents and swap it in.
+    Skipped when the file on disk is already at the stores' versions.
+    """
+    with data_store._locked("snapshot"):
+        badges, bver = data_store.load_badges_versioned()
+        holidays, hver = data_store.load_holidays_versioned()
+        file = _path()
+        if not force and _versions_on_disk(file) == (bver, hver):
+            return file
+        with metrics.span("scout_snapshot_publish_seconds"):
+            data_store._atomic_write_bytes(file, build(badges, holidays, bver, hver))
+        _PUBLISHED.inc()
+    return file
+
+
+def _versions_on_disk(file: Path) -> Optional[Tuple[int, int]]:
+    try:
+        with file.open("rb") as fh:
+            head = fh.read(_HEADER.size)
+    except FileNotFoundError:
+        return None
+    if len(head) < _HEADER.size or not head.startswith(MAGIC):
+        return None
+    _, bver, hver, *_ = _HEADER.unpack(head)
+    return bver, hver
+
+
+# --------------------------------------------------------------------------- #
+# Reading
+# --------------------------------------------------------------------------- #
+class BadgeCatalogue(Mapping):
+    """Read-only ``{name: record}`` view; records are decoded on access."""
+
+    def __init__(self, snap: "Snapshot") -> None:
+        self._snap = snap
+
+    def __len__(self) -> int:
+        return self._snap.n_badges
+
+    def __iter__(self) -> Iterator[str]:
+        return (self._snap._name(i) for i in range(self._snap.n_badges))
+
+    def __contains__(self, name: object) -> bool:
+        return isinstance(name, str) and self._snap._find(name) is not None
+
+    def __getitem__(self, name: str) -> Dict[str, Any]:
+        i = self._snap._find(name) if isinstance(name, str) else None
+        if i is None:
+            raise KeyError(name)
+        return self._snap._badge(i)
+
+    def items(self) -> Iterator[Tuple[str, Dict[str, Any]]]:      # type: ignore[override]
+        snap = self._snap
+        return ((snap._name(i), snap._badge(i)) for i in range(snap.n_badges))
+
+    def filter(
+        self, section: Optional[str] = None, status: Optional[str] = None
+    ) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """``(name, record)`` in name order, decoding only the matches."""
+        snap = self._snap
+        want_section = snap._table_id("sections", section)
+        want_status = snap._table_id("statuses", status)
+        if want_section is False or want_status is False:      # value not in the catalogue
+            return
+        for i in range(snap.n_badges):
+            if want_section is not None and snap._sections[i] != want_section:
+                continue
+            if want_status is not None and snap._statuses[i] != want_status:
+                continue
+            yield snap._name(i), snap._badge(i)
+
+
+class Snapshot:
+    """One opened ``catalogue.snap``; cheap to share between threads."""
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        with path.open("rb") as fh:
+            st = os.fstat(fh.fileno())
+            self.identity = (st.st_ino, st.st_mtime_ns, st.st_size)
+            if os.name == "nt":  # pragma: no cover - a mapped file can't be replaced there
+                self._map: Any = fh.read()
+            elif st.st_size == 0:
+                raise SnapshotError(f"{path} is empty")
+            else:
+                self._map = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+        buf = memoryview(self._map)
+        if len(buf) < _HEADER.size or bytes(buf[:len(MAGIC)]) != MAGIC:
+            raise SnapshotError(f"{path} is not a catalogue snapshot")
+        (_, self.badges_version, self.holidays_version,
+         n, h, k, meta_len) = _HEADER.unpack_from(buf)
+        self.n_badges, self.n_holidays = n, h
+
+        pos = _HEADER.size
+        self._meta = json.loads(bytes(buf[pos:pos + meta_len]))
+        self._codec = codec.Codec.parse(self._meta["codec"])
+        pos += meta_len
+
+        def take(count: int) -> memoryview:
+            nonlocal pos
+            view = buf[pos:pos + 4 * count].cast("I")
+            pos += 4 * count
+            return view
+
+        self._name_offs, self._rec_offs = take(n + 1), take(n + 1)
+        self._sections, self._statuses = take(n), take(n)
+        self._starts, self._ends = take(k), take(k)
+        self._hol_offs = take(h + 1)
+        self._names = buf[pos:pos + self._name_offs[n]]
+        pos += self._name_offs[n] + _pad(self._name_offs[n])
+        self._records = buf[pos:]
+        if len(self._records) < self._hol_offs[h]:
+            raise SnapshotError(f"{path} is truncated")
+        self.badges = BadgeCatalogue(self)
+
+    @property
+    def versions(self) -> Tuple[int, int]:
+        return self.badges_version, self.holidays_version
+
+    # ------------------------------ badges ------------------------------ #
+    def _name_bytes(self, i: int) -> bytes:
+        return bytes(self._names[self._name_offs[i]:self._name_offs[i + 1]])
+
+    def _name(self, i: int) -> str:
+        return self._name_bytes(i).decode("utf-8")
+
+    def _find(self, name: str) -> Optional[int]:
+        key = name.encode("utf-8")
+        lo, hi = 0, self.n_badges
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._name_bytes(mid) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo if lo < self.n_badges and self._name_bytes(lo) == key else None
+
+    def _decode(self, start: int, end: int) -> Any:
+        return codec.loads(bytes(self._records[start:end]))
+
+    def _badge(self, i: int) -> Dict[str, Any]:
+        return self._decode(self._rec_offs[i], self._rec_offs[i + 1])
+
+    def _table_id(self, table: str, value: Optional[str]):
+        """None = no filter, False = value never occurs, else its id."""
+        if value is None:
+            return None
+        values = self._meta[table]
+        i = bisect.bisect_left(values, value)
+        return i if i < len(values) and values[i] == value else False
+
+    # ----------------------------- holidays ----------------------------- #
+    def holidays(self) -> List[Dict[str, Any]]:
+        """The holiday records, in store order."""
+        offs = self._hol_offs
+        return [self._decode(offs[i], offs[i + 1]) for i in range(self.n_holidays)]
+
+    def is_holiday(self, day: Any) -> bool:
+        d = to_ordinal(day)
+        i = bisect.bisect_right(self._starts, d) - 1
+        return i >= 0 and d <= self._ends[i]
+
+    def holiday_spans(self) -> List[Tuple[dt.date, dt.date]]:
+        """Merged, disjoint ``(first, last)`` holiday day ranges."""
+        return [(dt.date.fromordinal(s), dt.date.fromordinal(e))
+                for s, e in zip(self._starts, self._ends)]
+
+
+# --------------------------------------------------------------------------- #
+# Process-wide handle
+# --------------------------------------------------------------------------- #
+_current: Optional[Snapshot] = None
+_current_lock = threading.Lock()
+
+
+def _open_if_changed(file: Path, snap: Optional[Snapshot]) -> Optional[Snapshot]:
+    try:
+        st = file.stat()
+    except FileNotFoundError:
+        return None
+    if snap is not None and snap.path == file and snap.identity == (st.st_ino, st.st_mtime_ns, st.st_size):
+        return snap
+    try:
+        return Snapshot(file)
+    except (SnapshotError, FileNotFoundError):
+        return None
+
+
+def current() -> Snapshot:
+    """
+    The snapshot for the stores' current versions, shared by all callers in
+    this process.  Reopens after another process swapped the file and
+    republishes if the stores moved on since it was written.
+    """
+    global _current
+    wanted = (data_store.store_version("badges"), data_store.store_version("holidays"))
+    snap = _current
+    if snap is not None and snap.versions == wanted and snap.path.parent == data_store.DATA_DIR:
+        return snap
+    with _current_lock:
+        file = _path()
+        snap = _open_if_changed(file, _current)
+        if snap is None or snap.versions != wanted:
+            publish()
+            snap = _open_if_changed(file, snap)
+            if snap is None:
+                raise SnapshotError(f"could not open {file}")
+        # the old mapping is released once no caller holds a view of it
+        _current = snap
+        return snap
@@ -4,25 +4,20 @@
 Unified web-scraping helpers for Holidays and Badges.
 """
 
+import hashlib
+import json
 import re
-from typing import Dict, Any
+from typing import Dict, Any, Iterable, List
 import cloudscraper
-from requests_html import HTMLSession 
 import requests
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, Tag
 import datetime as dt
-import re
 
-from .data_store import (
-    load_badges, save_badges,
-    load_holidays, save_holidays,
-)
+from . import data_store, jobs, metrics, snapshot
 
 # --------------------------------------------------------------------------- #
 # 1) Harrow council term-dates scraper
 # --------------------------------------------------------------------------- #
-HARROW_URL = "https://www.harrow.gov.uk/schools-learning/school-term-dates"
-
 
 def _parse_date(s: str) -> dt.date:
     """Parse '2 Sep 2024' or '2 September 2024' into a date."""
@@ -34,21 +29,25 @@ def _parse_date(s: str) -> dt.date:
     # fallback: attach current year
     return dt.datetime.strptime(f"{s} {dt.date.today().year}", "%d %B %Y").date()
 
+@metrics.timed("scout_scrape_seconds", source="harrow")
 def refresh_harrow_holidays() -> list[dict]:
-    # 1. render the live page
-    session = HTMLSession()
-    try:
-        r = session.get(HARROW_URL, timeout=30)
-        r.html.render(timeout=20)
-    except Exception:
-        return load_holidays()
+    """
+    Refresh the Harrow holidays only; kept for callers that predate the
+    multi-council registry in ``holiday_sources``.
+    """
+    from .holiday_sources import refresh_holidays
 
-    soup = BeautifulSoup(r.html.html, "html.parser")
+    return refresh_holidays(["harrow"])["harrow"]["periods"]
+
+
+def parse_harrow_holidays(html: str) -> list[dict]:
+    """Extract break periods from a rendered Harrow term-dates page."""
+    soup = BeautifulSoup(html, "html.parser")
 
     # 2. find the “School year 2024-25” heading
     year_heading = soup.find("h3", string=re.compile(r"School year", re.I))
     if not year_heading:
-        return load_holidays()
+        return []
 
     # 3. walk siblings until the next h3 (Future school term dates)
     periods = []
@@ -124,6 +123,7 @@ def refresh_harrow_holidays() -> list[dict]:
                 for inner in sib.find_next_siblings():
                     tt = inner.get_text(" ", strip=True)
                     if tt.startswith(("Term time", "* Term time")):
+                        tt = re.sub(r'^(?:Term time:|\*\s*Term time:)\s*', "", tt)
                         m = re.search(r"(.*?)\s*-\s*(.*)", tt)
                         if m:
                             autumn_start = _parse_date(m.group(1))
@@ -136,12 +136,10 @@ def refresh_harrow_holidays() -> list[dict]:
                 "end":       (autumn_start - dt.timedelta(days=1)).isoformat()
             })
 
-    # 5. if we found *any* break periods, save them; otherwise keep existing
-    if periods:
-        save_holidays(periods)
-        return periods
-    else:
-        return load_holidays()
+    return periods
+
+
+# --------------------------------------------------------------------------- #
 # 2) Badge catalogue scraper – bypass Cloudflare & hit static pages
 # --------------------------------------------------------------------------- #
 SECTION_URLS = {
@@ -151,49 +149,227 @@ SECTION_URLS = {
     "Explorers": "https://www.scouts.org.uk/explorers/activity-badges/",
 }
 
+# Fields that come from the section index pages.  Everything else on a
+# badge record (progress, requirements filled in later, ...) is ours.
+CATALOGUE_FIELDS = ("name", "description", "section")
+CHANGE_LOG = "catalogue_changes.jsonl"
+
+
+def content_hash(record: Dict[str, Any]) -> str:
+    """Stable hash of a badge's upstream (index-page) content."""
+    payload = json.dumps([record.get(f) for f in CATALOGUE_FIELDS], ensure_ascii=False)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+
+def _has_progress(record: Dict[str, Any]) -> bool:
+    return record.get("status", "Not Started") != "Not Started" or bool(record.get("completion"))
+
+
+def diff_catalogue(
+    stored: Dict[str, Dict[str, Any]],
+    upstream: Dict[str, Dict[str, Any]],
+    sections: Iterable[str],
+) -> Dict[str, List[str]]:
+    """
+    Compare the scraped *upstream* badges with the *stored* ones.
+
+    Only badges of the *sections* that were actually scraped can be deleted;
+    a deleted badge that already has progress is marked ``retired`` instead.
+    """
+    sections = set(sections)
+    changes: Dict[str, List[str]] = {"inserted": [], "updated": [], "deleted": [], "retired": []}
+    for name, rec in upstream.items():
+        old = stored.get(name)
+        if old is None:
+            changes["inserted"].append(name)
+        elif content_hash(old) != content_hash(rec) or old.get("retired"):
+            changes["updated"].append(name)
+    for name, old in stored.items():
+        if name in upstream or old.get("section") not in sections or old.get("retired"):
+            continue
+        changes["retired" if _has_progress(old) else "deleted"].append(name)
+    return changes
+
+
+def apply_catalogue_diff(
+    badges: Dict[str, Dict[str, Any]],
+    upstream: Dict[str, Dict[str, Any]],
+    changes: Dict[str, List[str]],
+) -> Dict[str, Dict[str, Any]]:
+    """Apply *changes* in place, touching only the badges named in it."""
+    for name in changes["inserted"]:
+        badges.setdefault(name, dict(upstream[name]))
+    for name in changes["updated"]:
+        rec = badges.setdefault(name, dict(upstream[name]))
+        rec.update({f: upstream[name][f] for f in CATALOGUE_FIELDS})
+        rec.pop("retired", None)
+    for name in changes["deleted"]:
+        badges.pop(name, None)
+    for name in changes["retired"]:
+        if name in badges:
+            badges[name]["retired"] = True
+    return badges
+
+
+def _log_changes(changes: Dict[str, List[str]], unchanged: int) -> None:
+    entry = {"at": dt.datetime.now().isoformat(timespec="seconds"), "unchanged": unchanged, **changes}
+    with (data_store.DATA_DIR / CHANGE_LOG).open("a", encoding="utf-8") as fh:
+        fh.write(json.dumps(entry, ensure_ascii=False) + "\n")
+
+
+@metrics.timed("scout_scrape_seconds", source="badge_catalogue")
 def refresh_badge_catalogue() -> Dict[str, Dict[str, Any]]:
     """
     Scrape every section’s static Activity-Badges page to collect
     all badges. Bypasses Cloudflare with cloudscraper.
+
+    Only inserts, content updates and deletions are written back (progress
+    fields are never touched); a refresh with no upstream change doesn't
+    write at all.  Each refresh appends its diff to ``catalogue_changes.jsonl``.
     """
     scraper = cloudscraper.create_scraper()
-    all_badges: Dict[str, Dict[str, Any]] = {}
+    upstream: Dict[str, Dict[str, Any]] = {}
 
-    for section, url in SECTION_URLS.items():
-        resp = scraper.get(url, timeout=30)
-        resp.raise_for_status()
-        soup = BeautifulSoup(resp.text, "html.parser")
+    for i, (section, url) in enumerate(SECTION_URLS.items()):
+        jobs.progress(i / len(SECTION_URLS), f"Fetching {section}")
+        with metrics.span("scout_scrape_page_seconds", section=section):
+            resp = scraper.get(url, timeout=30)
+            resp.raise_for_status()
+        upstream.update(parse_badge_index_fast(resp.text, section, skip=upstream))
 
-        for h2 in soup.find_all("h2"):
-            name = h2.get_text(strip=True)
-            if not name or name in all_badges:
-                continue
+    # fast path: no upstream change means no write at all
+    stored = data_store.load_badges()
+    changes = diff_catalogue(stored, upstream, SECTION_URLS)
+    if not any(changes.values()):
+        _log_changes(changes, len(upstream))
+        return stored
+
+    # re-diff inside the update so concurrent edits to the store are respected;
+    # the diff of the winning attempt is what gets logged
+    touched: List[str] = []
+
+    def apply(badges: Dict[str, Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+        changes.update(diff_catalogue(badges, upstream, SECTION_URLS))
+        touched[:] = [name for names in changes.values() for name in names]
+        return apply_catalogue_diff(badges, upstream, changes)
 
-            # grab next <p> or <li> for description
-            desc = ""
-            sib = h2.find_next_sibling()
-            while sib:
-                if sib.name in ("p", "li"):
-                    desc = sib.get_text(strip=True)
-                    break
-                sib = sib.find_next_sibling()
-
-            all_badges[name] = {
-                "name":         name,
-                "sessions":     1,
-                "status":       "Not Started",
-                "completion":   0,
-                "description":  desc,
-                "requirements": [],
-                "section":      section,
-            }
-
-    # merge existing progress
-    existing = load_badges()
-    for nm, rec in existing.items():
-        if nm in all_badges:
-            all_badges[nm]["status"]     = rec.get("status", all_badges[nm]["status"])
-            all_badges[nm]["completion"] = rec.get("completion", all_badges[nm]["completion"])
-
-    save_badges(all_badges)
-    return all_badges
+    badges = data_store.update_badges(apply, changed=touched)
+    _log_changes(changes, len(upstream) - len(changes["inserted"]) - len(changes["updated"]))
+    snapshot.publish()
+    return badges
+
+
+def parse_badge_index(
+    html: str, section: str, skip: Iterable[str] = ()
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Turn one section's Activity-Badges page into badge records.
+    Names in *skip* (already seen in an earlier section) are left out.
+    """
+    skip = set(skip)
+    badges: Dict[str, Dict[str, Any]] = {}
+    soup = BeautifulSoup(html, "html.parser")
+
+    for h2 in soup.find_all("h2"):
+        name = h2.get_text(strip=True)
+        if not name or name in badges or name in skip:
+            continue
+
+        # grab next <p> or <li> for description
+        desc = ""
+        sib = h2.find_next_sibling()
+        while sib:
+            if sib.name in ("p", "li"):
+                desc = sib.get_text(strip=True)
+                break
+            sib = sib.find_next_sibling()
+
+        badges[name] = {
+            "name":         name,
+            "sessions":     1,
+            "status":       "Not Started",
+            "completion":   0,
+            "description":  desc,
+            "requirements": [],
+            "section":      section,
+        }
+    return badges
+
+
+# --------------------------------------------------------------------------- #
+# Fast path: lxml over the content region only
+# --------------------------------------------------------------------------- #
+try:
+    import lxml.html as _lxml_html
+except ImportError:          # pragma: no cover - lxml is optional
+    _lxml_html = None
+
+_DESC_TAGS = ("p", "li")
+
+
+def _content_region(html: str) -> str:
+    """
+    The ``<main>`` element's markup, or the whole page if there isn't one.
+    Skipping the header mega-menu and footer is most of the saving.
+    """
+    lo = html.find("<main")
+    hi = html.rfind("</main>")
+    return html[lo:hi + len("</main>")] if lo != -1 and hi > lo else html
+
+
+def _text(el) -> str:
+    # same as BeautifulSoup's get_text(strip=True)
+    return "".join(s.strip() for s in el.itertext())
+
+
+def parse_badge_index_fast(
+    html: str, section: str, skip: Iterable[str] = ()
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Same records as ``parse_badge_index`` for pages whose badges live in
+    ``<main>``, but parsed with lxml and in one linear pass: each heading's
+    description is found by a single backwards walk over its parent's
+    children instead of a sibling scan per ``<h2>``.
+
+    Falls back to ``parse_badge_index`` when lxml isn't installed.
+    """
+    if _lxml_html is None:
+        return parse_badge_index(html, section, skip)
+    region = _content_region(html)
+    if not region.strip():
+        return {}
+    root = _lxml_html.fromstring(region)
+
+    # first following <p>/<li> sibling of every <h2>, one pass per parent
+    desc_of: Dict[Any, str] = {}
+    seen_parents = set()
+    headings = list(root.iter("h2"))
+    for h2 in headings:
+        parent = h2.getparent()
+        if parent is None or parent in seen_parents:
+            continue
+        seen_parents.add(parent)
+        nxt = ""
+        for child in reversed(parent):
+            tag = child.tag if isinstance(child.tag, str) else ""
+            if tag == "h2":
+                desc_of[child] = nxt
+            if tag in _DESC_TAGS:
+                nxt = _text(child)
+
+    skip = set(skip)
+    badges: Dict[str, Dict[str, Any]] = {}
+    for h2 in headings:
+        name = _text(h2)
+        if not name or name in badges or name in skip:
+            continue
+        badges[name] = {
+            "name":         name,
+            "sessions":     1,
+            "status":       "Not Started",
+            "completion":   0,
+            "description":  desc_of.get(h2, ""),
+            "requirements": [],
+            "section":      section,
+        }
+    return badges
@@ -4,12 +4,17 @@ Keeps network I/O out of import-time execution.
 """
 from __future__ import annotations
 
+import json
 import os
+import threading
+from typing import Iterator, Optional
+
 import requests
 
-__all__ = ["get_completion", "WriterAPIError"]
+__all__ = ["get_completion", "stream_completion", "WriterAPIError"]
 
-WRITER_URL = "https://api.writer.com/v1/completions"  # official REST guide :contentReference[oaicite:1]{index=1}
+BASE_URL = os.getenv("WRITER_BASE_URL", "https://api.writer.com").rstrip("/")
+WRITER_URL = f"{BASE_URL}/v1/completions"  # official REST guide :contentReference[oaicite:1]{index=1}
 API_KEY = os.getenv("WRITER_API_KEY", "")
 
 
@@ -35,3 +40,51 @@ def get_completion(prompt: str, *, model: str = "palmyra-base") -> str:
         return data["choices"][0]["text"]  # shape defined in Writer docs :contentReference[oaicite:2]{index=2}
     except (requests.RequestException, KeyError, IndexError) as exc:
         raise WriterAPIError(str(exc)) from exc
+
+
+def stream_completion(
+    prompt: str,
+    *,
+    model: str = "palmyra-x-004",
+    max_tokens: int = 500,
+    cancel: Optional[threading.Event] = None,
+) -> Iterator[str]:
+    """
+    Yield completion text as Writer streams it (server-sent events).
+
+    Setting *cancel* stops the stream at the next chunk and closes the
+    connection.  Raises WriterAPIError on transport or HTTP errors.
+    """
+    headers = {
+        "Authorization": f"Bearer {API_KEY}",
+        "Content-Type": "application/json",
+        "Accept": "text/event-stream",
+    }
+    payload = {"model": model, "prompt": prompt, "max_tokens": max_tokens, "stream": True}
+
+    if cancel is not None and cancel.is_set():
+        return
+    try:
+        resp = requests.post(WRITER_URL, headers=headers, json=payload, timeout=30, stream=True)
+        resp.raise_for_status()
+    except requests.RequestException as exc:
+        raise WriterAPIError(str(exc)) from exc
+
+    with resp:
+        if cancel is not None and cancel.is_set():    # cancelled while connecting
+            return
+        try:
+            for line in resp.iter_lines(decode_unicode=True):
+                if cancel is not None and cancel.is_set():
+                    return
+                if not line or not line.startswith("data:"):
+                    continue
+                data = line[5:].strip()
+                if data == "[DONE]":
+                    return
+                choice = json.loads(data)["choices"][0]
+                text = choice.get("text") or (choice.get("delta") or {}).get("content") or ""
+                if text:
+                    yield text
+        except (requests.RequestException, ValueError, KeyError, IndexError) as exc:
+            raise WriterAPIError(str(exc)) from exc
@@ -0,0 +1,302 @@
+"""
+Offline stand-in for the Writer REST API.
+
+Speaks the two shapes our clients use:
+
+* ``POST /v1/chat/completions`` → ``{"choices": [{"message": {"content": ...}}]}``
+* ``POST /v1/completions``      → ``{"choices": [{"text": ...}]}``
+
+(with ``"stream": true`` both answer as server-sent events).  Schedule
+prompts built by ``scheduler_logic._build_prompt`` get deterministic
+suggestion JSON that avoids the listed events and holidays; anything else
+gets a deterministic canned reply.
+
+Latency and faults are configurable, for benchmarks and load tests::
+
+    python -m ScoutScheduler.backend.writer_simulator --port 8765 \\
+        --latency lognormal:-2.5,0.6 --p400 0.02 --p5xx 0.05 --pmalformed 0.01
+
+    export WRITER_BASE_URL=http://127.0.0.1:8765
+
+or in-process::
+
+    with running_simulator(latency="fixed:0.05") as base_url:
+        ...
+
+``POST /_sim/config`` with a JSON body updates the settings at runtime and
+``GET /_sim/stats`` returns request / fault counts.
+"""
+from __future__ import annotations
+
+import argparse
+import ast
+import datetime as dt
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+
+# --------------------------------------------------------------------------- #
+# Configuration
+# --------------------------------------------------------------------------- #
+@dataclass
+class SimConfig:
+    latency: str = "fixed:0"          # fixed:S | uniform:A,B | normal:MU,SD | lognormal:MU,SIGMA
+    p400: float = 0.0
+    p401: float = 0.0
+    p5xx: float = 0.0
+    pmalformed: float = 0.0
+    seed: int = 0
+    stream_chunk: int = 8             # characters per SSE chunk
+    stats: Dict[str, int] = field(default_factory=dict)
+
+    def sample_latency(self, rng: random.Random) -> float:
+        kind, _, args = self.latency.partition(":")
+        nums = [float(x) for x in args.split(",") if x] or [0.0]
+        if kind == "fixed":
+            return nums[0]
+        if kind == "uniform":
+            return rng.uniform(nums[0], nums[1])
+        if kind == "normal":
+            return max(0.0, rng.gauss(nums[0], nums[1]))
+        if kind == "lognormal":
+            return rng.lognormvariate(nums[0], nums[1])
+        raise ValueError(f"unknown latency distribution {self.latency!r}")
+
+
+# --------------------------------------------------------------------------- #
+# Deterministic answers
+# --------------------------------------------------------------------------- #
+_NEEDS_RE = re.compile(r"Badge sessions needed:\s*(\[.*?\])\s*Preferences:", re.S)
+_EVENTS_RE = re.compile(r"Existing events:\s*(\[.*?\])\s*$", re.M)
+_HOLS_RE = re.compile(r"School holidays:\s*(\[.*?\])\s*$", re.M)
+_DAYS_RE = re.compile(r"within the next (\d+) days")
+_WEEKEND_RE = re.compile(r"weekend_only:\s*(True|False)")
+
+
+def _literal(pattern: re.Pattern, prompt: str, default: Any) -> Any:
+    m = pattern.search(prompt)
+    if not m:
+        return default
+    try:
+        return ast.literal_eval(m.group(1))
+    except (ValueError, SyntaxError):
+        return default
+
+
+def schedule_answer(prompt: str, today: Optional[dt.date] = None) -> Optional[str]:
+    """Suggestion JSON for a scheduler prompt, or None if it isn't one."""
+    m = _NEEDS_RE.search(prompt)
+    if not m:
+        return None
+    needs = json.loads(m.group(1))
+    today = today or dt.date.today()
+    horizon = int((_DAYS_RE.search(prompt) or [None, 30])[1])
+    weekend_only = (_WEEKEND_RE.search(prompt) or [None, "False"])[1] == "True"
+
+    blocked = set(_literal(_EVENTS_RE, prompt, []))
+    for start, end in _literal(_HOLS_RE, prompt, []):
+        d, e = dt.date.fromisoformat(start), dt.date.fromisoformat(end)
+        while d <= e:
+            blocked.add(d.isoformat())
+            d += dt.timedelta(days=1)
+    free = [
+        d.isoformat()
+        for d in (today + dt.timedelta(days=i) for i in range(1, horizon + 1))
+        if d.isoformat() not in blocked and (not weekend_only or d.weekday() >= 5)
+    ] or [(today + dt.timedelta(days=1)).isoformat()]
+
+    out: List[Dict[str, str]] = []
+    for need in needs:
+        h = int(hashlib.sha1(need["name"].encode("utf-8")).hexdigest(), 16)
+        for k in range(need.get("sessions_left", 1)):
+            out.append({"badge": need["name"], "date": free[(h + k * 7) % len(free)]})
+    return json.dumps(out)
+
+
+def text_answer(prompt: str) -> str:
+    digest = hashlib.sha1(prompt.encode("utf-8")).hexdigest()[:8]
+    return (f"[simulated {digest}] Try a 20-minute warm-up game, a 40-minute "
+            "badge activity and a 10-minute reflection circle.")
+
+
+def answer(prompt: str) -> str:
+    return schedule_answer(prompt) or text_answer(prompt)
+
+
+# --------------------------------------------------------------------------- #
+# HTTP server
+# --------------------------------------------------------------------------- #
+class _Handler(BaseHTTPRequestHandler):
+    server: "WriterSimulator"
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, fmt: str, *args: Any) -> None:   # keep test output quiet
+        pass
+
+    def _send(self, status: int, body: bytes, ctype: str = "application/json") -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", ctype)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _json(self, status: int, payload: Any) -> None:
+        self._send(status, json.dumps(payload).encode("utf-8"))
+
+    def _body(self) -> Dict[str, Any]:
+        n = int(self.headers.get("Content-Length") or 0)
+        raw = self.rfile.read(n) if n else b"{}"
+        try:
+            return json.loads(raw or b"{}")
+        except json.JSONDecodeError:
+            return {}
+
+    def do_GET(self) -> None:
+        if self.path == "/_sim/stats":
+            self._json(200, self.server.stats())
+        else:
+            self._json(404, {"error": "not found"})
+
+    def do_POST(self) -> None:
+        body = self._body()
+        if self.path == "/_sim/config":
+            self.server.configure(**body)
+            self._json(200, asdict(self.server.config))
+            return
+        if self.path not in ("/v1/chat/completions", "/v1/completions"):
+            self._json(404, {"error": "not found"})
+            return
+
+        chat = self.path.endswith("chat/completions")
+        fault, delay = self.server.draw()
+        time.sleep(delay)
+        self.server.count(fault or "ok")
+
+        if fault == "401" or not self.headers.get("Authorization", "").startswith("Bearer "):
+            self._json(401, {"errors": [{"description": "Invalid API key"}]})
+            return
+        if fault == "400":
+            self._json(400, {"errors": [{"description": "simulated bad request"}]})
+            return
+        if fault == "5xx":
+            self._json(503, {"errors": [{"description": "simulated outage"}]})
+            return
+
+        if chat:
+            msgs = body.get("messages") or [{}]
+            prompt = msgs[-1].get("content") or ""
+        else:
+            prompt = body.get("prompt") or body.get("inputs") or ""
+        text = answer(prompt)
+
+        if fault == "malformed":
+            self._send(200, b'{"choices": [{"text": "' + text[:20].encode("utf-8"))
+            return
+        if body.get("stream"):
+            self._stream(text, chat)
+            return
+        choice = {"message": {"role": "assistant", "content": text}} if chat else {"text": text}
+        self._json(200, {"id": "sim", "choices": [{"index": 0, **choice}]})
+
+    def _stream(self, text: str, chat: bool) -> None:
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        step = max(1, self.server.config.stream_chunk)
+        for i in range(0, len(text), step):
+            piece = text[i:i + step]
+            choice = {"delta": {"content": piece}} if chat else {"text": piece}
+            self.wfile.write(f"data: {json.dumps({'choices': [choice]})}\n\n".encode("utf-8"))
+            self.wfile.flush()
+        self.wfile.write(b"data: [DONE]\n\n")
+        self.close_connection = True
+
+
+class WriterSimulator(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, addr: Tuple[str, int], config: Optional[SimConfig] = None) -> None:
+        super().__init__(addr, _Handler)
+        self.config = config or SimConfig()
+        self._rng = random.Random(self.config.seed)
+        self._lock = threading.Lock()
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def configure(self, **changes: Any) -> None:
+        with self._lock:
+            for k, v in changes.items():
+                if hasattr(self.config, k) and k != "stats":
+                    setattr(self.config, k, v)
+            if "seed" in changes:
+                self._rng = random.Random(self.config.seed)
+
+    def draw(self) -> Tuple[Optional[str], float]:
+        """Pick this request's fault (if any) and latency."""
+        with self._lock:
+            c, r = self.config, self._rng.random()
+            fault = None
+            for name, p in (("400", c.p400), ("401", c.p401), ("5xx", c.p5xx),
+                            ("malformed", c.pmalformed)):
+                if r < p:
+                    fault = name
+                    break
+                r -= p
+            return fault, c.sample_latency(self._rng)
+
+    def count(self, outcome: str) -> None:
+        with self._lock:
+            self.config.stats[outcome] = self.config.stats.get(outcome, 0) + 1
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self.config.stats)
+
+
+@contextmanager
+def running_simulator(host: str = "127.0.0.1", port: int = 0, **config: Any) -> Iterator[str]:
+    """Run a simulator on a background thread; yields its base URL."""
+    server = WriterSimulator((host, port), SimConfig(**config))
+    thread = threading.Thread(target=server.serve_forever, name="writer-sim", daemon=True)
+    thread.start()
+    try:
+        yield server.base_url
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def main(argv=None) -> None:
+    ap = argparse.ArgumentParser(description="Offline Writer API simulator")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8765)
+    ap.add_argument("--latency", default="fixed:0")
+    ap.add_argument("--p400", type=float, default=0.0)
+    ap.add_argument("--p401", type=float, default=0.0)
+    ap.add_argument("--p5xx", type=float, default=0.0)
+    ap.add_argument("--pmalformed", type=float, default=0.0)
+    ap.add_argument("--seed", type=int, default=0)
+    args = vars(ap.parse_args(argv))
+    host, port = args.pop("host"), args.pop("port")
+    server = WriterSimulator((host, port), SimConfig(**args))
+    print(f"Writer simulator on {server.base_url}  (export WRITER_BASE_URL={server.base_url})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -6,7 +6,8 @@ from writer import Client
 
 # Initialize Writer client using environment variable
 WRITER_API_KEY = os.getenv("WRITER_API_KEY")
-client = Client(api_key=WRITER_API_KEY)
+WRITER_BASE_URL = os.getenv("WRITER_BASE_URL", "https://api.writer.com").rstrip("/")
+client = Client(api_key=WRITER_API_KEY, base_url=WRITER_BASE_URL)
 
 # Define function schema for badge info tool-calling
 tool_functions = [
@@ -83,7 +84,7 @@ load_dotenv()
 
 
 WRITER_API_KEY = os.getenv("WRITER_API_KEY")  # Ensure this environment variable is set
-API_URL = "https://api.writer.com/v1/completions"
+API_URL = f"{WRITER_BASE_URL}/v1/completions"
 
 def get_ai_suggestions(prompt_text):
     headers = {
@@ -128,7 +129,7 @@ def test_writer_api():
     }
 
     try:
-        response = requests.post("https://api.writer.com/v1/completions", headers=headers, json=payload)
+        response = requests.post(API_URL, headers=headers, json=payload)
         response.raise_for_status()
         result = response.json()
         print("AI Suggestion:", result['choices'][0]['text'].strip())
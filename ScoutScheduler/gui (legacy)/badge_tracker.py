@@ -1,7 +1,34 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
 
-from ScoutScheduler.backend.badge_logic import get_all_badges, get_completed_badges, mark_badge_completed, mark_badge_incomplete
+from ScoutScheduler.backend.badge_logic import get_all_badges, batch
+
+# Rows inserted per Tk idle slice; keeps the window responsive for
+# catalogues with thousands of badges.
+PAGE_SIZE = 200
+
+
+def _status(record):
+    return "Completed" if record.get("status") == "Completed" else "Incomplete"
+
+
+def plan_tree_update(shown, desired):
+    """
+    Diff the rows on screen against the rows wanted.
+
+    *shown* maps iid → status for what the tree holds now; *desired* is the
+    ordered list of (name, status) that should be visible.  Returns
+    ``(delete, update, insert)`` where *insert* is a list of
+    (index, name, status) to apply in order after the deletes.
+    """
+    wanted = dict(desired)
+    delete = [name for name in shown if name not in wanted]
+    update = [(name, status) for name, status in desired
+              if name in shown and shown[name] != status]
+    insert = [(i, name, status) for i, (name, status) in enumerate(desired)
+              if name not in shown]
+    return delete, update, insert
+
 
 def launch_badge_tracker(parent_root):
     window = tk.Toplevel(parent_root)
@@ -23,37 +50,61 @@ def launch_badge_tracker(parent_root):
         tree.column(col, width=350 if col == "Badge" else 100, anchor="center")
     tree.pack(fill="both", expand=True, padx=10, pady=5)
 
-    # Load all badges (catalog) once
-    all_badges = get_all_badges()  # list of all badge names (sorted)
+    # In-memory model: badge name → "Completed"/"Incomplete", read once.
+    # Rows use the badge name as iid, so the tree can be diffed against it.
+    model = {name: _status(rec) for name, rec in get_all_badges().items()}
+    names = sorted(model)
+    shown = {}                  # iid → status currently on screen
+    pending = {"job": None}     # outstanding paged-insert callback
 
     def refresh():
-        """Refresh the badge list based on filter selection."""
-        tree.delete(*tree.get_children())
-        completed_set = set(get_completed_badges())
-        for name in all_badges:
-            status = "Completed" if name in completed_set else "Incomplete"
-            if filter_var.get() == "Completed" and status != "Completed":
-                continue
-            if filter_var.get() == "Incomplete" and status != "Incomplete":
-                continue
-            tree.insert("", tk.END, values=(name, status))
+        """Bring the tree in line with the model and filter, touching only changed rows."""
+        if pending["job"] is not None:
+            window.after_cancel(pending["job"])
+            pending["job"] = None
+
+        want = filter_var.get()
+        desired = [(n, model[n]) for n in names
+                   if want == "All" or model[n] == want]
+        delete, update, insert = plan_tree_update(shown, desired)
+
+        if delete:
+            tree.delete(*delete)
+            for name in delete:
+                del shown[name]
+        for name, status in update:
+            tree.item(name, values=(name, status))
+            shown[name] = status
+
+        def insert_page(start=0):
+            for idx, name, status in insert[start:start + PAGE_SIZE]:
+                tree.insert("", idx, iid=name, values=(name, status))
+                shown[name] = status
+            if start + PAGE_SIZE < len(insert):
+                pending["job"] = window.after(1, insert_page, start + PAGE_SIZE)
+            else:
+                pending["job"] = None
+
+        insert_page()
 
     def toggle_status():
-        """Toggle the selected badge's completion status."""
+        """Toggle the selected badges' completion status (one write for all)."""
         sel = tree.selection()
         if not sel:
             messagebox.showwarning("No selection", "Please select a badge first.")
             return
-        item = sel[0]
-        badge, current_status = tree.item(item, "values")
         try:
-            if current_status == "Completed":
-                mark_badge_incomplete(badge)
-            else:
-                mark_badge_completed(badge)
+            with batch() as b:
+                for name in sel:
+                    if model[name] == "Completed":
+                        b.mark_incomplete(name)
+                    else:
+                        b.mark_completed(name)
         except Exception as e:
             messagebox.showerror("Error", f"Could not update badge status: {e}")
             return
+        for name in b.changed:
+            model[name] = "Completed" if b.badges[name]["status"] == "Completed" else "Incomplete"
         refresh()
 
     # Update list when filter changes
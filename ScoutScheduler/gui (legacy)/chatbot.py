@@ -1,6 +1,130 @@
+import itertools
+import queue
+import threading
 import tkinter as tk
-from ScoutScheduler.backend.ai_integration import get_ai_suggestions
+from collections import deque
 
+from ScoutScheduler.backend.writer_client import WriterAPIError, stream_completion
+
+MAX_TURNS = 20             # (role, text) pairs kept for context
+MAX_PROMPT_CHARS = 6000    # newest history that fits is sent with each question
+MAX_DISPLAY_LINES = 2000   # older lines are trimmed from the chat widget
+POLL_MS = 40
+
+SYSTEM_PROMPT = ("You are ScoutAI, an assistant for Scout leaders planning "
+                 "sessions and badge work. Answer concisely.")
+
+
+class ChatHistory:
+    """Bounded conversation memory: the last ``MAX_TURNS`` messages."""
+
+    def __init__(self, max_turns=MAX_TURNS):
+        self.turns = deque(maxlen=max_turns)
+
+    def add(self, role, text):
+        self.turns.append((role, text))
+
+    def prompt(self, question, max_chars=MAX_PROMPT_CHARS):
+        """System prompt + as much recent history as fits + the new question."""
+        tail = [f"User: {question}", "Assistant:"]
+        budget = max_chars - len(SYSTEM_PROMPT) - sum(len(t) + 1 for t in tail)
+        context = []
+        for role, text in reversed(self.turns):
+            line = f"{'User' if role == 'user' else 'Assistant'}: {text}"
+            if len(line) + 1 > budget:
+                break
+            context.append(line)
+            budget -= len(line) + 1
+        return "\n".join([SYSTEM_PROMPT, *reversed(context), *tail])
+
+
+class ChatWorker:
+    """
+    Runs Writer requests on a background thread.
+
+    ``submit`` returns a request id; the worker puts ``(rid, kind, payload)``
+    messages on ``events`` – ``"token"`` for each streamed chunk, then one of
+    ``"done"`` (full text), ``"error"`` (message) or ``"cancelled"``.
+
+    The stream itself is read on a helper thread, so ``cancel`` takes effect
+    at once – also while connecting or waiting for the first chunk; an
+    abandoned stream closes its connection when it next wakes up.
+    """
+
+    def __init__(self, stream=stream_completion):
+        self._stream = stream
+        self.requests = queue.Queue()
+        self.events = queue.Queue()
+        self._ids = itertools.count(1)
+        self._cancel = {}
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name="chat-worker", daemon=True)
+        self._thread.start()
+
+    def submit(self, prompt):
+        rid = next(self._ids)
+        with self._lock:
+            self._cancel[rid] = (threading.Event(), queue.Queue())
+        self.requests.put((rid, prompt))
+        return rid
+
+    def cancel(self, rid):
+        with self._lock:
+            entry = self._cancel.get(rid)
+        if entry is not None:
+            flag, chunks = entry
+            flag.set()
+            chunks.put(("cancel", None))         # wake the worker if it is waiting
+
+    def close(self):
+        with self._lock:
+            entries = list(self._cancel.values())
+        for flag, chunks in entries:
+            flag.set()
+            chunks.put(("cancel", None))
+        self.requests.put(None)
+
+    def _pump(self, prompt, cancel, chunks):
+        try:
+            for chunk in self._stream(prompt, cancel=cancel):
+                chunks.put(("token", chunk))
+            chunks.put(("end", None))
+        except Exception as e:
+            chunks.put(("error", e))
+
+    def _run(self):
+        while True:
+            item = self.requests.get()
+            if item is None:
+                return
+            rid, prompt = item
+            with self._lock:
+                cancel, chunks = self._cancel[rid]
+            parts = []
+            try:
+                if not cancel.is_set():
+                    threading.Thread(target=self._pump, args=(prompt, cancel, chunks),
+                                     name=f"chat-stream-{rid}", daemon=True).start()
+                while not cancel.is_set():
+                    kind, value = chunks.get()
+                    if kind == "token":
+                        parts.append(value)
+                        self.events.put((rid, "token", value))
+                    elif kind == "error":
+                        raise value
+                    else:
+                        break
+                if cancel.is_set():
+                    self.events.put((rid, "cancelled", "".join(parts)))
+                else:
+                    self.events.put((rid, "done", "".join(parts)))
+            except WriterAPIError as e:
+                self.events.put((rid, "error", str(e)))
+            except Exception as e:        # never let the worker thread die
+                self.events.put((rid, "error", f"{type(e).__name__}: {e}"))
+            finally:
+                with self._lock:
+                    self._cancel.pop(rid, None)
 
 
 def launch_chatbot():
@@ -19,29 +143,80 @@ def launch_chatbot():
     user_input = tk.Entry(input_frame, width=50)
     user_input.grid(row=0, column=0, padx=5)
 
-    def send_message():
-        user_msg = user_input.get().strip()
-        if not user_msg:
-            return
+    history = ChatHistory()
+    worker = ChatWorker()
+    state = {"rid": None, "question": None, "after": None}
 
-        # Display user's message
+    def append(text):
         chat_display.config(state="normal")
-        chat_display.insert(tk.END, f"You: {user_msg}\n")
+        chat_display.insert(tk.END, text)
+        excess = int(chat_display.index("end-1c").split(".")[0]) - MAX_DISPLAY_LINES
+        if excess > 0:
+            chat_display.delete("1.0", f"{excess + 1}.0")
         chat_display.config(state="disabled")
+        chat_display.see(tk.END)
 
+    def set_busy(busy):
+        send_btn.config(state="disabled" if busy else "normal")
+        cancel_btn.config(state="normal" if busy else "disabled")
+
+    def send_message():
+        user_msg = user_input.get().strip()
+        if not user_msg or state["rid"] is not None:
+            return
         user_input.delete(0, tk.END)
-        window.update()
+        append(f"You: {user_msg}\nAI: ")
+        state["question"] = user_msg
+        state["rid"] = worker.submit(history.prompt(user_msg))
+        set_busy(True)
 
-        # Get AI reply
-        ai_response = get_ai_suggestions(user_msg)
+    def cancel_message():
+        if state["rid"] is not None:
+            worker.cancel(state["rid"])
 
-        # Display AI response
-        chat_display.config(state="normal")
-        chat_display.insert(tk.END, f"AI: {ai_response}\n\n")
-        chat_display.config(state="disabled")
-        chat_display.see(tk.END)
+    def poll():
+        """Drain worker events on the Tk thread; re-arms itself while the window lives."""
+        state["after"] = None
+        try:
+            if not window.winfo_exists():
+                return
+        except tk.TclError:                      # interpreter already torn down
+            return
+        try:
+            while True:
+                rid, kind, payload = worker.events.get_nowait()
+                if rid != state["rid"]:
+                    continue                     # late output of an abandoned request
+                if kind == "token":
+                    append(payload)
+                    continue
+                if kind == "done":
+                    history.add("user", state["question"])
+                    history.add("assistant", payload)
+                    append("\n\n")
+                elif kind == "cancelled":
+                    append(" [cancelled]\n\n")
+                else:
+                    append(f"[error: {payload}]\n\n")
+                state["rid"] = None
+                set_busy(False)
+        except queue.Empty:
+            pass
+        state["after"] = window.after(POLL_MS, poll)
+
+    def on_close():
+        if state["after"] is not None:
+            window.after_cancel(state["after"])
+            state["after"] = None
+        worker.close()
+        window.destroy()
 
     send_btn = tk.Button(input_frame, text="Send", command=send_message)
     send_btn.grid(row=0, column=1)
+    cancel_btn = tk.Button(input_frame, text="Stop", command=cancel_message, state="disabled")
+    cancel_btn.grid(row=0, column=2, padx=5)
 
     user_input.bind("<Return>", lambda event: send_message())
+    window.bind("<Escape>", lambda event: cancel_message())
+    window.protocol("WM_DELETE_WINDOW", on_close)
+    poll()
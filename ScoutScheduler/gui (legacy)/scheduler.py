@@ -3,14 +3,14 @@ from tkinter import messagebox, ttk
 import datetime
 
 from ScoutScheduler.backend.data_management import (
-    load_sessions,
-    save_sessions,
     load_badges,
     save_badges,
     load_holidays
 )
 from ScoutScheduler.backend.scheduler_logic import generate_schedule
-from ScoutScheduler.backend.data_models import Preferences
+from ScoutScheduler.backend.data_models import Preferences, Session
+from ScoutScheduler.backend.data_store import StaleWriteError
+from ScoutScheduler.backend.session_store import SessionStore, label, normalize_time, parse_legacy
 from ScoutScheduler.gui.chatbot import launch_chatbot
 
 
@@ -69,52 +69,97 @@ def show_scheduler_window(parent_root):
     title_entry = tk.Entry(frame, width=40); title_entry.grid(row=2, column=1, columnspan=3, sticky="w")
 
     # --- Session Listbox ---
+    # the listbox mirrors the store row for row, so indices line up
+    store = SessionStore.load()
     session_list = tk.Listbox(window, width=80, height=15)
     session_list.pack(pady=10, padx=10)
-    # Populate existing
-    for s in load_sessions():
-        session_list.insert(tk.END, s)
+    session_list.insert(tk.END, *map(label, store))
+    editing = {"session": None}     # set while the form holds a session being edited
+
+    def persist() -> bool:
+        """Save the store; if someone else saved first, reload it, re-render and warn."""
+        nonlocal store
+        try:
+            store.save()
+            return True
+        except StaleWriteError:
+            store = SessionStore.load()
+            session_list.delete(0, tk.END)
+            session_list.insert(tk.END, *map(label, store))
+            editing["session"] = None
+            btn_add.config(text="Add")
+            messagebox.showwarning(
+                "Sessions changed",
+                "The sessions were changed elsewhere and have been reloaded.\n"
+                "Please make your change again.")
+            return False
 
     # --- Add/Edit/Delete ---
     def add_session():
-        date = f"{day_var.get()}-{month_var.get()}-{year_var.get()}"
+        """Add the form as a new session, or save it over the one being edited."""
+        date = f"{year_var.get()}-{month_var.get()}-{day_var.get()}"
         time = time_entry.get().strip()
         title = title_entry.get().strip()
-        if not (date and time and title):
+        if not (time and title):
             messagebox.showwarning("Missing Info", "Please fill in all fields.")
             return
-        entry = f"{date} {time} - {title}"
-        session_list.insert(tk.END, entry)
-        save_sessions(session_list.get(0, tk.END))
+        try:
+            datetime.date.fromisoformat(date)
+        except ValueError:
+            messagebox.showwarning("Invalid date", f"{date} is not a valid date.")
+            return
+        time = normalize_time(time)         # "9:30" → "09:30" so it sorts with the rest
+        if time is None:
+            messagebox.showwarning("Invalid time", "Please enter the time as HH:MM.")
+            return
+        session = Session(date=date, time=time, title=title)
+        old = editing["session"]
+        if old is not None:
+            session_list.delete(store.remove(old))
+        idx = store.add(session)
+        session_list.insert(idx, label(session))
+        if not persist():
+            return                          # keep the form so the change can be redone
         # clear
+        editing["session"] = None
+        btn_add.config(text="Add")
         time_entry.delete(0, tk.END)
         title_entry.delete(0, tk.END)
 
     def edit_session():
         try:
             idx = session_list.curselection()[0]
-            sel = session_list.get(idx)
-            d, rest = sel.split(" ", 1)
-            t, ttl = rest.split(" - ", 1)
-            day_var.set(d.split("-")[0]); month_var.set(d.split("-")[1]); year_var.set(d.split("-")[2])
-            time_entry.delete(0, tk.END);  time_entry.insert(0, t)
-            title_entry.delete(0, tk.END); title_entry.insert(0, ttl)
-            session_list.delete(idx)
         except IndexError:
             messagebox.showwarning("No Selection", "Select a session to edit.")
+            return
+        s = store[idx]
+        year, month, day = s.date.split("-")
+        day_var.set(day); month_var.set(month); year_var.set(year)
+        time_entry.delete(0, tk.END);  time_entry.insert(0, s.time)
+        title_entry.delete(0, tk.END); title_entry.insert(0, s.title)
+        # the session stays in the store until "Save" writes the edited one in its place
+        editing["session"] = s
+        btn_add.config(text="Save")
 
     def delete_session():
         try:
             idx = session_list.curselection()[0]
-            session_list.delete(idx)
-            save_sessions(session_list.get(0, tk.END))
         except IndexError:
             messagebox.showwarning("No Selection", "Select a session to delete.")
+            return
+        s = store[idx]
+        if s is editing["session"]:
+            editing["session"] = None
+            btn_add.config(text="Add")
+        store.remove(s)
+        session_list.delete(idx)
+        persist()
 
     # Buttons row
     btn_frame = tk.Frame(window)
     btn_frame.pack(pady=10)
-    tk.Button(btn_frame, text="Add",   command=add_session).grid(row=0, column=0, padx=5)
+    btn_add = tk.Button(btn_frame, text="Add", command=add_session)
+    btn_add.grid(row=0, column=0, padx=5)
     tk.Button(btn_frame, text="Edit",  command=edit_session).grid(row=0, column=1, padx=5)
     tk.Button(btn_frame, text="Delete",command=delete_session).grid(row=0, column=2, padx=5)
     # DONE: you could also hook suggest_sessions here if you like
@@ -129,7 +174,8 @@ def suggest_sessions_dialog(parent):
     """
     # Load all data
     badges  = load_badges()
-    existing = load_sessions()
+    store = SessionStore.load()
+    existing = [label(s) for s in store]
     raw_holidays = load_holidays()  # assumed dict of term→list of dates
     # flatten to a set of date strings if needed:
     holidays_set = {
@@ -161,18 +207,22 @@ def suggest_sessions_dialog(parent):
             entry = f"{s[0]} - {s[1]}"
         formatted.append(entry)
 
-    # Overwrite sessions file
-    save_sessions(formatted)
+    # Overwrite the session store
+    store.reset(filter(None, map(parse_legacy, formatted)))
+    try:
+        store.save()
+    except StaleWriteError:
+        messagebox.showwarning("Sessions changed",
+                               "The sessions were changed elsewhere while the suggestions "
+                               "were generated; nothing was saved. Please try again.")
+        return
 
     # Inform the user
     messagebox.showinfo("Suggestions Applied",
                         f"{len(formatted)} sessions generated and saved.")
 
-    # Optionally, reopen scheduler window so they can see them
-    win = show_scheduler_window(parent)
-    for e in formatted:
-        # new window's list is populated from file, but just in case:
-        win.children['!listbox'].insert(tk.END, e)
+    # Reopen the scheduler window so they can see them (populated from the store)
+    show_scheduler_window(parent)
 
 
 if __name__ == "__main__":
@@ -6,13 +6,11 @@ if ROOT not in sys.path:
     sys.path.insert(0, ROOT)
 
 import streamlit as st
-from backend import badge_logic
-
-from backend.data_store import load_badges
+from backend import badge_logic, snapshot
 
 st.title("🎖️ Badge Manager")
 
-badges = load_badges()
+badges = snapshot.current().badges      # shared mapping, records decoded as they are shown
 
 for name, info in badges.items():
     with st.expander(f"{name}  —  {info['status']} ({info['completion']}%)"):
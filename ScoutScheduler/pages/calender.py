@@ -8,10 +8,14 @@ if ROOT not in sys.path:
 
 import streamlit as st
 from streamlit_calendar import calendar
-from datetime import date
+from datetime import date, timedelta
 from dateutil.parser import parse as parse_date
 
-from backend.data_store import load_events, save_events, load_holidays
+from backend.data_store import load_events, load_event_table, add_event
+from backend import availability, snapshot
+from backend.recurrence import expand_table
+
+FEED_WINDOW = timedelta(days=366)   # recurring events are expanded ±1 year
 
 # ─── SESSION-STATE BOOTSTRAP ──────────────────────────────────────────────
 if "events" not in st.session_state:
@@ -21,18 +25,19 @@ if "events" not in st.session_state:
 st.title("📅 Calendar")
 
 # ─── BUILD EVENT FEED ──────────────────────────────────────────────────────
+today = date.today()
 cal_events = [
     {
         "title": ev["title"],
         "start": ev["date"],
-        "extendedProps": {"description": ev["description"]},
+        "extendedProps": {"description": ev.get("description", "")},
         "backgroundColor": "#3B82F6",  # blue for user events
     }
-    for ev in st.session_state.events
+    for ev in expand_table(load_event_table()[0], today - FEED_WINDOW, today + FEED_WINDOW)
 ]
 
 # ─── HOLIDAY OVERLAY ───────────────────────────────────────────────────────
-for hol in load_holidays():
+for hol in snapshot.current().holidays():
     cal_events.append(
         {
             "title": hol["name"],
@@ -61,12 +66,16 @@ if selected and selected.get("event"):
     st.info(f"**{ev['title']}**  \n{ev['extendedProps'].get('description','')}")
 elif selected and selected.get("start"):
     chosen = parse_date(selected["start"]).date()
+    index = availability.shared()          # O(log n) lookups, kept in step with the store
+    if index.is_holiday(chosen):
+        st.warning(f"{chosen:%d %b} is in a school holiday.")
+    elif index.is_busy(chosen):
+        st.warning(f"There is already an event on {chosen:%d %b}.")
     with st.form("add_event"):
         title = st.text_input("Event title")
         desc = st.text_area("Description")
         if st.form_submit_button("Add"):
-            st.session_state.events.append(
+            st.session_state.events = add_event(
                 {"date": chosen.isoformat(), "title": title, "description": desc}
             )
-            save_events(st.session_state.events)
             st.experimental_rerun()
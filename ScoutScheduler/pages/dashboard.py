@@ -1,11 +1,28 @@
 # pages/dashboard.py
+import time
 import streamlit as st
-from datetime import date
+from datetime import date, timedelta
 
-from backend.data_store import load_events, load_badges, load_holidays
-from backend.scheduler_logic import generate_schedule, add_suggestion
+from backend.data_store import load_events, load_badges, load_holidays, load_badge_stats
+from backend.scheduler_logic import replan_schedule, add_suggestion
+from backend.jobs import ensure_workers, get as get_job, submit
+from backend.season_planner import SeasonConfig, plan_season
 
 st.title("📊 Dashboard")
+ensure_workers()
+
+# ------------------ badge progress ---------------------- #
+stats = load_badge_stats()                      # materialised counters, no badge scan
+c_total, c_done, c_avg = st.columns(3)
+c_total.metric("Badges", stats.total)
+c_done.metric("Completed", stats.count("Completed"))
+c_avg.metric("Average completion", f"{stats.average_completion:.0f}%")
+if stats.by_section:
+    with st.expander("Progress by section"):
+        st.table({
+            section: {status: n for status, n in sorted(counts.items())}
+            for section, counts in sorted(stats.by_section.items())
+        })
 
 # ------------------ user prefs sidebar ------------------ #
 st.sidebar.header("Scheduling Preferences")
@@ -14,8 +31,27 @@ pref_time    = st.sidebar.selectbox("Preferred time of day", ["any","morning","a
 prefs = {"weekend_only": pref_weekend, "time_of_day": pref_time}
 
 # ------------------ generate button -------------------- #
-if st.button("Generate AI Schedule Suggestions"):
-    st.session_state.suggestions = generate_schedule(
+col_gen, col_update = st.columns(2)
+if col_gen.button("Generate AI Schedule Suggestions"):
+    # Writer can take a minute: run it on the job queue and poll below
+    st.session_state.schedule_job = submit("generate_schedule", prefs=prefs)
+
+polling = False
+if "schedule_job" in st.session_state:
+    job = get_job(st.session_state.schedule_job)
+    if job is None or job.done:
+        del st.session_state.schedule_job
+        if job is not None and job.status == "done":
+            st.session_state.suggestions = job.result
+        elif job is not None:
+            st.error(f"Schedule generation {job.status}: {job.error or ''}")
+    else:
+        st.info("Asking Writer for suggestions… the page updates when they arrive.")
+        polling = True
+if "suggestions" in st.session_state and col_update.button("Update suggestions"):
+    # keeps still-valid dates; only clashing/changed badges go back to Writer
+    st.session_state.suggestions = replan_schedule(
+        st.session_state.suggestions,
         load_events(),
         load_badges(),
         load_holidays(),
@@ -34,5 +70,36 @@ if "suggestions" in st.session_state:
         if col_add.button("➕", key=f"add_{s['badge']}_{s['date']}"):
             events = add_suggestion(load_events(), s)
             st.session_state.events = events
+            # the accepted date drops out of the plan; nothing else is re-asked
+            st.session_state.suggestions = replan_schedule(
+                st.session_state.suggestions, events, load_badges(), load_holidays(), prefs
+            )
             st.success(f"Added {s['badge']} on {s['date']}")
             st.rerun()                                               # st.rerun API :contentReference[oaicite:5]{index=5}
+
+# ------------------ season planner ------------------ #
+with st.expander("Plan the whole season"):
+    c1, c2, c3 = st.columns(3)
+    season_start = c1.date_input("From", value=date.today())
+    season_weeks = c2.number_input("Weeks", min_value=4, max_value=104, value=52)
+    capacity = c3.number_input("Badge sessions per night", min_value=1, max_value=10, value=2)
+    weekday = st.selectbox("Meeting night", range(7), index=4,
+                           format_func=lambda d: ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"][d])
+    if st.button("Plan season"):
+        plan = plan_season(
+            load_badges(), load_events(), load_holidays(),
+            start=season_start,
+            end=season_start + timedelta(weeks=int(season_weeks)),
+            config=SeasonConfig(meeting_weekday=weekday, capacity=int(capacity)),
+        )
+        summary = plan.summary()
+        m1, m2, m3 = st.columns(3)
+        m1.metric("Sessions placed", summary["scheduled"], f"-{summary['unscheduled']} unplaced")
+        m2.metric("Objective", summary["objective"], f"{summary['objective'] - summary['greedy_objective']:+.1f} vs greedy",
+                  delta_color="inverse")
+        m3.metric("Solve time", f"{summary['solve_seconds']:.2f}s")
+        st.dataframe(plan.assignments, use_container_width=True)
+
+if polling:
+    time.sleep(1)
+    st.rerun()
@@ -0,0 +1,44 @@
+# pages/metrics.py
+"""
+Debug panel – timings, cache hits and store I/O recorded in *this* Streamlit
+process.  Hidden unless SCOUT_DEBUG_PANEL=1; collection itself is controlled
+by SCOUT_METRICS.
+"""
+import os
+import streamlit as st
+
+from backend import metrics
+
+st.title("🛠️ Debug metrics")
+
+if os.getenv("SCOUT_DEBUG_PANEL", "0") != "1":
+    st.info("Set SCOUT_DEBUG_PANEL=1 to enable this page.")
+    st.stop()
+
+if not metrics.enabled():
+    st.warning("Metrics collection is disabled (SCOUT_METRICS=0).")
+
+rows = metrics.snapshot()
+if not rows:
+    st.info("Nothing recorded yet – use the other pages, then refresh.")
+else:
+    st.dataframe(
+        [
+            {
+                "metric": r["metric"],
+                "labels": ", ".join(f"{k}={v}" for k, v in r["labels"].items()),
+                "count / value": r.get("count", r.get("value")),
+                "mean (s or bytes)": round(r["mean"], 4) if "mean" in r else None,
+                "total": round(r.get("sum", 0.0), 4) if "sum" in r else None,
+            }
+            for r in rows
+        ],
+        use_container_width=True,
+    )
+
+col_raw, col_reset = st.columns(2)
+with col_raw.expander("Prometheus text"):
+    st.code(metrics.render_prometheus(), language="text")
+if col_reset.button("Reset counters"):
+    metrics.reset()
+    st.rerun()
@@ -3,18 +3,42 @@
 Settings & Data – export/import JSON and refresh web data.
 """
 import json
+import time
 import streamlit as st
 
 from backend.data_store import (
     load_events, save_events,
     load_badges,  save_badges,
 )
-from backend.webscraper import (                   # note the trailing "ing"
-    refresh_harrow_holidays,
-    refresh_badge_catalogue,
-)
+from backend.holiday_sources import sources
+from backend.jobs import cancel, ensure_workers, recent, submit
 
 st.title("⚙️ Settings & Data")
+ensure_workers()        # scrapes run in background processes, not this rerun
+
+
+def show_job(kind, on_done):
+    """Status of the latest *kind* job; True while it is still queued or running."""
+    latest = recent(kind, limit=1)
+    if not latest:
+        return False
+    job = latest[0]
+    if not job.done:
+        st.progress(job.progress, text=job.message or f"{job.status.title()}…")
+        if st.button("✖ Cancel", key=f"cancel_{kind}"):
+            cancel(job.id)
+        return True
+    seen = st.session_state.setdefault("seen_jobs", set())
+    if job.id not in seen:
+        seen.add(job.id)
+        st.session_state.badges = load_badges()   # pick up whatever the job wrote
+    if job.status == "done":
+        on_done(job.result)
+    elif job.status == "failed":
+        st.error(f"Last run failed: {job.error}")
+    else:
+        st.warning("Last run was cancelled.")
+    return False
 
 # ---------------------------------------------------------------- #
 # Export / import
@@ -63,20 +87,43 @@ st.subheader("Refresh data from the web")
 
 col_hol, col_badge = st.columns(2)
 
+
+def holidays_done(results):
+    for council, res in results.items():
+        if res["ok"]:
+            st.success(f"{council.title()}: fetched {len(res['periods'])} holiday periods.")
+        else:
+            st.error(f"{council.title()}: {res['error']} – keeping "
+                     f"{len(res['periods'])} stored periods.")
+
+
+def catalogue_done(result):
+    st.success(f"Fetched {result['count']} badges. Go to the Badges page to see them.")
+
+
+def crawl_done(summary):
+    st.success(
+        f"Updated {summary['updated']} badges "
+        f"({summary['fetched']} pages fetched, {summary['unchanged']} unchanged, "
+        f"{summary['failed']} failed)."
+    )
+
+
 with col_hol:
-    if st.button("🔄 Refresh Harrow holidays"):
-        try:
-            count = len(refresh_harrow_holidays())
-            st.success(f"Fetched {count} holiday periods.")
-        except Exception as e:
-            st.error(f"Failed to fetch holidays: {e}")
+    councils = st.multiselect("Councils", sorted(sources()), default=sorted(sources()))
+    if st.button("🔄 Refresh school holidays") and councils:
+        submit("refresh_holidays", councils=sorted(councils))
+    running = show_job("refresh_holidays", holidays_done)
 
 with col_badge:
     if st.button("🔄 Refresh badge catalogue"):
-        try:
-            count = len(refresh_badge_catalogue())
-            # reload in-memory state so sidebar/pages pick it up next render
-            st.session_state.badges = load_badges()
-            st.success(f"Fetched {count} badges. Go to the Badges page to see them.")
-        except Exception as e:
-            st.error(f"Failed to fetch badges: {e}")
+        submit("refresh_badge_catalogue")
+    running |= show_job("refresh_badge_catalogue", catalogue_done)
+
+    if st.button("🔎 Fetch badge requirements"):
+        submit("crawl_badge_details")          # an interrupted crawl resumes next time
+    running |= show_job("crawl_badge_details", crawl_done)
+
+if running:
+    time.sleep(1)
+    st.rerun()
@@ -24,10 +24,11 @@ from datetime import date
 from backend import scheduler_logic
 from backend.data_store import (
     load_events,       # NEW unified helpers
-    save_events,
+    update_events,
     load_badges,
     save_badges,
 )
+from utils import notifications
 
 st.set_page_config(
     page_title="Scout Leader Scheduler",
@@ -35,6 +36,9 @@ st.set_page_config(
     layout="wide",
 )
 
+# one reminder thread per server process (SCOUT_REMINDERS=0 turns it off)
+notifications.start_reminders()
+
 # -------------------------- session bootstrap ------------------------------ #
 if "events" not in st.session_state:
     st.session_state.events = load_events()        # was load_generated()
@@ -48,8 +52,8 @@ st.sidebar.success("Use the ▶ icons above to navigate.")
 if st.sidebar.button("Generate AI Schedule"):
     today = date.today()
     new_events = scheduler_logic.generate_schedule(today, today)
-    st.session_state.events.extend(new_events)
-    save_events(st.session_state.events)            # was save_generated()
+    # merge into the on-disk list so other sessions' edits are not overwritten
+    st.session_state.events = update_events(lambda evs: evs + list(new_events))
     st.sidebar.success("AI suggestions saved! Refresh Calendar page.")
 
 # --------------------------- routing (multipage) --------------------------- #
@@ -1,3 +1,368 @@
-def send_notification(message):
-    # TODO: Use plyer or OS tools to send desktop notifications
-    pass
+"""
+Session reminders.
+
+``ReminderScheduler`` keeps upcoming reminders in a min-heap keyed by fire
+time and a single worker thread sleeps on a condition variable until the
+earliest deadline – there is no polling, so idle CPU stays flat however
+many future events are queued.
+
+* Adds are O(log n) pushes; removals are lazy (the entry is invalidated and
+  skipped when it reaches the top, with periodic compaction).
+* Reminders due in the same minute are delivered as one batch.
+* A recurring event occupies one heap slot: when it fires, the next
+  occurrence is pushed.
+* Reminders are keyed on the event ``id``; events without one are told
+  apart even when they share a date and title.
+* A reminder whose lead time has already passed is skipped when the store
+  is loaded (so restarts don't repeat them); an event added that late is
+  announced straight away, titled by how far off it really is.
+* Delivery goes through a pluggable sink (log, file, desktop).
+
+``start_reminders()`` runs one attached scheduler per process; the
+Streamlit app calls it at start-up.
+"""
+from __future__ import annotations
+
+import datetime as dt
+import heapq
+import itertools
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Protocol, Tuple
+
+log = logging.getLogger(__name__)
+
+
+# --------------------------------------------------------------------------- #
+# Sinks
+# --------------------------------------------------------------------------- #
+class NotificationSink(Protocol):
+    def send(self, title: str, messages: List[str]) -> None: ...
+
+
+class LogSink:
+    """Write reminders to the ``logging`` module."""
+
+    def send(self, title: str, messages: List[str]) -> None:
+        for m in messages:
+            log.info("%s: %s", title, m)
+
+
+class FileSink:
+    """Append one line per reminder to a text file."""
+
+    def __init__(self, path: Path | str) -> None:
+        self.path = Path(path)
+
+    def send(self, title: str, messages: List[str]) -> None:
+        stamp = dt.datetime.now().isoformat(timespec="seconds")
+        with self.path.open("a", encoding="utf-8") as fh:
+            for m in messages:
+                fh.write(f"{stamp}\t{title}\t{m}\n")
+
+
+class DesktopSink:
+    """Native desktop notification via ``plyer``; falls back to logging."""
+
+    def __init__(self, app_name: str = "Scout Scheduler") -> None:
+        self.app_name = app_name
+        try:
+            from plyer import notification
+        except ImportError:
+            notification = None
+        self._notify = notification
+        self._fallback = LogSink()
+
+    def send(self, title: str, messages: List[str]) -> None:
+        if self._notify is None:
+            self._fallback.send(title, messages)
+            return
+        body = messages[0] if len(messages) == 1 else "\n".join(f"• {m}" for m in messages)
+        self._notify.notify(title=title, message=body, app_name=self.app_name)
+
+
+_default_sink: NotificationSink = DesktopSink()
+
+
+def set_default_sink(sink: NotificationSink) -> None:
+    global _default_sink
+    _default_sink = sink
+
+
+def send_notification(message, sink: Optional[NotificationSink] = None):
+    (sink or _default_sink).send("Scout Scheduler", [message])
+
+
+# --------------------------------------------------------------------------- #
+# Reminder engine
+# --------------------------------------------------------------------------- #
+def _backend():
+    try:
+        from ..backend import data_store, recurrence
+    except ImportError:          # imported as top-level ``utils`` (Streamlit puts ScoutScheduler/ on sys.path)
+        from backend import data_store, recurrence
+    return data_store, recurrence
+
+
+def _event_key(event: Dict[str, Any]) -> Tuple[str, bool]:
+    """``(key, unique)``: the event ``id`` if it has one, else its date and title."""
+    if event.get("id"):
+        return f"id:{event['id']}", True
+    return f"{str(event['date'])[:10]}|{event.get('title', '')}", False
+
+
+def _lead_title(days: int) -> str:
+    if days <= 0:
+        return "Session today"
+    return "Session tomorrow" if days == 1 else f"Session in {days} days"
+
+
+class ReminderScheduler:
+    """
+    Fire a reminder *days_before* each event at *at* o'clock local time.
+    """
+
+    def __init__(
+        self,
+        sink: Optional[NotificationSink] = None,
+        days_before: int = 1,
+        at: dt.time = dt.time(9, 0),
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.sink = sink or _default_sink
+        self.days_before = days_before
+        self.at = at
+        self._clock = clock
+        # heap of (fire_at, seq, key); _live[key] = (seq, event, session day)
+        self._heap: List[Tuple[float, int, str]] = []
+        self._live: Dict[str, Tuple[int, Dict[str, Any], dt.date]] = {}
+        self._same: Dict[str, List[str]] = {}   # id-less date|title → live keys, oldest first
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._running = False
+        self._unsubscribe: Optional[Callable[[], None]] = None
+
+    # ------------------------------ timing ------------------------------- #
+    def _session_day(self, event: Dict[str, Any], after: Optional[dt.date] = None) -> Optional[dt.date]:
+        """Next session date for *event* on or after *after* (today by default)."""
+        _, recurrence = _backend()
+
+        floor = after or dt.date.fromtimestamp(self._clock())
+        if not recurrence.is_recurring(event):
+            day = dt.date.fromisoformat(event["date"][:10])
+            return day if day >= floor else None
+        # lazily walk forward; a year-long window is plenty for "next"
+        nxt = next(recurrence.occurrences(event, floor, floor + dt.timedelta(days=366)), None)
+        return dt.date.fromisoformat(nxt["date"][:10]) if nxt else None
+
+    def _fire_at(self, day: dt.date) -> float:
+        when = dt.datetime.combine(day - dt.timedelta(days=self.days_before), self.at)
+        return when.timestamp()
+
+    # ---------------------------- mutation ------------------------------- #
+    def _entry(
+        self, event: Dict[str, Any], after: Optional[dt.date] = None, late: bool = False
+    ) -> Optional[Tuple[float, int, str]]:
+        """
+        Register the next reminder for *event*; return its heap entry.  If
+        its lead time has passed it is sent now when *late*, otherwise a
+        recurring event moves on to its next session and a one-off is dropped.
+        """
+        _, recurrence = _backend()
+        day = self._session_day(event, after)
+        now = self._clock()
+        while day is not None and self._fire_at(day) < now and not late:
+            if not recurrence.is_recurring(event):
+                return None
+            day = self._session_day(event, day + dt.timedelta(days=1))
+        if day is None:
+            return None
+        seq = next(self._seq)
+        key, unique = _event_key(event)
+        if not unique:
+            self._same.setdefault(key, []).append(f"{key}#{seq}")
+            key = f"{key}#{seq}"
+        self._live[key] = (seq, event, day)
+        return max(self._fire_at(day), now), seq, key
+
+    def _forget(self, key: str) -> None:
+        base, sep, _ = key.rpartition("#")
+        if sep and not key.startswith("id:"):
+            keys = self._same.get(base, [])
+            if key in keys:
+                keys.remove(key)
+            if not keys:
+                self._same.pop(base, None)
+
+    def _push(self, event: Dict[str, Any], after: Optional[dt.date] = None, late: bool = False) -> bool:
+        entry = self._entry(event, after, late)
+        if entry is None:
+            return False
+        heapq.heappush(self._heap, entry)
+        return True
+
+    def add_event(self, event: Dict[str, Any]) -> None:
+        with self._cond:
+            old_top = self._heap[0][0] if self._heap else None
+            if self._push(event, late=True) and (old_top is None or self._heap[0][0] < old_top):
+                self._cond.notify()          # new earliest deadline: re-arm the sleep
+
+    def remove_event(self, event: Dict[str, Any]) -> None:
+        with self._cond:
+            key, unique = _event_key(event)
+            if not unique:                   # any one of the identical events will do
+                keys = self._same.get(key)
+                key = keys[-1] if keys else ""
+                self._forget(key)
+            self._live.pop(key, None)
+            if len(self._heap) > 64 and len(self._heap) > 2 * len(self._live):
+                self._compact()
+
+    def load(self, events: List[Dict[str, Any]]) -> None:
+        """Bulk-load reminders (heapify instead of n pushes)."""
+        with self._cond:
+            for ev in events:
+                entry = self._entry(ev)
+                if entry is not None:
+                    self._heap.append(entry)
+            self._compact()
+            self._cond.notify()
+
+    def _compact(self) -> None:
+        self._heap = [e for e in self._heap if self._valid(e)]
+        heapq.heapify(self._heap)
+
+    def _valid(self, entry: Tuple[float, int, str]) -> bool:
+        live = self._live.get(entry[2])
+        return live is not None and live[0] == entry[1]
+
+    def __len__(self) -> int:
+        return len(self._live)
+
+    def next_fire_time(self) -> Optional[float]:
+        with self._cond:
+            while self._heap and not self._valid(self._heap[0]):
+                heapq.heappop(self._heap)
+            return self._heap[0][0] if self._heap else None
+
+    # ----------------------------- syncing ------------------------------- #
+    def attach(self) -> "ReminderScheduler":
+        """Load the event store and follow ``data_store.add_event``/``remove_event``."""
+        data_store, _ = _backend()
+
+        self.load(data_store.load_events())
+        if self._unsubscribe is None:
+            self._unsubscribe = data_store.subscribe(self._on_change)
+        return self
+
+    def _on_change(self, store: str, op: str, record: Dict[str, Any]) -> None:
+        if store != "events":
+            return
+        if op == "reset":
+            self.reset(record["items"])
+        else:
+            (self.add_event if op == "add" else self.remove_event)(record)
+
+    def reset(self, events: List[Dict[str, Any]]) -> None:
+        """Replace every queued reminder with those for *events*."""
+        with self._cond:
+            self._heap, self._live, self._same = [], {}, {}
+        self.load(events)
+
+    # ----------------------------- running ------------------------------- #
+    def _pop_due(self) -> List[Tuple[Dict[str, Any], dt.date]]:
+        """Pop every valid entry sharing the top entry's fire minute."""
+        _, recurrence = _backend()
+        minute = int(self._heap[0][0] // 60)
+        batch = []
+        while self._heap and int(self._heap[0][0] // 60) == minute:
+            fire_at, seq, key = heapq.heappop(self._heap)
+            live = self._live.get(key)
+            if live is None or live[0] != seq:
+                continue
+            _, event, day = live
+            del self._live[key]
+            self._forget(key)
+            batch.append((event, day))
+            # recurring: queue the occurrence after the one we just announced
+            if recurrence.is_recurring(event):
+                self._push(event, after=day + dt.timedelta(days=1))
+        return batch
+
+    def run_pending(self) -> int:
+        """Deliver everything due now; return the number of reminders sent."""
+        sent = 0
+        while True:
+            with self._cond:
+                top = self.next_fire_time()
+                if top is None or top > self._clock():
+                    return sent
+                batch = self._pop_due()
+            if batch:
+                self._deliver(batch)
+                sent += len(batch)
+
+    def _deliver(self, batch: List[Tuple[Dict[str, Any], dt.date]]) -> None:
+        lines = [f"{ev.get('title', 'Session')} on {day.isoformat()}" for ev, day in batch]
+        today = dt.date.fromtimestamp(self._clock())
+        title = (_lead_title((batch[0][1] - today).days) if len(lines) == 1
+                 else f"{len(lines)} sessions coming up")
+        try:
+            self.sink.send(title, lines)
+        except Exception:
+            log.exception("reminder delivery failed")
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                if not self._running:
+                    return
+                top = self.next_fire_time()
+                delay = None if top is None else top - self._clock()
+                if delay is None or delay > 0:
+                    self._cond.wait(timeout=delay)   # sleeps until deadline / new event
+                    continue
+                batch = self._pop_due()
+            if batch:
+                self._deliver(batch)
+
+    def start(self) -> "ReminderScheduler":
+        with self._cond:
+            if self._thread is None:
+                self._running = True
+                self._thread = threading.Thread(target=self._run, name="reminders", daemon=True)
+                self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        with self._cond:
+            self._running = False
+            self._cond.notify()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        if self._unsubscribe is not None:
+            self._unsubscribe()
+            self._unsubscribe = None
+
+
+_reminders: Optional[ReminderScheduler] = None
+_reminders_lock = threading.Lock()
+
+
+def start_reminders(sink: Optional[NotificationSink] = None) -> Optional[ReminderScheduler]:
+    """
+    Start this process's reminder scheduler on the event store (once; later
+    calls return the running one).  ``SCOUT_REMINDERS=0`` turns it off.
+    """
+    global _reminders
+    if os.getenv("SCOUT_REMINDERS", "1") == "0":
+        return None
+    with _reminders_lock:
+        if _reminders is None:
+            _reminders = ReminderScheduler(sink).attach().start()
+        return _reminders
@@ -0,0 +1,49 @@
+"""Per-call cost of the ``badge_logic`` mutation helpers."""
+import json
+
+import pytest
+
+from ScoutScheduler.backend import badge_logic
+from synthetic import make_badges
+
+
+@pytest.fixture(params=[100, 1_000])
+def catalogue(request, badge_file):
+    badges = make_badges(request.param)
+    badge_file.write_text(json.dumps(badges), encoding="utf-8")
+    return badges
+
+
+def _toggled(name, mark):
+    """``pedantic`` setup: put *name* in the opposite state so every round writes."""
+    def setup():
+        mark(name)
+        return (name,), {}
+    return setup
+
+
+def test_mark_badge_completed(benchmark, catalogue):
+    name = next(iter(catalogue))
+    setup = _toggled(name, badge_logic.mark_badge_incomplete)
+    assert benchmark.pedantic(badge_logic.mark_badge_completed, setup=setup, rounds=20)
+
+
+def test_mark_badge_incomplete(benchmark, catalogue):
+    name = next(iter(catalogue))
+    setup = _toggled(name, badge_logic.mark_badge_completed)
+    assert benchmark.pedantic(badge_logic.mark_badge_incomplete, setup=setup, rounds=20)
+
+
+def test_get_completed_badges(benchmark, catalogue):
+    benchmark(badge_logic.get_completed_badges)
+
+
+def test_batch_mark_all_completed(benchmark, catalogue):
+    names = list(catalogue)
+
+    def run():
+        with badge_logic.batch() as b:
+            for name in names:
+                b.set_completion(name, 100)
+                b.set_completion(name, 50)
+    benchmark(run)
@@ -0,0 +1,51 @@
+"""Store codecs: encode / decode time and file size on large synthetic stores."""
+import pytest
+
+from ScoutScheduler.backend import codec, data_store
+from synthetic import make_badges, make_events
+
+CODECS = ["json", "orjson", "orjson+gzip", "orjson+zstd",
+          "msgpack", "msgpack+gzip", "msgpack+zstd"]
+
+
+def _codec(spec):
+    try:
+        return codec.Codec.parse(spec)
+    except codec.CodecError as exc:          # optional package not installed
+        pytest.skip(str(exc))
+
+
+@pytest.fixture(scope="module", params=["events-100k", "badges-10k"])
+def payload(request):
+    kind, n = request.param.split("-")
+    n = int(n[:-1]) * 1_000
+    return make_events(n) if kind == "events" else make_badges(n)
+
+
+@pytest.mark.parametrize("spec", CODECS)
+def test_encode(benchmark, payload, spec):
+    c = _codec(spec)
+    data = benchmark.pedantic(c.dumps, args=(payload,), rounds=5)
+    benchmark.extra_info["bytes"] = len(data)
+
+
+@pytest.mark.parametrize("spec", CODECS)
+def test_decode(benchmark, payload, spec):
+    c = _codec(spec)
+    data = c.dumps(payload)
+    benchmark.extra_info["bytes"] = len(data)
+    assert benchmark.pedantic(codec.loads, args=(data,), rounds=5) == payload
+
+
+@pytest.mark.parametrize("spec", ["json", "orjson", "msgpack+zstd"])
+def test_data_store_round_trip(benchmark, data_dir, monkeypatch, spec):
+    """``save_events`` + ``load_events`` at 100k events, end to end."""
+    monkeypatch.setattr(data_store, "CODEC", _codec(spec))
+    events = make_events(100_000)
+
+    def run():
+        data_store.save_events(events)
+        return data_store.load_events()
+
+    assert len(benchmark.pedantic(run, rounds=3)) == len(events)
+    benchmark.extra_info["bytes"] = (data_dir / "events.json").stat().st_size
@@ -0,0 +1,82 @@
+"""Load/save throughput of ``data_store`` at 1k / 10k / 100k events."""
+import pytest
+
+from ScoutScheduler.backend import data_store
+from synthetic import make_badges, make_events
+
+SIZES = [1_000, 10_000, 100_000]
+
+
+def _rounds(n: int) -> int:
+    return 3 if n >= 100_000 else 10
+
+
+@pytest.mark.parametrize("n", SIZES)
+def test_save_events(benchmark, data_dir, n):
+    events = make_events(n)
+    benchmark.pedantic(data_store.save_events, args=(events,), rounds=_rounds(n))
+
+
+@pytest.mark.parametrize("n", SIZES)
+def test_load_events(benchmark, data_dir, n):
+    data_store.save_events(make_events(n))
+    result = benchmark.pedantic(data_store.load_events, rounds=_rounds(n))
+    assert len(result) == n
+
+
+@pytest.mark.parametrize("n", SIZES)
+def test_add_event(benchmark, data_dir, n):
+    """Single append through the versioned read-modify-write path."""
+    data_store.save_events(make_events(n))
+    ev = {"date": "2030-01-01", "title": "New", "description": ""}
+    benchmark.pedantic(data_store.add_event, args=(ev,), rounds=_rounds(n))
+
+
+@pytest.mark.parametrize("n", [100, 1_000])
+def test_save_badges(benchmark, data_dir, n):
+    benchmark(data_store.save_badges, make_badges(n))
+
+
+@pytest.mark.parametrize("n", [100, 1_000])
+def test_load_badges(benchmark, data_dir, n):
+    data_store.save_badges(make_badges(n))
+    assert len(benchmark(data_store.load_badges)) == n
+
+
+@pytest.mark.parametrize("source", ["dicts", "table"])
+def test_events_in_window(benchmark, data_dir, source):
+    """A month of events out of 100k: per-request parse + expand vs the cached table."""
+    import datetime as dt
+    from ScoutScheduler.backend.recurrence import expand, expand_table
+
+    data_store.save_events(make_events(100_000))
+    start, end = dt.date(2021, 3, 1), dt.date(2021, 3, 31)
+    if source == "dicts":
+        run = lambda: list(expand(data_store.load_events(), start, end))
+    else:
+        run = lambda: list(expand_table(data_store.load_event_table()[0], start, end))
+    assert benchmark.pedantic(run, rounds=3)
+
+
+@pytest.mark.parametrize("shape", ["dicts", "records"])
+def test_badge_filter(benchmark, shape):
+    """Section + status filter over 10k badges held as dicts vs ``BadgeRecord``s."""
+    import tracemalloc
+    from ScoutScheduler.backend.data_models import badges_from_dicts, badges_to_dicts
+
+    raw = make_badges(10_000)
+    tracemalloc.start()
+    badges = make_badges(10_000)
+    if shape == "records":
+        badges = badges_from_dicts(badges)          # the dicts are freed again
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    benchmark.extra_info["bytes"] = size
+    if shape == "dicts":
+        run = lambda: [n for n, b in badges.items()
+                       if b["section"] == "Cubs" and b["status"] == "In Progress"]
+    else:
+        assert badges_to_dicts(badges) == raw
+        run = lambda: [n for n, r in badges.items()
+                       if r.section == "Cubs" and r.status == "In Progress"]
+    assert benchmark(run)
@@ -0,0 +1,60 @@
+"""``refresh_holidays`` over fake sources: pooled fetches overlap, budgets hold."""
+import threading
+import time
+
+import pytest
+
+from ScoutScheduler.backend import holiday_sources
+from ScoutScheduler.backend.holiday_sources import HolidaySource
+
+
+def _source(council, delay=0.0, timeout=1.0, threaded=True, seen=None):
+    def fetch(url, timeout):
+        if seen is not None:
+            seen[council] = threading.current_thread() is threading.main_thread()
+        time.sleep(delay)
+        return council
+
+    def parse(text):
+        return [{"name": f"{text} half-term", "start": "2026-10-26", "end": "2026-10-30"}]
+
+    return HolidaySource(council, f"https://{council}.example", fetch=fetch, parse=parse,
+                         timeout=timeout, threaded=threaded)
+
+
+@pytest.fixture
+def sources(monkeypatch, data_dir):
+    registry = {}
+    monkeypatch.setattr(holiday_sources, "_SOURCES", registry)
+    return registry
+
+
+def test_refresh_pooled_sources(benchmark, sources):
+    """Four 50 ms sources on the pool finish in about one source's time."""
+    for i in range(4):
+        holiday_sources.register_source(_source(f"council{i}", delay=0.05))
+
+    def run():
+        start = time.monotonic()
+        results = holiday_sources.refresh_holidays()
+        return results, time.monotonic() - start
+
+    results, elapsed = benchmark.pedantic(run, rounds=3)
+    assert all(r["ok"] for r in results.values())
+    assert elapsed < 4 * 0.05
+
+
+def test_pooled_and_inline_budgets(sources):
+    seen = {}
+    for src in (_source("pooled", seen=seen),
+                _source("slow", delay=0.5, timeout=0.1, seen=seen),
+                _source("inline", threaded=False, seen=seen),
+                _source("overrun", delay=0.3, timeout=0.1, threaded=False, seen=seen)):
+        holiday_sources.register_source(src)
+
+    results = holiday_sources.refresh_holidays()
+
+    assert seen == {"pooled": False, "slow": False, "inline": True, "overrun": True}
+    assert results["pooled"]["ok"] and results["inline"]["ok"]
+    for council in ("slow", "overrun"):
+        assert results[council] == {"ok": False, "error": "timed out after 0.1s", "periods": []}
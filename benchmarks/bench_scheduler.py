@@ -0,0 +1,79 @@
+"""``generate_schedule`` preparation (badge needs, cache key, prompt) and re-planning."""
+import pytest
+
+from ScoutScheduler.backend import scheduler_logic
+from synthetic import PREFS, make_badges, make_events, make_holidays
+
+
+@pytest.fixture(params=[1_000, 10_000])
+def inputs(request):
+    badges = make_badges(200)
+    return (make_events(request.param), make_holidays(),
+            scheduler_logic._badge_needs(badges), badges)
+
+
+def test_badge_needs(benchmark, inputs):
+    benchmark(scheduler_logic._badge_needs, inputs[3])
+
+
+def test_cache_key(benchmark, inputs):
+    events, holidays, needs, _ = inputs
+    benchmark(scheduler_logic._cache_key, events, holidays, needs, PREFS)
+
+
+def test_build_prompt(benchmark, inputs):
+    events, holidays, needs, _ = inputs
+    prompt = benchmark(scheduler_logic._build_prompt, events, holidays, needs, PREFS)
+    assert "Badge sessions needed" in prompt
+
+
+@pytest.mark.parametrize("n_badges", [10, 100])
+def test_generate_schedule_uncached(benchmark, writer_sim, n_badges):
+    """End-to-end round trip against the local Writer simulator."""
+    badges = make_badges(n_badges)
+    events, holidays = make_events(1_000), make_holidays()
+
+    def run():
+        scheduler_logic._CACHE.clear()
+        return scheduler_logic.generate_schedule(events, badges, holidays, PREFS)
+
+    assert isinstance(benchmark(run), list)
+
+
+@pytest.mark.parametrize("n_badges", [10, 100])
+def test_replan_after_one_event(benchmark, writer_sim, n_badges):
+    """One new event: only the badges it displaced are sent back to Writer."""
+    badges = make_badges(n_badges)
+    holidays = make_holidays()
+    scheduler_logic._CACHE.clear()
+    plan = scheduler_logic.generate_schedule([], badges, holidays, PREFS)
+    events = [{"date": plan[0]["date"], "title": "Camp"}]
+
+    def run():
+        scheduler_logic._CACHE.clear()
+        return scheduler_logic.replan_schedule(plan, events, badges, holidays, PREFS)
+
+    new = benchmark(run)
+    assert all(s["date"] != events[0]["date"] for s in new)
+
+
+def test_accepted_sessions_stay_booked(writer_sim):
+    """accept → replan → replan: a booked session is never asked for again."""
+    badges = make_badges(10)
+    holidays = make_holidays()
+    scheduler_logic._CACHE.clear()
+    plan = scheduler_logic.generate_schedule([], badges, holidays, PREFS)
+    accepted = plan[0]
+    events = [{"date": accepted["date"], "title": accepted["badge"]}]
+    wanted = {n["name"]: n["sessions_left"] for n in scheduler_logic._badge_needs(badges)}
+    wanted[accepted["badge"]] -= 1
+
+    for _ in range(2):
+        plan = scheduler_logic.replan_schedule(plan, events, badges, holidays, PREFS)
+        assert accepted not in plan
+        _, needs = scheduler_logic.diff_plan(plan, events, badges, holidays, PREFS)
+        assert needs == []
+        per_badge = {}
+        for s in plan:
+            per_badge[s["badge"]] = per_badge.get(s["badge"], 0) + 1
+        assert per_badge.get(accepted["badge"], 0) <= wanted[accepted["badge"]]
@@ -0,0 +1,21 @@
+"""``plan_season`` on a full scout year: greedy + local search."""
+import datetime as dt
+
+import pytest
+
+from ScoutScheduler.backend.season_planner import SeasonConfig, plan_season
+from synthetic import make_badges, make_events, make_holidays
+
+START = dt.date(2024, 1, 1)
+
+
+@pytest.mark.parametrize("n_badges", [100, 300])
+@pytest.mark.parametrize("capacity", [2, 6])
+def test_plan_season_52_weeks(benchmark, n_badges, capacity):
+    badges, events, holidays = make_badges(n_badges), make_events(1_000), make_holidays()
+    config = SeasonConfig(capacity=capacity, time_limit=1.0)
+
+    plan = benchmark(plan_season, badges, events, holidays, START, None, config)
+    assert plan.objective <= plan.greedy_objective
+    assert plan.solve_seconds < 5
+    benchmark.extra_info.update(plan.summary())
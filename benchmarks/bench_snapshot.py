@@ -0,0 +1,50 @@
+"""Catalogue snapshot: open / lookup / filter cost versus parsing the store."""
+import pytest
+
+from ScoutScheduler.backend import data_store, snapshot
+from synthetic import make_badges, make_holidays
+
+N_BADGES = 10_000
+
+
+@pytest.fixture
+def stores(data_dir):
+    badges = make_badges(N_BADGES)
+    data_store.save_badges(badges)
+    data_store.save_holidays(make_holidays())
+    snapshot.publish()
+    return badges
+
+
+def test_load_badges_baseline(benchmark, stores):
+    """What every worker paid before: parse the whole store."""
+    assert len(benchmark(data_store.load_badges)) == N_BADGES
+
+
+def test_open(benchmark, stores):
+    snap = benchmark(snapshot.Snapshot, snapshot._path())
+    assert len(snap.badges) == N_BADGES
+
+
+def test_lookup(benchmark, stores):
+    snap = snapshot.current()
+    name = sorted(stores)[N_BADGES // 2]
+    assert benchmark(snap.badges.__getitem__, name) == stores[name]
+
+
+def test_filter_section(benchmark, stores):
+    snap = snapshot.current()
+    section = next(iter(stores.values()))["section"]
+    found = benchmark(lambda: sum(1 for _ in snap.badges.filter(section=section)))
+    assert found == sum(1 for r in stores.values() if r.get("section") == section)
+
+
+def test_current_unchanged(benchmark, stores):
+    """Per-request freshness check once the snapshot is open."""
+    snap = snapshot.current()
+    assert benchmark(snapshot.current) is snap
+
+
+def test_publish(benchmark, stores):
+    benchmark.pedantic(snapshot.publish, kwargs={"force": True}, rounds=5)
+    benchmark.extra_info["bytes"] = snapshot._path().stat().st_size
@@ -0,0 +1,45 @@
+"""Offline parser benchmarks over saved HTML fixtures."""
+import pytest
+
+from ScoutScheduler.backend import webscraper
+
+DATE_STRINGS = ["2 Sep 2024", "2 September 2024", "14 Feb", "23 July"]
+
+
+@pytest.mark.parametrize("text", DATE_STRINGS)
+def test_parse_date(benchmark, text):
+    benchmark(webscraper._parse_date, text)
+
+
+def test_parse_harrow_holidays(benchmark, html_fixture):
+    html = html_fixture("harrow_term_dates.html")
+    periods = benchmark(webscraper.parse_harrow_holidays, html)
+    assert periods
+
+
+BADGE_PAGES = ["scouts_cubs_activity_badges.html"]
+
+
+@pytest.mark.benchmark(group="badge-index-page")
+@pytest.mark.parametrize("page", BADGE_PAGES)
+def test_parse_badge_index(benchmark, html_fixture, page):
+    html = html_fixture(page)
+    badges = benchmark(webscraper.parse_badge_index, html, "Cubs")
+    assert len(badges) == 60
+
+
+@pytest.mark.benchmark(group="badge-index-page")
+@pytest.mark.parametrize("page", BADGE_PAGES)
+def test_parse_badge_index_fast(benchmark, html_fixture, page):
+    html = html_fixture(page)
+    badges = benchmark(webscraper.parse_badge_index_fast, html, "Cubs")
+    assert len(badges) == 60
+
+
+@pytest.mark.parametrize("page", BADGE_PAGES)
+def test_badge_index_parsers_agree(html_fixture, page):
+    html = html_fixture(page)
+    slow = webscraper.parse_badge_index(html, "Cubs", skip=["Digital Nights 0"])
+    fast = webscraper.parse_badge_index_fast(html, "Cubs", skip=["Digital Nights 0"])
+    assert list(fast) == list(slow)
+    assert fast == slow
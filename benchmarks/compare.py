@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+Compare two pytest-benchmark JSON files and flag regressions.
+
+    python benchmarks/compare.py BASELINE.json CURRENT.json [--threshold 0.15]
+
+Exits with status 1 if any benchmark's median got slower by more than the
+threshold (default 15 %), so it can gate CI.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from typing import Dict
+
+
+def _medians(path: str) -> Dict[str, float]:
+    with open(path, encoding="utf-8") as fh:
+        data = json.load(fh)
+    return {b["fullname"]: b["stats"]["median"] for b in data["benchmarks"]}
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    ap.add_argument("baseline")
+    ap.add_argument("current")
+    ap.add_argument("--threshold", type=float, default=0.15)
+    args = ap.parse_args(argv)
+
+    base, cur = _medians(args.baseline), _medians(args.current)
+    regressions = 0
+    width = max((len(n) for n in cur), default=10)
+    for name in sorted(cur):
+        if name not in base:
+            print(f"{name:<{width}}  (new)")
+            continue
+        ratio = cur[name] / base[name] if base[name] else float("inf")
+        flag = ""
+        if ratio > 1 + args.threshold:
+            flag = "  REGRESSION"
+            regressions += 1
+        elif ratio < 1 - args.threshold:
+            flag = "  faster"
+        print(f"{name:<{width}}  {base[name] * 1e3:10.3f} ms -> {cur[name] * 1e3:10.3f} ms"
+              f"  ({ratio:5.2f}x){flag}")
+    for name in sorted(base.keys() - cur.keys()):
+        print(f"{name:<{width}}  (removed)")
+    print(f"\n{regressions} regression(s) over {args.threshold:.0%}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,49 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+
+FIXTURES = Path(__file__).resolve().parent / "fixtures"
+
+
+@pytest.fixture
+def data_dir(tmp_path, monkeypatch):
+    """Point ``data_store`` at an empty temp directory."""
+    from ScoutScheduler.backend import data_store
+
+    monkeypatch.setattr(data_store, "DATA_DIR", tmp_path)
+    return tmp_path
+
+
+@pytest.fixture
+def badge_file(tmp_path, monkeypatch):
+    """Point ``badge_logic`` at a temp ``badges.json`` (and ``data_store`` at an empty store)."""
+    from ScoutScheduler.backend import badge_logic, data_store
+
+    path = tmp_path / "badges.json"
+    monkeypatch.setattr(badge_logic, "_BADGE_FILE", str(path))
+    store = tmp_path / "store"
+    store.mkdir()
+    monkeypatch.setattr(data_store, "DATA_DIR", store)
+    return path
+
+
+@pytest.fixture
+def html_fixture():
+    def _load(name: str) -> str:
+        return (FIXTURES / name).read_text(encoding="utf-8")
+    return _load
+
+
+@pytest.fixture
+def writer_sim(monkeypatch):
+    """Run the offline Writer simulator and point the scheduler at it."""
+    from ScoutScheduler.backend import scheduler_logic
+    from ScoutScheduler.backend.writer_simulator import running_simulator
+
+    with running_simulator(latency="fixed:0") as base_url:
+        monkeypatch.setattr(scheduler_logic, "API_KEY", "offline")
+        monkeypatch.setattr(scheduler_logic, "CHAT_URL", f"{base_url}/v1/chat/completions")
+        monkeypatch.setattr(scheduler_logic, "COMP_URL", f"{base_url}/v1/completions")
+        yield base_url
@@ -0,0 +1,281 @@
+#!/usr/bin/env python3
+"""
+Async load generator for the badge_info FastAPI service.
+
+By default it is fully self-contained: it starts a local fixture site that
+serves one page per badge, writes a throw-away badges.json pointing at it,
+launches ``uvicorn ScoutScheduler.backend.badge:app`` in a subprocess and
+then drives it::
+
+    python benchmarks/loadtest_badge_info.py --concurrency 64 --duration 20 \\
+        --mix badge_info=8,badge_missing=1,calendar=1 --json run.json
+
+Point ``--url`` at an already running service to skip the local setup.
+``--baseline old.json --max-regression 0.2`` exits non-zero if RPS drops or
+p95 latency grows by more than 20 %, for CI gating.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import httpx
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+
+# route name → (path template, expected status codes)
+ROUTES: Dict[str, Tuple[str, Tuple[int, ...]]] = {
+    "badge_info":    ("/badge_info?name={badge}", (200,)),
+    "badge_missing": ("/badge_info?name=__missing__", (404,)),
+    "calendar":      ("/calendar.ics", (200, 304)),
+    "metrics":       ("/metrics", (200,)),
+}
+
+
+# --------------------------------------------------------------------------- #
+# Local fixture site
+# --------------------------------------------------------------------------- #
+class _BadgePage(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args) -> None:
+        pass
+
+    def do_GET(self) -> None:
+        slug = self.path.strip("/").rsplit("/", 1)[-1]
+        body = (
+            "<!DOCTYPE html><html><body><nav>" + "<a href='#'>x</a>" * 200 + "</nav>"
+            "<div class='article-content'><h1>" + slug + "</h1>"
+            f"<p>Complete the {slug} challenges with your Six.</p>"
+            "<ul>" + "<li>Requirement</li>" * 6 + "</ul></div></body></html>"
+        ).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+@contextlib.contextmanager
+def fixture_site() -> Iterator[str]:
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _BadgePage)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        yield f"http://127.0.0.1:{server.server_address[1]}"
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+@contextlib.contextmanager
+def local_service(n_badges: int, workers: int) -> Iterator[Tuple[str, List[str]]]:
+    """Fixture site + badges.json + uvicorn subprocess; yields (url, names)."""
+    with fixture_site() as site, tempfile.TemporaryDirectory() as tmp:
+        names = [f"Badge {i:04d}" for i in range(n_badges)]
+        badge_file = Path(tmp) / "badges.json"
+        badge_file.write_text(json.dumps({
+            n: {"name": n, "status": "Not Started", "completion": 0, "sessions": 1,
+                "url": f"{site}/cubs/activity-badges/badge-{i:04d}/"}
+            for i, n in enumerate(names)
+        }), encoding="utf-8")
+
+        port = _free_port()
+        env = dict(os.environ, BADGE_FILE_PATH=str(badge_file),
+                   PYTHONPATH=f"{REPO_ROOT}{os.pathsep}{os.environ.get('PYTHONPATH', '')}")
+        proc = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "ScoutScheduler.backend.badge:app",
+             "--port", str(port), "--workers", str(workers), "--log-level", "warning"],
+            env=env, cwd=REPO_ROOT,
+        )
+        url = f"http://127.0.0.1:{port}"
+        try:
+            deadline = time.monotonic() + 30
+            while True:
+                try:
+                    httpx.get(f"{url}/metrics", timeout=1)
+                    break
+                except httpx.TransportError:
+                    if proc.poll() is not None or time.monotonic() > deadline:
+                        raise RuntimeError("badge service did not start")
+                    time.sleep(0.2)
+            yield url, names
+        finally:
+            proc.terminate()
+            proc.wait(timeout=10)
+
+
+# --------------------------------------------------------------------------- #
+# Load generation
+# --------------------------------------------------------------------------- #
+def parse_mix(spec: str) -> List[Tuple[str, float]]:
+    mix = []
+    for part in spec.split(","):
+        name, _, weight = part.partition("=")
+        if name not in ROUTES:
+            raise SystemExit(f"unknown route {name!r}; choose from {', '.join(ROUTES)}")
+        mix.append((name, float(weight or 1)))
+    return mix
+
+
+def percentile(sorted_vals: List[float], q: float) -> float:
+    if not sorted_vals:
+        return 0.0
+    k = min(len(sorted_vals) - 1, max(0, round(q / 100 * (len(sorted_vals) - 1))))
+    return sorted_vals[k]
+
+
+async def run_load(
+    base_url: str,
+    badges: List[str],
+    mix: List[Tuple[str, float]],
+    concurrency: int,
+    duration: Optional[float],
+    requests_total: Optional[int],
+    seed: int = 0,
+) -> Dict[str, object]:
+    rng = random.Random(seed)
+    names = [m[0] for m in mix]
+    weights = [m[1] for m in mix]
+    latencies: Dict[str, List[float]] = {n: [] for n in names}
+    errors: Dict[str, int] = {n: 0 for n in names}
+    statuses: Dict[str, int] = {}
+    issued = 0
+    stop_at = time.perf_counter() + duration if duration else None
+
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30) as client:
+
+        async def worker() -> None:
+            nonlocal issued
+            while True:
+                if requests_total is not None and issued >= requests_total:
+                    return
+                if stop_at is not None and time.perf_counter() >= stop_at:
+                    return
+                issued += 1
+                route = rng.choices(names, weights)[0]
+                path, ok = ROUTES[route]
+                path = path.format(badge=rng.choice(badges) if badges else "x")
+                t0 = time.perf_counter()
+                try:
+                    resp = await client.get(path)
+                    code = str(resp.status_code)
+                    failed = resp.status_code not in ok
+                except httpx.HTTPError as exc:
+                    code, failed = type(exc).__name__, True
+                latencies[route].append(time.perf_counter() - t0)
+                statuses[code] = statuses.get(code, 0) + 1
+                errors[route] += failed
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    all_lat = sorted(x for v in latencies.values() for x in v)
+    total = len(all_lat)
+
+    def summary(vals: List[float], errs: int) -> Dict[str, float]:
+        vals = sorted(vals)
+        return {
+            "requests": len(vals),
+            "rps": len(vals) / elapsed if elapsed else 0.0,
+            "p50_ms": percentile(vals, 50) * 1e3,
+            "p95_ms": percentile(vals, 95) * 1e3,
+            "p99_ms": percentile(vals, 99) * 1e3,
+            "error_rate": errs / len(vals) if vals else 0.0,
+        }
+
+    return {
+        "target": base_url,
+        "concurrency": concurrency,
+        "elapsed_s": elapsed,
+        "overall": summary(all_lat, sum(errors.values())) if total else {},
+        "routes": {n: summary(latencies[n], errors[n]) for n in names if latencies[n]},
+        "status_codes": statuses,
+    }
+
+
+def print_report(report: Dict[str, object]) -> None:
+    print(f"\ntarget {report['target']}  concurrency {report['concurrency']}  "
+          f"elapsed {report['elapsed_s']:.1f}s")
+    print(f"{'route':<15}{'reqs':>8}{'rps':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'err %':>8}")
+    rows = dict(report["routes"])
+    rows["overall"] = report["overall"]
+    for name, s in rows.items():
+        print(f"{name:<15}{s['requests']:>8}{s['rps']:>10.1f}{s['p50_ms']:>10.1f}"
+              f"{s['p95_ms']:>10.1f}{s['p99_ms']:>10.1f}{s['error_rate'] * 100:>8.2f}")
+    print("status codes:", report["status_codes"])
+
+
+def regressions(base: Dict, cur: Dict, tolerance: float) -> List[str]:
+    b, c = base["overall"], cur["overall"]
+    found = []
+    if c["rps"] < b["rps"] * (1 - tolerance):
+        found.append(f"rps {b['rps']:.1f} -> {c['rps']:.1f}")
+    if c["p95_ms"] > b["p95_ms"] * (1 + tolerance):
+        found.append(f"p95 {b['p95_ms']:.1f}ms -> {c['p95_ms']:.1f}ms")
+    if c["error_rate"] > b["error_rate"] + 0.01:
+        found.append(f"error rate {b['error_rate']:.2%} -> {c['error_rate']:.2%}")
+    return found
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="Load-test the badge_info service")
+    ap.add_argument("--url", help="existing service base URL (skip local setup)")
+    ap.add_argument("--badges", type=int, default=200, help="fixture badges (local mode)")
+    ap.add_argument("--workers", type=int, default=1, help="uvicorn workers (local mode)")
+    ap.add_argument("--concurrency", type=int, default=32)
+    ap.add_argument("--duration", type=float, default=10.0, help="seconds (ignored with --requests)")
+    ap.add_argument("--requests", type=int, help="stop after this many requests")
+    ap.add_argument("--mix", default="badge_info=1")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--json", help="write the report here")
+    ap.add_argument("--baseline", help="earlier --json report to compare against")
+    ap.add_argument("--max-regression", type=float, default=0.2)
+    args = ap.parse_args(argv)
+
+    mix = parse_mix(args.mix)
+    duration = None if args.requests else args.duration
+
+    with contextlib.ExitStack() as stack:
+        if args.url:
+            base_url, names = args.url, [f"Badge {i:04d}" for i in range(args.badges)]
+        else:
+            base_url, names = stack.enter_context(local_service(args.badges, args.workers))
+        report = asyncio.run(run_load(base_url, names, mix, args.concurrency,
+                                      duration, args.requests, args.seed))
+
+    print_report(report)
+    if args.json:
+        Path(args.json).write_text(json.dumps(report, indent=2), encoding="utf-8")
+    if args.baseline:
+        found = regressions(json.loads(Path(args.baseline).read_text(encoding="utf-8")),
+                            report, args.max_regression)
+        for line in found:
+            print("REGRESSION:", line)
+        return 1 if found else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
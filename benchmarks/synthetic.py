@@ -0,0 +1,72 @@
+"""
+Deterministic synthetic data for the benchmark suite.
+
+Shapes match what ``data_store`` / ``badge_logic`` persist, so the same
+generators can seed a throw-away ``DATA_DIR`` for load/save benchmarks.
+"""
+from __future__ import annotations
+
+import datetime as dt
+import random
+from typing import Any, Dict, List
+
+SECTIONS = ("Beavers", "Cubs", "Scouts", "Explorers")
+STATUSES = ("Not Started", "In Progress", "Completed")
+TITLES = (
+    "Pack meeting", "Hike", "Camp", "Badge night", "Parents evening",
+    "Campfire", "Swimming", "First aid", "Cooking", "Map reading",
+)
+
+
+def make_events(n: int, seed: int = 0, start: dt.date = dt.date(2020, 1, 1),
+                years: int = 5) -> List[Dict[str, Any]]:
+    rng = random.Random(seed)
+    span = 365 * years
+    return [
+        {
+            "date": (start + dt.timedelta(days=rng.randrange(span))).isoformat(),
+            "title": rng.choice(TITLES),
+            "description": "" if rng.random() < 0.7 else f"Bring kit #{rng.randrange(100)}",
+        }
+        for _ in range(n)
+    ]
+
+
+def make_badges(n: int, seed: int = 0) -> Dict[str, Dict[str, Any]]:
+    rng = random.Random(seed)
+    badges = {}
+    for i in range(n):
+        name = f"Badge {i:05d}"
+        status = rng.choice(STATUSES)
+        badges[name] = {
+            "name":         name,
+            "sessions":     rng.randint(1, 6),
+            "status":       status,
+            "completion":   100 if status == "Completed" else rng.choice((0, 25, 50, 75)),
+            "description":  f"Synthetic description for {name}.",
+            "requirements": [f"Requirement {j}" for j in range(rng.randint(0, 5))],
+            "section":      rng.choice(SECTIONS),
+        }
+    return badges
+
+
+def make_holidays(years: int = 5, start_year: int = 2020) -> List[Dict[str, Any]]:
+    holidays = []
+    for y in range(start_year, start_year + years):
+        for name, (m1, d1), (m2, d2) in (
+            ("Half-term (Feb)", (2, 14), (2, 21)),
+            ("Easter", (4, 1), (4, 14)),
+            ("Half-term (May)", (5, 26), (5, 30)),
+            ("Summer break", (7, 23), (9, 2)),
+            ("Half-term (Oct)", (10, 27), (10, 31)),
+            ("Christmas", (12, 20), (12, 31)),
+        ):
+            holidays.append({
+                "name": f"{name} {y}",
+                "start": dt.date(y, m1, d1).isoformat(),
+                "end": dt.date(y, m2, d2).isoformat(),
+            })
+    return holidays
+
+
+PREFS = {"weekend_only": False, "time_of_day": "any"}